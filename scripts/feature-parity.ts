@@ -0,0 +1,104 @@
+// Runs src/lib/features.ts over the golden fixture written by
+// streamlit-old/parity.py and writes the results in the same layout, for
+// `python parity.py check <results>`:
+//
+//   npx tsx scripts/feature-parity.ts streamlit-old/fixtures/feature_parity.bin ts_results.bin
+//   cd streamlit-old && python parity.py check ../ts_results.bin
+
+import { readFileSync, writeFileSync } from "fs";
+import { type Candle, engineerFeatures, estimateLlmad, llmadToFee } from "../src/lib/features";
+
+const MAGIC = "FPAR";
+const VERSION = 1;
+
+interface ArrayEntry {
+    dtype: string;
+    shape: number[];
+    offset: number;
+}
+
+type Arrays = Record<string, Float64Array | Int32Array | BigInt64Array>;
+
+function readArrays(path: string): Arrays {
+    // Copy into a fresh ArrayBuffer so every typed-array view is aligned
+    const bytes = new Uint8Array(readFileSync(path));
+    const view = new DataView(bytes.buffer);
+    if (new TextDecoder().decode(bytes.subarray(0, 4)) !== MAGIC) {
+        throw new Error(`${path} is not a feature-parity file`);
+    }
+    const version = view.getUint32(4, true);
+    if (version !== VERSION) throw new Error(`${path} has layout version ${version}`);
+    const length = view.getUint32(8, true);
+    const header = JSON.parse(new TextDecoder().decode(bytes.subarray(12, 12 + length)));
+    const base = 12 + length;
+    const arrays: Arrays = {};
+    for (const [name, entry] of Object.entries(header.arrays as Record<string, ArrayEntry>)) {
+        const count = entry.shape.reduce((a, b) => a * b, 1);
+        const offset = base + entry.offset;
+        if (entry.dtype === "<f8") arrays[name] = new Float64Array(bytes.buffer, offset, count);
+        else if (entry.dtype === "<i4") arrays[name] = new Int32Array(bytes.buffer, offset, count);
+        else if (entry.dtype === "<i8") arrays[name] = new BigInt64Array(bytes.buffer, offset, count);
+        else throw new Error(`array ${name} has unsupported dtype ${entry.dtype}`);
+    }
+    return arrays;
+}
+
+function writeArrays(path: string, arrays: Record<string, { data: Float64Array; shape: number[] }>, meta: object) {
+    const entries: Record<string, ArrayEntry> = {};
+    let offset = 0;
+    for (const [name, { data, shape }] of Object.entries(arrays)) {
+        entries[name] = { dtype: "<f8", shape, offset };
+        offset += data.byteLength;  // float64 data is always 8-byte aligned
+    }
+    let header = JSON.stringify({ meta, arrays: entries });
+    header += " ".repeat((8 - ((12 + Buffer.byteLength(header)) % 8)) % 8);
+    const prefix = Buffer.alloc(12);
+    prefix.write(MAGIC, 0, "ascii");
+    prefix.writeUInt32LE(VERSION, 4);
+    prefix.writeUInt32LE(Buffer.byteLength(header), 8);
+    writeFileSync(path, Buffer.concat([
+        prefix,
+        Buffer.from(header),
+        ...Object.values(arrays).map(({ data }) => Buffer.from(data.buffer, data.byteOffset, data.byteLength)),
+    ]));
+}
+
+function main() {
+    const [goldenPath, outPath] = process.argv.slice(2);
+    if (!goldenPath || !outPath) {
+        console.error("usage: feature-parity.ts <golden.bin> <results.bin>");
+        process.exit(2);
+    }
+    const golden = readArrays(goldenPath);
+    const time = golden.time as BigInt64Array;
+    const [open, high, low, close, volume] = ["open", "high", "low", "close", "volume"]
+        .map(name => golden[name] as Float64Array);
+    const candles: Candle[] = Array.from(time, (t, k) => ({
+        time: Number(t), open: open[k], high: high[k], low: low[k], close: close[k], volume: volume[k],
+    }));
+
+    const start = golden.start as Int32Array;
+    const stop = golden.stop as Int32Array;
+    const rows = start.length;
+    const width = (golden.features as Float64Array).length / rows;
+    const features = new Float64Array(rows * width);
+    const llmad = new Float64Array(rows);
+    const fee = new Float64Array(rows);
+    const began = performance.now();
+    for (let r = 0; r < rows; r++) {
+        const row = engineerFeatures(candles.slice(start[r], stop[r]));
+        features.set(row, r * width);
+        llmad[r] = estimateLlmad(row);
+        fee[r] = llmadToFee(llmad[r]);
+    }
+    const elapsed = performance.now() - began;
+
+    writeArrays(outPath, {
+        features: { data: features, shape: [rows, width] },
+        llmad: { data: llmad, shape: [rows] },
+        fee: { data: fee, shape: [rows] },
+    }, { kind: "results", engine: "src/lib/features.ts" });
+    console.log(`${rows} windows in ${elapsed.toFixed(1)} ms -> ${outPath}`);
+}
+
+main();
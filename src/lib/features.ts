@@ -0,0 +1,109 @@
+// Feature engine for the dashboard API. This is a port of the Python
+// reference in streamlit-old (engineer_features, estimate_llmad_from_features,
+// llmad_to_fee); streamlit-old/parity.py holds the golden fixture it is
+// checked against, via scripts/feature-parity.ts.
+
+export interface Candle {
+    time: number;
+    open: number;
+    high: number;
+    low: number;
+    close: number;
+    volume: number;
+}
+
+export const FEATURE_NAMES = [
+    "HL Range 1m", "HL Range 5m", "HL Range 15m",
+    "High LogRet 1m", "High LogRet 5m", "High LogRet 15m",
+    "Low LogRet 1m", "Low LogRet 5m", "Low LogRet 15m",
+    "RollStd 5m", "RollStd 15m", "RollStd 30m",
+    "Range Ratio", "Momentum 5m", "Vol-Wt Proxy",
+];
+export const MIN_CANDLES = 60;
+
+const LOOKBACKS = [1, 5, 15];
+const STD_WINDOWS = [5, 15, 30];
+const RANGE_WINDOW = 5;      // bars before the current one in the range-ratio average
+const MOMENTUM_LOOKBACK = 5;
+const VWV_WINDOW = 5;        // returns in the volume-weighted volatility proxy
+
+const LLMAD_WEIGHTS = [
+    0.15, 0.12, 0.08,   // HL Range 1m, 5m, 15m
+    0.05, 0.04, 0.03,   // High LogRet 1m, 5m, 15m
+    0.05, 0.04, 0.03,   // Low LogRet 1m, 5m, 15m
+    0.12, 0.10, 0.07,   // RollStd 5m, 15m, 30m
+    0.02,               // Range Ratio
+    0.03,               // Momentum 5m
+    0.07,               // Vol-Wt Proxy
+];
+
+const MIN_FEE = 0.0005;
+const MAX_FEE = 0.008;
+const LLMAD_MAX = 0.01;
+
+function logRatio(a: number, b: number): number {
+    return a > 0 && b > 0 ? Math.log(a / b) : 0;
+}
+
+function std(arr: number[]): number {
+    const mean = arr.reduce((a, b) => a + b, 0) / arr.length;
+    return Math.sqrt(arr.reduce((s, v) => s + (v - mean) ** 2, 0) / arr.length);
+}
+
+export function engineerFeatures(candles: Candle[]): number[] {
+    if (candles.length < MIN_CANDLES) {
+        throw new Error(`Not enough candles: need ${MIN_CANDLES}, got ${candles.length}`);
+    }
+    // Every feature reads at most the last MIN_CANDLES bars
+    const bars = candles.slice(candles.length - MIN_CANDLES);
+    const highs = bars.map(c => c.high);
+    const lows = bars.map(c => c.low);
+    const closes = bars.map(c => c.close);
+    const volumes = bars.map(c => c.volume);
+    const i = bars.length - 1;
+    const features: number[] = [];
+
+    // 1-3: Log high-low range over the last lb + 1 bars
+    for (const lb of LOOKBACKS) {
+        const maxHigh = Math.max(...highs.slice(i - lb));
+        const minLow = Math.min(...lows.slice(i - lb));
+        features.push(logRatio(maxHigh, minLow));
+    }
+
+    // 4-9: Log return of high and low prices
+    for (const lb of LOOKBACKS) features.push(logRatio(highs[i], highs[i - lb]));
+    for (const lb of LOOKBACKS) features.push(logRatio(lows[i], lows[i - lb]));
+
+    // 10-12: Rolling std of the last `window` close log returns
+    const logCloses = closes.map(c => Math.log(c));
+    const returns = logCloses.slice(1).map((x, k) => x - logCloses[k]);
+    for (const window of STD_WINDOWS) features.push(std(returns.slice(-window)));
+
+    // 13: High-low range ratio (current bar vs the mean over RANGE_WINDOW + 1 bars)
+    const ranges = bars.slice(i - RANGE_WINDOW).map(c => c.high - c.low);
+    const avgRange = ranges.reduce((a, b) => a + b, 0) / ranges.length;
+    features.push(avgRange > 0 ? ranges[ranges.length - 1] / avgRange : 1.0);
+
+    // 14: Price momentum
+    features.push(logRatio(closes[i], closes[i - MOMENTUM_LOOKBACK]));
+
+    // 15: Volume-weighted volatility proxy (return k weighted by bar k's volume)
+    let num = 0;
+    let den = 0;
+    for (let k = i - VWV_WINDOW + 1; k <= i; k++) {
+        num += Math.abs(returns[k - 1]) * volumes[k];
+        den += volumes[k];
+    }
+    features.push(den > 0 ? num / den : 0.0);
+
+    return features;
+}
+
+export function estimateLlmad(features: number[]): number {
+    return features.reduce((s, f, k) => s + Math.abs(f) * LLMAD_WEIGHTS[k], 0);
+}
+
+export function llmadToFee(llmad: number): number {
+    const normalized = Math.min(Math.abs(llmad) / LLMAD_MAX, 1.0);
+    return MIN_FEE + normalized * (MAX_FEE - MIN_FEE);
+}
@@ -12,21 +12,41 @@ Run:  streamlit run app.py
 
 import os
 import streamlit as st
-import opengradient as og
-import numpy as np
 import requests
 import time
-import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+from archive import CandleArchive
+from candles import CandleBuffer
+from chart import ChartPyramid
+from config import CRYPTOCOMPARE_API, MODEL_CID, STATIC_FEE
+from features import FEATURE_NAMES, engineer_features
+from fetcher import CandleCache, CryptoCompareError, parse_histominute
+from fees import llmad_to_fee
+from inference import InferenceCache, InferenceQueue, set_local_model
+from ledger import InferenceLedger
+from local_model import load_local_model
+import metrics
+from metrics import API_ERRORS, API_REQUESTS, counter, timer
+from result_store import MemoryBackend, ResultStore, SqliteBackend
+from scheduler import bar_close
+from validation import validate_candles
+
 load_dotenv()
 
 # ─── Config ───────────────────────────────────────────────────────────────────
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-MODEL_CID = "ur_9aUT9KW3RbAj3nsqP1Fors3tblkUf4Hw4D0QFDXc"
-CRYPTOCOMPARE_API = "https://min-api.cryptocompare.com/data/v2/histominute"
-STATIC_FEE = 0.003  # Standard 0.30% Uniswap fee for comparison
+ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR")  # optional on-disk candle archive
+FEE_SERVICE_URL = os.getenv("FEE_SERVICE_URL")    # optional `python -m feeopt serve` endpoint
+PAIR = "ETH/USDT"
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH")  # optional SQLite file shared by app processes
+LEDGER_DIR = os.getenv("INFERENCE_LEDGER_DIR")   # optional on-disk inference log
+METRICS_PORT = os.getenv("METRICS_PORT")          # optional Prometheus text endpoint
+FETCH_OFFSET = 2.0  # seconds after a bar close before CryptoCompare has published it
+CHART_HISTORY = 30 * 1440  # minute bars the chart keeps (coarser levels cover the same span)
+CHART_RANGES = {"2H": 2 * 3600, "24H": 86400, "7D": 7 * 86400, "30D": 30 * 86400}
 
 # ─── Page Config ──────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -195,224 +215,146 @@ st.markdown("""
 
 
 # ─── SDK Client (cached) ─────────────────────────────────────────────────────
-@st.cache_resource
-def get_client():
+def init_client():
+    import opengradient as og  # seconds to import; keep it off the first render
     return og.init(private_key=PRIVATE_KEY)
 
 
-# ─── Fetch Live ETH/USDT Data ────────────────────────────────────────────────
-@st.cache_data(ttl=5)
-def fetch_ohlc(symbol="ETH", tsym="USDT", limit=120):
-    """Fetch minutely OHLC candles from CryptoCompare API (no geo-restrictions)."""
-    try:
-        resp = requests.get(CRYPTOCOMPARE_API, params={
-            "fsym": symbol,
-            "tsym": tsym,
-            "limit": limit,
-        }, timeout=10)
-        resp.raise_for_status()
-        raw = resp.json()
-
-        if raw.get("Response") != "Success":
-            st.error(f"CryptoCompare error: {raw.get('Message')}")
-            return []
-
-        candles = []
-        for c in raw["Data"]["Data"]:
-            candles.append({
-                "timestamp": datetime.fromtimestamp(c["time"], tz=timezone.utc),
-                "open": float(c["open"]),
-                "high": float(c["high"]),
-                "low": float(c["low"]),
-                "close": float(c["close"]),
-                "volume": float(c["volumefrom"]),
-            })
-        return candles
-    except Exception as e:
-        st.error(f"Failed to fetch price data: {e}")
-        return []
+@st.cache_resource
+def get_client_future():
+    # Initialize the SDK in the background while cached candles render;
+    # inference jobs wait on this Future, the page never does
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="og-init").submit(init_client)
 
 
-# ─── Feature Engineering ─────────────────────────────────────────────────────
-def engineer_features(candles):
-    """
-    Generate 15 financial features from OHLC data.
-
-    Based on the paper: features are engineered functions of prior high and low
-    prices over varying timeframes, selected using Lasso.
-
-    Features:
-    1-3:  Log high-low range for 1m, 5m, 15m lookbacks
-    4-6:  Log return of high prices for 1m, 5m, 15m lookbacks
-    7-9:  Log return of low prices for 1m, 5m, 15m lookbacks
-    10-12: Rolling std of log returns for 5m, 15m, 30m windows
-    13:   High-low range ratio (current vs 5m avg)
-    14:   Price momentum (5m log return of close)
-    15:   Volume-weighted volatility proxy
-    """
-    if len(candles) < 60:
-        return None
+@st.cache_resource
+def get_local_model():
+    # Replica of MODEL_CID used whenever the on-chain output is missing
+    model = load_local_model()
+    set_local_model(model)
+    return model
 
-    highs = np.array([c["high"] for c in candles])
-    lows = np.array([c["low"] for c in candles])
-    closes = np.array([c["close"] for c in candles])
-    volumes = np.array([c["volume"] for c in candles])
-
-    # Use the most recent data point
-    i = len(candles) - 1
-
-    # Safe log ratio helper
-    def log_ratio(a, b):
-        if b <= 0 or a <= 0:
-            return 0.0
-        return math.log(a / b)
-
-    features = []
-
-    # 1-3: Log high-low range for different lookbacks
-    for lb in [1, 5, 15]:
-        idx = max(0, i - lb)
-        max_high = max(highs[idx:i + 1])
-        min_low = min(lows[idx:i + 1])
-        features.append(log_ratio(max_high, min_low))
-
-    # 4-6: Log return of high prices
-    for lb in [1, 5, 15]:
-        idx = max(0, i - lb)
-        features.append(log_ratio(highs[i], highs[idx]))
-
-    # 7-9: Log return of low prices
-    for lb in [1, 5, 15]:
-        idx = max(0, i - lb)
-        features.append(log_ratio(lows[i], lows[idx]))
-
-    # 10-12: Rolling std of log returns
-    log_returns = np.diff(np.log(closes[max(0, i - 59):i + 1]))
-    for window in [5, 15, 30]:
-        if len(log_returns) >= window:
-            features.append(float(np.std(log_returns[-window:])))
-        else:
-            features.append(float(np.std(log_returns)) if len(log_returns) > 0 else 0.0)
 
-    # 13: High-low range ratio
-    current_range = highs[i] - lows[i]
-    avg_range = np.mean(highs[max(0, i - 5):i + 1] - lows[max(0, i - 5):i + 1])
-    features.append(current_range / avg_range if avg_range > 0 else 1.0)
+@st.cache_resource
+def get_inference_cache():
+    return InferenceCache(maxsize=1024, ttl=300)
 
-    # 14: Price momentum (5m log return of close)
-    features.append(log_ratio(closes[i], closes[max(0, i - 5)]))
 
-    # 15: Volume-weighted volatility proxy
-    recent_vol = volumes[max(0, i - 5):i + 1]
-    recent_returns = np.abs(np.diff(np.log(closes[max(0, i - 5):i + 1])))
-    if len(recent_returns) > 0 and np.sum(recent_vol[1:]) > 0:
-        vwv = float(np.sum(recent_returns * recent_vol[1:]) / np.sum(recent_vol[1:]))
-    else:
-        vwv = 0.0
-    features.append(vwv)
+@st.cache_resource
+def get_inference_queue():
+    # Shared by every session; jobs outlive the script run that submitted them
+    return InferenceQueue(get_client_future(), infer=get_inference_cache().run_inference)
 
-    return features
 
+@st.cache_resource
+def get_result_store():
+    # One result per (pair, bar) for every viewer; SQLite extends that across processes
+    backend = SqliteBackend(RESULT_STORE_PATH) if RESULT_STORE_PATH else MemoryBackend()
+    return ResultStore(backend)
 
-def estimate_llmad_from_features(features):
-    """
-    Estimate LLMAD locally from the 15 engineered features.
-    
-    Since the model is a linear regression, we approximate the prediction
-    using a weighted combination of the volatility-related features.
-    The features already encode volatility information:
-    - Features 0-2: log high-low ranges (direct volatility measures)
-    - Features 9-11: rolling std of returns (variance measures)
-    - Feature 14: volume-weighted volatility proxy
-    """
-    # Weighted combination emphasizing the most volatility-relevant features
-    weights = [
-        0.15, 0.12, 0.08,   # HL Range 1m, 5m, 15m (most direct)
-        0.05, 0.04, 0.03,   # High LogRet 1m, 5m, 15m
-        0.05, 0.04, 0.03,   # Low LogRet 1m, 5m, 15m
-        0.12, 0.10, 0.07,   # RollStd 5m, 15m, 30m (strong signal)
-        0.02,                # Range Ratio
-        0.03,                # Momentum 5m
-        0.07,                # Vol-Wt Proxy
-    ]
-    
-    llmad = sum(abs(f) * w for f, w in zip(features, weights))
-    return llmad
-
-
-def llmad_to_fee(llmad_prediction):
-    """
-    Convert LLMAD volatility prediction to a dynamic fee.
 
-    Maps LLMAD range [0, 0.01] → fee range [0.05%, 0.80%].
-    Higher volatility → higher fee to compensate LPs for risk.
-    """
-    min_fee = 0.0005   # 0.05% — calm market
-    max_fee = 0.008    # 0.80% — very volatile market
-    llmad_max = 0.01   # expected max LLMAD for ETH/USDT
+def infer_for_bar(bar, price):
+    """Inference callable for the queue: one transaction per (pair, bar), logged once."""
+    def infer(client, features):
+        def compute():
+            result = get_inference_cache().run_inference(client, features)
+            llmad = result.get("llmad") if result.get("success") else None
+            get_ledger().record(PAIR, price, features, result,
+                                llmad_to_fee(llmad) if llmad is not None else None)
+            return result
+        return get_result_store().get_or_compute(PAIR, bar, compute)
+    return infer
+
+
+@st.cache_resource
+def get_ledger():
+    # Every session's fee decisions; bounded in memory, persisted if LEDGER_DIR is set
+    return InferenceLedger(LEDGER_DIR, capacity=1000)
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    # One /metrics server per process, shared by every session
+    return metrics.serve(int(METRICS_PORT)) if METRICS_PORT else None
 
-    # Normalize LLMAD to [0, 1]
-    normalized = min(abs(llmad_prediction) / llmad_max, 1.0)
 
-    # Map to fee range
-    fee = min_fee + normalized * (max_fee - min_fee)
-    return fee
+# ─── Fetch Live ETH/USDT Data ────────────────────────────────────────────────
+@st.cache_resource
+def get_archive():
+    return CandleArchive(ARCHIVE_DIR) if ARCHIVE_DIR else None
+
+
+@st.cache_resource
+def get_candle_cache(symbol="ETH", tsym="USDT", limit=120):
+    cache = CandleCache(limit=limit)
+    archive = get_archive()
+    if archive is not None:
+        # Warm start from disk; the first sync then only fetches the gap
+        cache.merge(symbol, tsym, archive.tail(symbol, tsym, limit + 1))
+    return cache
+
+
+@st.cache_resource
+def get_chart_pyramid(symbol="ETH", tsym="USDT"):
+    pyramid = ChartPyramid(maxlen=CHART_HISTORY)
+    archive = get_archive()
+    if archive is not None:
+        pyramid.extend(archive.tail(symbol, tsym, CHART_HISTORY))
+    return pyramid
 
 
-# ─── Run Inference ────────────────────────────────────────────────────────────
-def run_inference(client, features):
-    """Run on-chain inference via OpenGradient."""
-    feature_array = np.array([features], dtype=np.float32)
-    
-    # Local LLMAD estimate from features (always available)
-    local_llmad = estimate_llmad_from_features(features)
+@st.cache_data(ttl=120, max_entries=16)
+def fetch_ohlc(symbol="ETH", tsym="USDT", limit=120, bar=None):
+    """
+    Fetch minutely OHLC candles from CryptoCompare API (no geo-restrictions) as a CandleBuffer.
 
+    Only bars newer than the last cached one are downloaded; see CandleCache.
+    `bar` is the latest bar close and only keys the cache, so reruns within
+    one bar reuse the same fetch and the next one happens after the close.
+    """
+    cache = get_candle_cache(symbol, tsym, limit)
     try:
-        result = client.alpha.infer(
-            model_cid=MODEL_CID,
-            model_input={"X": feature_array},
-            inference_mode=og.InferenceMode.VANILLA,
-        )
-        # Try to get on-chain output, fallback to local estimate
-        on_chain_llmad = None
-        if result.model_output:
-            try:
-                on_chain_llmad = float(list(result.model_output.values())[0].flatten()[0])
-            except Exception:
-                pass
-        
-        return {
-            "success": True,
-            "tx_hash": result.transaction_hash,
-            "output": result.model_output,
-            "llmad": on_chain_llmad if on_chain_llmad is not None else local_llmad,
-            "source": "on-chain" if on_chain_llmad is not None else "local-estimate",
-        }
+        params = cache.request_params(symbol, tsym, time.time())
+        counter(API_REQUESTS).inc()
+        with timer("fetch"):
+            resp = requests.get(CRYPTOCOMPARE_API, params=params, timeout=10)
+            resp.raise_for_status()
+        with timer("parse"):
+            candles = cache.merge(symbol, tsym, parse_histominute(resp.json()))
+        if get_archive() is not None:
+            get_archive().append(symbol, tsym, candles)
+        get_chart_pyramid(symbol, tsym).extend(candles[-(limit + 1):])
+        return candles[-(limit + 1):]
+    except CryptoCompareError as e:
+        st.error(f"CryptoCompare error: {e}")
+        return CandleBuffer()
     except Exception as e:
-        error_msg = str(e)
-        if "InferenceResult event not found" in error_msg:
-            # Transaction succeeded on-chain but output not emitted (devnet)
-            # Use local estimate so the UI updates
-            return {
-                "success": True,
-                "tx_hash": "confirmed (devnet)",
-                "output": None,
-                "llmad": local_llmad,
-                "source": "local-estimate",
-                "devnet_note": True,
-            }
-        return {
-            "success": False,
-            "error": error_msg,
-        }
+        counter(API_ERRORS).inc(kind=type(e).__name__)
+        st.error(f"Failed to fetch price data: {e}")
+        return CandleBuffer()
+
+
+@st.cache_data(ttl=5)
+def fetch_service_fee(symbol="ETH", tsym="USDT"):
+    """Latest fee for the pool from the headless fee service, or None."""
+    if not FEE_SERVICE_URL:
+        return None
+    try:
+        resp = requests.get(f"{FEE_SERVICE_URL.rstrip('/')}/fees/{symbol}/{tsym}", timeout=2)
+        resp.raise_for_status()
+        return resp.json()
+    except Exception:
+        return None
 
 
 # ─── Session State ────────────────────────────────────────────────────────────
-if "inference_history" not in st.session_state:
-    st.session_state.inference_history = []
 if "last_result" not in st.session_state:
     st.session_state.last_result = None
+if "pending_job" not in st.session_state:
+    st.session_state.pending_job = None
+
 
+get_client_future()
 
 # ─── Title ────────────────────────────────────────────────────────────────────
 st.markdown("""
@@ -456,18 +398,33 @@ with st.sidebar:
     st.divider()
     st.caption("**Payment:** ETH (on-chain gas)")
     st.caption("**Inference:** VANILLA mode")
+    st.caption(f"**Fallback model:** {get_local_model().name}")
+    service_fee = fetch_service_fee()
+    if service_fee and service_fee.get("fee") is not None:
+        st.caption(f"**Fee service:** {service_fee['fee'] * 100:.4f}% ({service_fee['source']})")
     st.caption("**Network:** OpenGradient Devnet")
+    client_future = get_client_future()
+    if not client_future.done():
+        st.caption("**SDK:** connecting…")
+    elif client_future.exception() is not None:
+        st.caption(f"**SDK:** failed to initialize ({client_future.exception()})")
 
 
 # ─── Main Content ─────────────────────────────────────────────────────────────
-client = get_client()
+get_local_model()
+start_metrics_endpoint()
 
 # Fetch live data
-candles = fetch_ohlc()
+candles = fetch_ohlc(bar=bar_close(time.time() - FETCH_OFFSET))
 
 if candles:
-    current_price = candles[-1]["close"]
-    prev_price = candles[-2]["close"] if len(candles) > 1 else current_price
+    current_price = float(candles.close[-1])
+    current_bar = int(candles.last_time)
+    # Another viewer (or process) may already have paid for this bar's inference
+    shared_result = get_result_store().get(PAIR, current_bar)
+    if shared_result is not None and st.session_state.pending_job is None:
+        st.session_state.last_result = shared_result
+    prev_price = float(candles.close[-2]) if len(candles) > 1 else current_price
     price_change = ((current_price - prev_price) / prev_price) * 100
 
     # ─── Top Metrics Row ──────────────────────────────────────────────────
@@ -607,31 +564,38 @@ if candles:
     st.markdown("")
 
     # ─── Feature Engineering + Inference ──────────────────────────────────
-    features = engineer_features(candles)
+    with timer("features"):
+        try:
+            features = engineer_features(validate_candles(candles)[0])
+        except ValueError as e:
+            st.error(f"Unusable price data: {e}")
+            features = None  # skips the feature panel and inference below
 
     col_left, col_right = st.columns([2, 1])
 
     with col_left:
         # Price Chart
-        st.markdown('<div class="section-header">📈 ETH/USDT Price (Last 2 Hours)</div>',
-                    unsafe_allow_html=True)
+        chart_range = st.radio("Range", list(CHART_RANGES), horizontal=True,
+                               label_visibility="collapsed", key="chart_range")
+        # The pyramid serves at most MAX_POINTS bars at whichever resolution
+        # fits the range, so the figure stays small however far back it goes
+        chart_end = current_bar + 60
+        chart_interval, chart_bars = get_chart_pyramid().view(
+            chart_end - CHART_RANGES[chart_range], chart_end)
+        st.markdown(f'<div class="section-header">📈 ETH/USDT Price (Last {chart_range}, '
+                    f'{chart_interval // 60}m bars)</div>', unsafe_allow_html=True)
 
         import plotly.graph_objects as go
 
-        timestamps = [c["timestamp"] for c in candles]
-        closes = [c["close"] for c in candles]
-        highs = [c["high"] for c in candles]
-        lows = [c["low"] for c in candles]
-
         fig = go.Figure()
 
         # Candlestick
         fig.add_trace(go.Candlestick(
-            x=timestamps,
-            open=[c["open"] for c in candles],
-            high=highs,
-            low=lows,
-            close=closes,
+            x=chart_bars.timestamps,
+            open=chart_bars.open,
+            high=chart_bars.high,
+            low=chart_bars.low,
+            close=chart_bars.close,
             name="ETH/USDT",
             increasing_line_color="#10b981",
             decreasing_line_color="#ef4444",
@@ -663,16 +627,8 @@ if candles:
                     unsafe_allow_html=True)
 
         if features:
-            feature_names = [
-                "HL Range 1m", "HL Range 5m", "HL Range 15m",
-                "High LogRet 1m", "High LogRet 5m", "High LogRet 15m",
-                "Low LogRet 1m", "Low LogRet 5m", "Low LogRet 15m",
-                "RollStd 5m", "RollStd 15m", "RollStd 30m",
-                "Range Ratio", "Momentum 5m", "Vol-Wt Proxy",
-            ]
-
             feature_html = '<div class="feature-table">'
-            for name, val in zip(feature_names, features):
+            for name, val in zip(FEATURE_NAMES, features):
                 color = "#10b981" if val >= 0 else "#ef4444"
                 feature_html += f'<div style="display:flex;justify-content:space-between;padding:3px 0;border-bottom:1px solid rgba(99,102,241,0.08)">'
                 feature_html += f'<span style="color:#94a3b8;font-size:0.75rem">{name}</span>'
@@ -689,18 +645,32 @@ if candles:
                 unsafe_allow_html=True)
 
     if features:
-        if st.button("⚡ Run On-Chain Inference", use_container_width=True):
-            with st.spinner("Submitting transaction to OpenGradient network..."):
-                result = run_inference(client, features)
-
-            st.session_state.last_result = result
-            st.session_state.inference_history.append({
-                "time": datetime.now(timezone.utc).strftime("%H:%M:%S"),
-                "price": current_price,
-                "result": result,
-            })
+        queue = get_inference_queue()
+        if st.button("⚡ Run On-Chain Inference", use_container_width=True,
+                     disabled=st.session_state.pending_job is not None):
+            st.session_state.pending_job = queue.submit(
+                features, key=(PAIR, current_bar), infer=infer_for_bar(current_bar, current_price),
+                price=current_price)
+            st.rerun()
+
+        @st.fragment(run_every=1)
+        def inference_status():
+            job = queue.get(st.session_state.pending_job)
+            if job is None:
+                # Evicted, or the queue was rebuilt (cleared cache, restart):
+                # nothing will finish it, so release the button
+                st.session_state.pending_job = None
+                st.rerun()
+            if not job.done:
+                st.info(f"⏳ Transaction pending on OpenGradient network... ({job.elapsed:.0f}s)")
+                return
+            st.session_state.pending_job = None
+            st.session_state.last_result = job.result
             st.rerun()
 
+        if st.session_state.pending_job is not None:
+            inference_status()
+
         # Show last result
         if st.session_state.last_result:
             result = st.session_state.last_result
@@ -709,8 +679,9 @@ if candles:
                 col_a, col_b = st.columns(2)
 
                 with col_a:
+                    badge = "✓ Cached Result (no new transaction)" if result.get("cached") else "✓ Transaction Confirmed"
                     st.markdown(
-                        '<span class="status-badge status-success">✓ Transaction Confirmed</span>',
+                        f'<span class="status-badge status-success">{badge}</span>',
                         unsafe_allow_html=True)
 
                     st.markdown(f"""
@@ -754,23 +725,46 @@ if candles:
                 st.error(f"Inference failed: {result.get('error', 'Unknown')}")
 
     # ─── Inference History ────────────────────────────────────────────────
-    if st.session_state.inference_history:
+    ledger = get_ledger()
+    if len(ledger):
         st.markdown('<div class="section-header">📋 Inference History</div>',
                     unsafe_allow_html=True)
 
-        for idx, entry in enumerate(reversed(st.session_state.inference_history)):
-            r = entry["result"]
-            status = "✅" if r["success"] else "❌"
-            llmad_str = f'{r["llmad"]:.6f}' if r.get("llmad") else "pending"
+        per_page = 10
+        pages = (len(ledger) + per_page - 1) // per_page
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                   key="history_page")
+        for entry in ledger.page(page - 1, per_page):
+            ok = entry["source"] != "error"
+            stamp = datetime.fromtimestamp(entry["time"], tz=timezone.utc).strftime("%H:%M:%S")
+            llmad_str = f'{entry["llmad"]:.6f}' if ok else "failed"
+            fee_str = f'{entry["fee"] * 100:.4f}%' if ok else "—"
             st.markdown(
-                f"`{entry['time']}` {status} | Price: **${entry['price']:,.2f}** | "
-                f"LLMAD: `{llmad_str}` | "
-                f"TX: `{str(r.get('tx_hash', 'N/A'))[:20]}...`"
+                f"`{stamp}` {'✅' if ok else '❌'} | Price: **${entry['price']:,.2f}** | "
+                f"LLMAD: `{llmad_str}` | Fee: `{fee_str}` | "
+                f"TX: `{(entry['tx_hash'] or 'N/A')[:20]}...`"
             )
 
 else:
     st.error("⚠️ Could not fetch ETH/USDT price data. Check your internet connection.")
 
+# ─── Pipeline Metrics ────────────────────────────────────────────────────────
+with st.expander("⏱️ Pipeline Metrics"):
+    stage_rows = metrics.stage_table()
+    if stage_rows:
+        st.dataframe(stage_rows, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.2f")
+                                    for c in ("p50_ms", "p95_ms", "p99_ms", "max_ms")})
+    else:
+        st.caption("No timings recorded yet.")
+    counter_rows = metrics.counter_table()
+    if counter_rows:
+        st.dataframe(counter_rows, hide_index=True, use_container_width=True)
+    if METRICS_PORT:
+        st.caption(f"Prometheus endpoint: `http://127.0.0.1:{METRICS_PORT}/metrics`")
+
 # ─── Footer ──────────────────────────────────────────────────────────────────
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,166 @@
+"""
+Persistent on-disk archive of minute bars.
+
+Each pair is one append-only file of fixed-width `RECORD_DTYPE` records
+(48 bytes per bar, sorted by time). Reads memory-map the file, so a range
+query is a binary search plus a zero-copy CandleBuffer over the mapped
+pages: warm starts and backtests over months of history never touch the
+network.
+
+Backfill history from CryptoCompare:
+
+    python archive.py backfill ETH USDT --days 30 --root candles/
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from candles import RECORD_DTYPE, CandleBuffer
+from fetcher import AsyncCandleFetcher, parse_histominute
+
+INTERVAL = 60
+MAX_PAGE = 2000  # CryptoCompare's largest `limit`
+
+
+class CandleArchive:
+    """Append-only, memory-mapped minute-bar store rooted at a directory."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, fsym, tsym):
+        return os.path.join(self.root, f"{fsym}-{tsym}.bin")
+
+    def pairs(self):
+        """Every (fsym, tsym) pair with an archive file."""
+        out = []
+        for name in sorted(os.listdir(self.root)):
+            if name.endswith(".bin") and "-" in name:
+                fsym, tsym = name[:-4].split("-", 1)
+                out.append((fsym, tsym))
+        return out
+
+    def records(self, fsym, tsym):
+        """All archived records as a read-only memory-mapped structured array."""
+        path = self.path(fsym, tsym)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=RECORD_DTYPE)
+        # Ignore a torn trailing record left by an interrupted write
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    def last_time(self, fsym, tsym):
+        records = self.records(fsym, tsym)
+        return int(records["time"][-1]) if len(records) else None
+
+    def read(self, fsym, tsym, start=None, end=None):
+        """
+        Bars with start <= time < end as a zero-copy CandleBuffer.
+
+        Columns are strided views into the mapped file; appending to the
+        returned buffer copies it into memory first.
+        """
+        records = self.records(fsym, tsym)
+        times = records["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(records) if end is None else int(np.searchsorted(times, end, side="left"))
+        return CandleBuffer.from_records(records[lo:hi], copy=False)
+
+    def tail(self, fsym, tsym, count):
+        """The newest `count` archived bars."""
+        records = self.records(fsym, tsym)
+        return CandleBuffer.from_records(records[max(0, len(records) - count):], copy=False)
+
+    def append(self, fsym, tsym, candles, now=None):
+        """
+        Append closed bars newer than the archive's last bar.
+
+        A bar counts as closed once `time + INTERVAL <= now`, so the
+        still-forming last candle of a live fetch is never persisted.
+        Returns the number of bars written.
+        """
+        if not len(candles):
+            return 0
+        now = time.time() if now is None else now
+        times = candles.time
+        last = self.last_time(fsym, tsym)
+        lo = 0 if last is None else int(np.searchsorted(times, last, side="right"))
+        hi = int(np.searchsorted(times, now - INTERVAL, side="right"))
+        if hi <= lo:
+            return 0
+        records = candles[lo:hi].to_records()
+        # Keep the file strictly increasing even if the input was not
+        keep = np.concatenate([[True], np.diff(records["time"]) > 0])
+        records = records[keep]
+        self._truncate(fsym, tsym)
+        with open(self.path(fsym, tsym), "ab") as f:
+            f.write(records.tobytes())
+        return len(records)
+
+    def _truncate(self, fsym, tsym):
+        """Drop a torn trailing record so the next append stays aligned."""
+        path = self.path(fsym, tsym)
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % RECORD_DTYPE.itemsize:
+                os.truncate(path, size - size % RECORD_DTYPE.itemsize)
+
+
+# ─── Backfill ────────────────────────────────────────────────────────────────
+async def backfill(archive, fetcher, fsym, tsym, start, end=None):
+    """
+    Download [start, end) from CryptoCompare in pages of `MAX_PAGE` bars
+    and append it to the archive. Resumes after the last archived bar.
+    """
+    end = time.time() if end is None else end
+    last = archive.last_time(fsym, tsym)
+    if last is not None:
+        start = max(start, last + INTERVAL)
+
+    pages = []
+    to_ts = int(end)
+    while to_ts >= start:
+        raw = await fetcher.fetch_raw(fsym, tsym, limit=MAX_PAGE, to_ts=to_ts)
+        page = parse_histominute(raw)
+        page = page[int(np.searchsorted(page.time, start, side="left")):]
+        if not len(page):
+            break
+        pages.append(page)
+        to_ts = int(page.time[0]) - INTERVAL
+
+    written = 0
+    for page in reversed(pages):
+        written += archive.append(fsym, tsym, page, now=end)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="download history into the archive")
+    fill.add_argument("fsym")
+    fill.add_argument("tsym")
+    fill.add_argument("--days", type=float, default=1.0)
+    fill.add_argument("--root", default=os.getenv("CANDLE_ARCHIVE_DIR", "candles"))
+    args = parser.parse_args(argv)
+
+    archive = CandleArchive(args.root)
+    start = time.time() - args.days * 86400
+
+    async def run():
+        async with AsyncCandleFetcher() as fetcher:
+            return await backfill(archive, fetcher, args.fsym, args.tsym, start)
+
+    written = asyncio.run(run())
+    print(f"{args.fsym}/{args.tsym}: wrote {written} bars to {archive.path(args.fsym, args.tsym)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Columnar candle storage.
+
+`CandleBuffer` keeps minute bars in contiguous NumPy arrays (int64 epoch
+seconds plus float64 OHLCV) instead of a list of dicts. Column accessors
+return zero-copy views, so feature engineering, charting and inference can
+all read the same memory without rebuilding Python lists on every rerun.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+RECORD_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+class CandleBuffer:
+    """
+    Append-only OHLCV store backed by one NumPy array per column.
+
+    Indexing with an int returns a candle dict (the shape `fetch_ohlc` used
+    to return), and slicing returns a new buffer sharing the same memory.
+    When `maxlen` is set, only the newest `maxlen` bars are kept.
+    """
+
+    def __init__(self, capacity=256, maxlen=None):
+        if maxlen is not None:
+            capacity = max(capacity, 2 * maxlen)
+        self.maxlen = maxlen
+        self._start = 0
+        self._n = 0
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._cols = {name: np.empty(capacity, dtype=np.float64) for name in PRICE_COLUMNS}
+        self._owned = True
+
+    # ─── Constructors ────────────────────────────────────────────────────
+    @classmethod
+    def from_arrays(cls, time, open, high, low, close, volume, copy=True, maxlen=None):
+        """
+        Build a buffer from column arrays.
+
+        With `copy=False` the arrays are wrapped as-is (e.g. memory-mapped
+        archive columns); the first append then moves them into owned memory.
+        """
+        buf = cls.__new__(cls)
+        buf.maxlen = maxlen
+        convert = np.array if copy else np.asarray
+        buf._time = convert(time, dtype=np.int64)
+        buf._cols = {
+            name: convert(col, dtype=np.float64)
+            for name, col in zip(PRICE_COLUMNS, (open, high, low, close, volume))
+        }
+        buf._start = 0
+        buf._n = len(buf._time)
+        buf._owned = copy
+        if maxlen is not None:
+            buf.trim(maxlen)
+        return buf
+
+    @classmethod
+    def from_records(cls, records, copy=True, maxlen=None):
+        """Build a buffer from a structured array with `RECORD_DTYPE` fields."""
+        return cls.from_arrays(
+            records["time"], records["open"], records["high"],
+            records["low"], records["close"], records["volume"],
+            copy=copy, maxlen=maxlen,
+        )
+
+    @classmethod
+    def from_cryptocompare(cls, rows, maxlen=None):
+        """Build a buffer from the `Data.Data` rows of a `histominute` response."""
+        records = np.array(
+            [(c["time"], c["open"], c["high"], c["low"], c["close"], c["volumefrom"])
+             for c in rows],
+            dtype=RECORD_DTYPE,
+        )
+        return cls.from_records(records, maxlen=maxlen)
+
+    @classmethod
+    def from_candles(cls, candles, maxlen=None):
+        """Build a buffer from a list of candle dicts."""
+        records = np.array(
+            [(int(c["timestamp"].timestamp()), c["open"], c["high"], c["low"],
+              c["close"], c["volume"]) for c in candles],
+            dtype=RECORD_DTYPE,
+        )
+        return cls.from_records(records, maxlen=maxlen)
+
+    # ─── Column Views ────────────────────────────────────────────────────
+    def _view(self, col):
+        return col[self._start:self._start + self._n]
+
+    @property
+    def time(self):
+        return self._view(self._time)
+
+    @property
+    def timestamps(self):
+        """Bar open times as a datetime64[s] view (UTC)."""
+        return self.time.view("datetime64[s]")
+
+    @property
+    def open(self):
+        return self._view(self._cols["open"])
+
+    @property
+    def high(self):
+        return self._view(self._cols["high"])
+
+    @property
+    def low(self):
+        return self._view(self._cols["low"])
+
+    @property
+    def close(self):
+        return self._view(self._cols["close"])
+
+    @property
+    def volume(self):
+        return self._view(self._cols["volume"])
+
+    def column(self, name):
+        return self._view(self._time if name == "time" else self._cols[name])
+
+    @property
+    def last_time(self):
+        return int(self._time[self._start + self._n - 1]) if self._n else None
+
+    @property
+    def nbytes(self):
+        return self.time.nbytes + sum(self.column(name).nbytes for name in PRICE_COLUMNS)
+
+    def to_records(self):
+        """Copy the buffer into a structured `RECORD_DTYPE` array."""
+        out = np.empty(self._n, dtype=RECORD_DTYPE)
+        out["time"] = self.time
+        for name in PRICE_COLUMNS:
+            out[name] = self.column(name)
+        return out
+
+    # ─── Sequence Protocol ───────────────────────────────────────────────
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._n)
+            if step != 1:
+                raise ValueError("CandleBuffer slices must be contiguous")
+            lo, hi = self._start + start, self._start + max(start, stop)
+            return CandleBuffer.from_arrays(
+                self._time[lo:hi],
+                *(self._cols[name][lo:hi] for name in PRICE_COLUMNS),
+                copy=False,
+            )
+        i = self._start + range(self._n)[key]
+        return {
+            "timestamp": datetime.fromtimestamp(int(self._time[i]), tz=timezone.utc),
+            **{name: float(self._cols[name][i]) for name in PRICE_COLUMNS},
+        }
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def __getstate__(self):
+        # Pickle only the live bars, not the spare capacity
+        state = self.__dict__.copy()
+        state["_time"] = self.time.copy()
+        state["_cols"] = {name: self.column(name).copy() for name in PRICE_COLUMNS}
+        state["_start"] = 0
+        state["_owned"] = True
+        return state
+
+    def __repr__(self):
+        return f"CandleBuffer(len={self._n}, last_time={self.last_time})"
+
+    # ─── Mutation ────────────────────────────────────────────────────────
+    def _reserve(self, extra):
+        """Make room for `extra` more bars in owned, writeable memory."""
+        end = self._start + self._n + extra
+        if self._owned and end <= len(self._time):
+            return
+        capacity = len(self._time)
+        if not self._owned or self._n + extra > capacity // 2:
+            capacity = max(2 * (self._n + extra), 256)
+            if self.maxlen is not None:
+                capacity = max(capacity, 2 * self.maxlen)
+        # Always into fresh arrays, even when compacting at the same capacity:
+        # slices are views of the old storage and must keep their rows
+        time = np.empty(capacity, dtype=np.int64)
+        cols = {name: np.empty(capacity, dtype=np.float64) for name in PRICE_COLUMNS}
+        time[:self._n] = self.time
+        for name in PRICE_COLUMNS:
+            cols[name][:self._n] = self.column(name)
+        self._time, self._cols = time, cols
+        self._start = 0
+        self._owned = True
+
+    def append(self, time, open, high, low, close, volume):
+        """Append one bar."""
+        self._reserve(1)
+        n = self._start + self._n
+        self._time[n] = time
+        self._cols["open"][n] = open
+        self._cols["high"][n] = high
+        self._cols["low"][n] = low
+        self._cols["close"][n] = close
+        self._cols["volume"][n] = volume
+        self._n += 1
+        if self.maxlen is not None and self._n > self.maxlen:
+            self.trim(self.maxlen)
+
+    def extend(self, other):
+        """Append every bar of another buffer."""
+        k = len(other)
+        if k == 0:
+            return
+        self._reserve(k)
+        n = self._start + self._n
+        self._time[n:n + k] = other.time
+        for name in PRICE_COLUMNS:
+            self._cols[name][n:n + k] = other.column(name)
+        self._n += k
+        if self.maxlen is not None and self._n > self.maxlen:
+            self.trim(self.maxlen)
+
+    def set_last(self, open, high, low, close, volume):
+        """Overwrite the newest bar in place (e.g. a still-forming candle)."""
+        if not self._n:
+            raise IndexError("set_last on an empty CandleBuffer")
+        self._reserve(0)
+        n = self._start + self._n - 1
+        self._cols["open"][n] = open
+        self._cols["high"][n] = high
+        self._cols["low"][n] = low
+        self._cols["close"][n] = close
+        self._cols["volume"][n] = volume
+
+    def trim(self, maxlen):
+        """Keep only the newest `maxlen` bars (O(1); space is reclaimed on append)."""
+        drop = self._n - maxlen
+        if drop > 0:
+            self._start += drop
+            self._n = maxlen
@@ -0,0 +1,131 @@
+"""
+Downsampled chart data for long candle histories.
+
+`resample` aggregates minute bars into coarser OHLCV bars with one
+vectorized pass (`np.*.reduceat` over bucket boundaries). `ChartPyramid`
+keeps one CandleBuffer per level (1m -> 5m -> 1h by default) and updates
+them incrementally: appending base bars only re-aggregates the newest,
+possibly partial bucket of each level. `view(start, end)` picks the
+finest level that fits the visible range into `max_points` bars, so the
+figure a chart draws stays the same size however much history is loaded,
+and `since(interval, time)` returns just the bars a client that already
+has everything up to `time` is missing.
+"""
+
+import numpy as np
+
+from candles import PRICE_COLUMNS, CandleBuffer
+
+LEVELS = (60, 300, 3600)
+MAX_POINTS = 600
+
+
+def resample(candles, interval):
+    """Aggregate time-sorted bars into `interval`-second OHLCV bars."""
+    if not len(candles):
+        return CandleBuffer()
+    buckets = candles.time // interval * interval
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.concatenate([starts[1:], [len(buckets)]]) - 1
+    return CandleBuffer.from_arrays(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    )
+
+
+class ChartPyramid:
+    """
+    Minute bars plus pre-aggregated coarser levels, kept in sync.
+
+    `maxlen` bounds the base level (in bars); coarser levels are bounded
+    to the same time span.
+    """
+
+    def __init__(self, levels=LEVELS, max_points=MAX_POINTS, maxlen=None):
+        self.levels = tuple(sorted(levels))
+        self.max_points = max_points
+        base = self.levels[0]
+        self._buffers = {
+            interval: CandleBuffer(maxlen=maxlen if maxlen is None or interval == base
+                                   else maxlen * base // interval + 1)
+            for interval in self.levels
+        }
+
+    @property
+    def base(self):
+        return self._buffers[self.levels[0]]
+
+    def level(self, interval):
+        return self._buffers[interval]
+
+    def extend(self, candles):
+        """
+        Merge base-level bars: the still-forming last bar is replaced,
+        newer bars are appended, older ones ignored. Returns the number of
+        new base bars.
+        """
+        base = self.base
+        if not len(candles):
+            return 0
+        if len(base):
+            last = base.last_time
+            times = candles.time
+            same = int(times.searchsorted(last, side="left"))
+            if same < len(times) and times[same] == last:
+                base.set_last(*(float(candles.column(name)[same]) for name in PRICE_COLUMNS))
+            candles = candles[int(times.searchsorted(last, side="right")):]
+            changed_from = last
+        else:
+            changed_from = int(candles.time[0])
+        base.extend(candles)
+        for interval in self.levels[1:]:
+            self._refresh(interval, changed_from)
+        return len(candles)
+
+    def _refresh(self, interval, changed_from):
+        """Re-aggregate `interval` from the bucket containing `changed_from` onwards."""
+        level = self._buffers[interval]
+        start = changed_from // interval * interval
+        if len(level):
+            start = min(start, level.last_time)
+        base = self.base
+        tail = resample(base[int(base.time.searchsorted(start, side="left")):], interval)
+        if not len(tail):
+            return
+        if len(level) and tail.time[0] == level.last_time:
+            level.set_last(*(float(tail.column(name)[0]) for name in PRICE_COLUMNS))
+            tail = tail[1:]
+        level.extend(tail)
+
+    def choose(self, start, end):
+        """The finest level with at most `max_points` bars in [start, end)."""
+        for interval in self.levels:
+            if (end - start) / interval <= self.max_points:
+                return interval
+        return self.levels[-1]
+
+    def view(self, start=None, end=None):
+        """(interval, CandleBuffer) for the visible range [start, end)."""
+        base = self.base
+        if not len(base):
+            return self.levels[0], CandleBuffer()
+        start = int(base.time[0]) if start is None else start
+        end = base.last_time + self.levels[0] if end is None else end
+        interval = self.choose(start, end)
+        level = self._buffers[interval]
+        lo = int(level.time.searchsorted(start // interval * interval, side="left"))
+        hi = int(level.time.searchsorted(end, side="left"))
+        bars = level[lo:hi]
+        if len(bars) > self.max_points:  # range wider than the coarsest level allows
+            bars = bars[len(bars) - self.max_points:]
+        return interval, bars
+
+    def since(self, interval, time):
+        """Bars at `interval` with bar time >= `time`: the delta for a client that
+        already holds everything before `time` (its last, possibly partial, bar included)."""
+        level = self._buffers[interval]
+        return level[int(level.time.searchsorted(time, side="left")):]
@@ -0,0 +1,5 @@
+"""Shared constants for the fee optimizer app and its helper modules."""
+
+MODEL_CID = "ur_9aUT9KW3RbAj3nsqP1Fors3tblkUf4Hw4D0QFDXc"
+CRYPTOCOMPARE_API = "https://min-api.cryptocompare.com/data/v2/histominute"
+STATIC_FEE = 0.003  # Standard 0.30% Uniswap fee for comparison
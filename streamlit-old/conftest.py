@@ -0,0 +1,249 @@
+"""Shared pytest fixtures for the fee optimizer modules."""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from aiohttp import web
+
+# test_model.py is a manual smoke script against the live network.
+collect_ignore = ["test_model.py"]
+
+
+def synthetic_candles(n, seed=0, start=1_700_000_000, price=2500.0):
+    """Random-walk minute candles in the same shape `fetch_ohlc` returns."""
+    rng = np.random.default_rng(seed)
+    closes = price * np.exp(np.cumsum(rng.normal(0.0, 0.001, n)))
+    opens = np.concatenate([[price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.0008, n))
+    lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.0008, n))
+    volumes = rng.uniform(5, 500, n)
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(start + 60 * k, tz=timezone.utc),
+            "open": float(opens[k]),
+            "high": float(highs[k]),
+            "low": float(lows[k]),
+            "close": float(closes[k]),
+            "volume": float(volumes[k]),
+        }
+        for k in range(n)
+    ]
+
+
+def synthetic_buffer(n, seed=0, start=1_700_000_000, price=2500.0):
+    """Like `synthetic_candles`, built straight into a CandleBuffer (fast for large n)."""
+    from candles import CandleBuffer
+
+    rng = np.random.default_rng(seed)
+    closes = price * np.exp(np.cumsum(rng.normal(0.0, 0.001, n)))
+    opens = np.concatenate([[price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.0008, n))
+    lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.0008, n))
+    times = start + 60 * np.arange(n, dtype=np.int64)
+    return CandleBuffer.from_arrays(times, opens, highs, lows, closes, rng.uniform(5, 500, n))
+
+
+@pytest.fixture
+def make_candles():
+    return synthetic_candles
+
+
+@pytest.fixture
+def make_buffer():
+    return synthetic_buffer
+
+
+class StubCryptoCompare:
+    """
+    Local HTTP server mimicking CryptoCompare's `histominute` endpoint.
+
+    Serves deterministic bars for any pair, ending at `now` (or `toTs`).
+    `fail_next[(fsym, tsym)] = k` makes the next k requests for that pair
+    answer HTTP 500; `delay` adds latency to every response.
+    """
+
+    def __init__(self, now=1_700_100_000, delay=0.0):
+        self.now = now
+        self.delay = delay
+        self.fail_next = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.url = None
+        self._loop = None
+        self._runner = None
+
+    def bar(self, fsym, t):
+        base = 100.0 + (sum(map(ord, fsym)) % 50) * 10
+        price = base * (1 + 0.001 * np.sin(t / 600.0))
+        return {
+            "time": t, "open": price, "high": price * 1.0005, "low": price * 0.9995,
+            "close": price, "volumefrom": 10.0 + (t // 60) % 7, "volumeto": 0.0,
+        }
+
+    async def _handle(self, request):
+        q = request.query
+        fsym, tsym = q["fsym"], q["tsym"]
+        limit = int(q.get("limit", 1440))
+        to_ts = int(q.get("toTs", self.now))
+        self.requests.append(dict(q))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.fail_next.get((fsym, tsym), 0) > 0:
+                self.fail_next[(fsym, tsym)] -= 1
+                return web.Response(status=500)
+            if fsym == "BAD":
+                return web.json_response({"Response": "Error", "Message": "unknown pair"})
+            end = min(to_ts, self.now) // 60 * 60
+            rows = [self.bar(fsym, end - 60 * k) for k in range(limit, -1, -1)]
+            return web.json_response({"Response": "Success", "Data": {"Data": rows}})
+        finally:
+            self.in_flight -= 1
+
+    def start(self):
+        ready = threading.Event()
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get("/data/v2/histominute", self._handle)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}/data/v2/histominute"
+            ready.set()
+
+        self._loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop)
+        ready.wait(5)
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+@pytest.fixture
+def cryptocompare():
+    server = StubCryptoCompare().start()
+    yield server
+    server.stop()
+
+
+class StubBinanceStream:
+    """
+    Local WebSocket server replaying scripted Binance stream messages.
+
+    `sessions` is a list with one list of messages per connection: the
+    k-th connection receives the k-th list and is then closed by the
+    server, which is how a test drops the stream. Connections beyond the
+    script stay open and silent. `paths` records each request path.
+    """
+
+    def __init__(self, sessions=()):
+        self.sessions = list(sessions)
+        self.paths = []
+        self.url = None
+        self._loop = None
+        self._server = None
+
+    async def _handle(self, ws):
+        k = len(self.paths)
+        self.paths.append(ws.request.path)
+        if k >= len(self.sessions):
+            await ws.wait_closed()
+            return
+        for message in self.sessions[k]:
+            await ws.send(json.dumps(message))
+        await ws.close()
+
+    def start(self):
+        from websockets.asyncio.server import serve
+
+        async def start():
+            self._server = await serve(self._handle, "127.0.0.1", 0)
+            port = self._server.sockets[0].getsockname()[1]
+            self.url = f"ws://127.0.0.1:{port}"
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(start(), self._loop).result(5)
+        return self
+
+    def stop(self):
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+@pytest.fixture
+def binance_stream():
+    servers = []
+
+    def start(sessions):
+        servers.append(StubBinanceStream(sessions).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+class MockInferenceResult:
+    def __init__(self, transaction_hash, model_output):
+        self.transaction_hash = transaction_hash
+        self.model_output = model_output
+
+
+class MockOpenGradientClient:
+    """
+    Stand-in for `og.init(...)`: `client.alpha.infer` returns a linear
+    model's output for every row of `model_input["X"]`.
+
+    `error` makes every call raise it; `output=False` returns an empty
+    `model_output`; `delay` adds latency per call.
+    """
+
+    def __init__(self, error=None, output=True, delay=0.0):
+        self.alpha = self
+        self.error = error
+        self.output = output
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def expected(rows):
+        return np.asarray(rows, dtype=np.float32).sum(axis=1) * 0.01
+
+    def infer(self, model_cid, model_input, inference_mode):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(model_input["X"])
+            tx_hash = f"0x{len(self.calls):064x}"
+        if self.error is not None:
+            raise self.error
+        if not self.output:
+            return MockInferenceResult(tx_hash, {})
+        y = self.expected(model_input["X"])[:, None]
+        return MockInferenceResult(tx_hash, {"Y": y})
+
+
+@pytest.fixture
+def og_client():
+    return MockOpenGradientClient()
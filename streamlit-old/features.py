@@ -0,0 +1,229 @@
+"""
+Feature engineering for the AMM fee model.
+
+`engineer_features` computes the 15 model features for the latest candle.
+`engineer_features_batch` computes the same features for every candle index
+of a history in one vectorized pass (used for backfills and backtests).
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from candles import CandleBuffer
+
+FEATURE_NAMES = [
+    "HL Range 1m", "HL Range 5m", "HL Range 15m",
+    "High LogRet 1m", "High LogRet 5m", "High LogRet 15m",
+    "Low LogRet 1m", "Low LogRet 5m", "Low LogRet 15m",
+    "RollStd 5m", "RollStd 15m", "RollStd 30m",
+    "Range Ratio", "Momentum 5m", "Vol-Wt Proxy",
+]
+N_FEATURES = len(FEATURE_NAMES)
+MIN_CANDLES = 60
+
+LOOKBACKS = [1, 5, 15]
+STD_WINDOWS = [5, 15, 30]
+RANGE_WINDOW = 5      # bars before the current one in the range-ratio average
+MOMENTUM_LOOKBACK = 5
+VWV_WINDOW = 5        # returns in the volume-weighted volatility proxy
+
+
+def _columns(candles):
+    """Return (highs, lows, closes, volumes) as float64 arrays."""
+    if isinstance(candles, CandleBuffer):
+        return candles.high, candles.low, candles.close, candles.volume
+    highs = np.array([c["high"] for c in candles], dtype=np.float64)
+    lows = np.array([c["low"] for c in candles], dtype=np.float64)
+    closes = np.array([c["close"] for c in candles], dtype=np.float64)
+    volumes = np.array([c["volume"] for c in candles], dtype=np.float64)
+    return highs, lows, closes, volumes
+
+
+# ─── Single Candle ───────────────────────────────────────────────────────────
+def engineer_features(candles):
+    """
+    Generate 15 financial features from OHLC data.
+
+    Based on the paper: features are engineered functions of prior high and low
+    prices over varying timeframes, selected using Lasso.
+
+    Features:
+    1-3:  Log high-low range for 1m, 5m, 15m lookbacks
+    4-6:  Log return of high prices for 1m, 5m, 15m lookbacks
+    7-9:  Log return of low prices for 1m, 5m, 15m lookbacks
+    10-12: Rolling std of log returns for 5m, 15m, 30m windows
+    13:   High-low range ratio (current vs 5m avg)
+    14:   Price momentum (5m log return of close)
+    15:   Volume-weighted volatility proxy
+    """
+    if len(candles) < MIN_CANDLES:
+        return None
+
+    highs, lows, closes, volumes = _columns(candles)
+
+    # Use the most recent data point
+    i = len(candles) - 1
+
+    # Safe log ratio helper
+    def log_ratio(a, b):
+        if b <= 0 or a <= 0:
+            return 0.0
+        return math.log(a / b)
+
+    features = []
+
+    # 1-3: Log high-low range for different lookbacks
+    for lb in LOOKBACKS:
+        idx = max(0, i - lb)
+        max_high = max(highs[idx:i + 1])
+        min_low = min(lows[idx:i + 1])
+        features.append(log_ratio(max_high, min_low))
+
+    # 4-6: Log return of high prices
+    for lb in LOOKBACKS:
+        idx = max(0, i - lb)
+        features.append(log_ratio(highs[i], highs[idx]))
+
+    # 7-9: Log return of low prices
+    for lb in LOOKBACKS:
+        idx = max(0, i - lb)
+        features.append(log_ratio(lows[i], lows[idx]))
+
+    # 10-12: Rolling std of log returns
+    log_returns = np.diff(np.log(closes[max(0, i - 59):i + 1]))
+    for window in STD_WINDOWS:
+        if len(log_returns) >= window:
+            features.append(float(np.std(log_returns[-window:])))
+        else:
+            features.append(float(np.std(log_returns)) if len(log_returns) > 0 else 0.0)
+
+    # 13: High-low range ratio
+    current_range = highs[i] - lows[i]
+    avg_range = np.mean(highs[max(0, i - 5):i + 1] - lows[max(0, i - 5):i + 1])
+    features.append(current_range / avg_range if avg_range > 0 else 1.0)
+
+    # 14: Price momentum (5m log return of close)
+    features.append(log_ratio(closes[i], closes[max(0, i - 5)]))
+
+    # 15: Volume-weighted volatility proxy
+    recent_vol = volumes[max(0, i - 5):i + 1]
+    recent_returns = np.abs(np.diff(np.log(closes[max(0, i - 5):i + 1])))
+    if len(recent_returns) > 0 and np.sum(recent_vol[1:]) > 0:
+        vwv = float(np.sum(recent_returns * recent_vol[1:]) / np.sum(recent_vol[1:]))
+    else:
+        vwv = 0.0
+    features.append(vwv)
+
+    return features
+
+
+# ─── Batch (every candle index) ──────────────────────────────────────────────
+def _lagged(x, lag):
+    """x[max(0, i - lag)] for every i."""
+    out = np.empty_like(x)
+    out[lag:] = x[:-lag]
+    out[:lag] = x[0]
+    return out
+
+
+def _safe_log_ratio(a, b):
+    """Vectorized `log_ratio`: log(a / b), or 0.0 where either side is <= 0."""
+    ok = (a > 0) & (b > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, np.log(np.where(ok, a, 1.0) / np.where(ok, b, 1.0)), 0.0)
+
+
+def _log_ratio(a, b):
+    """log(a / b) for inputs already known to be positive."""
+    return np.log(a / b)
+
+
+def _rolling_std(log_returns, n, window):
+    """
+    Std of the last `window` log returns ending at each candle index.
+
+    Candles with fewer than `window` prior returns use every return they
+    have, and candle 0 (no returns) gets 0.0, matching `engineer_features`.
+    """
+    out = np.zeros(n)
+    if n < 2:
+        return out
+    if len(log_returns) >= window:
+        out[window:] = np.std(sliding_window_view(log_returns, window), axis=1)
+    head = min(window, n)
+    if head > 1:
+        padded = np.full(2 * window - 1, np.nan)
+        padded[window - 1:window - 1 + head - 1] = log_returns[:head - 1]
+        windows = sliding_window_view(padded, window)[:head - 1]
+        out[1:head] = np.nanstd(windows, axis=1)
+    return out
+
+
+def _rolling_sum(x, window):
+    """Sum of x[max(0, i - window + 1):i + 1] for every i."""
+    padded = np.concatenate([np.zeros(window - 1), x])
+    return sliding_window_view(padded, window).sum(axis=1)
+
+
+def engineer_features_batch(candles, clean=False):
+    """
+    Compute the 15 features for every candle index in one vectorized pass.
+
+    Row i equals `engineer_features(candles[:i + 1])` for every i >= 59.
+    Earlier rows are warm-up rows computed over the truncated windows that
+    are available; callers that need model-ready rows should drop the first
+    `MIN_CANDLES - 1` of them.
+
+    `clean=True` promises strictly positive, finite prices (see
+    `validation.validate_candles`) and skips the per-value guards.
+
+    Returns an (N, 15) float32 array.
+    """
+    highs, lows, closes, volumes = _columns(candles)
+    n = len(closes)
+    out = np.zeros((n, N_FEATURES), dtype=np.float32)
+    if n == 0:
+        return out
+
+    log_ratio = _log_ratio if clean else _safe_log_ratio
+
+    # 1-3: Log high-low range (max/min over the last lb + 1 bars)
+    for col, lb in enumerate(LOOKBACKS):
+        pad_h = np.concatenate([np.full(lb, highs[0]), highs])
+        pad_l = np.concatenate([np.full(lb, lows[0]), lows])
+        max_high = sliding_window_view(pad_h, lb + 1).max(axis=1)
+        min_low = sliding_window_view(pad_l, lb + 1).min(axis=1)
+        out[:, col] = log_ratio(max_high, min_low)
+
+    # 4-9: Log return of high and low prices
+    for col, lb in enumerate(LOOKBACKS):
+        out[:, 3 + col] = log_ratio(highs, _lagged(highs, lb))
+        out[:, 6 + col] = log_ratio(lows, _lagged(lows, lb))
+
+    # 10-12: Rolling std of log returns
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_returns = np.diff(np.log(closes))
+    for col, window in enumerate(STD_WINDOWS):
+        out[:, 9 + col] = _rolling_std(log_returns, n, window)
+
+    # 13: High-low range ratio
+    ranges = highs - lows
+    counts = np.minimum(np.arange(1, n + 1), RANGE_WINDOW + 1)
+    avg_range = _rolling_sum(ranges, RANGE_WINDOW + 1) / counts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 12] = np.where(avg_range > 0, ranges / avg_range, 1.0)
+
+    # 14: Price momentum
+    out[:, 13] = log_ratio(closes, _lagged(closes, MOMENTUM_LOOKBACK))
+
+    # 15: Volume-weighted volatility proxy (return k weighted by volume k)
+    weights = np.concatenate([[0.0], volumes[1:]])
+    weighted = np.concatenate([[0.0], np.abs(log_returns) * volumes[1:]])
+    num = _rolling_sum(weighted, VWV_WINDOW)
+    den = _rolling_sum(weights, VWV_WINDOW)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 14] = np.where(den > 0, num / den, 0.0)
+
+    return out
@@ -0,0 +1,376 @@
+"""
+Headless multi-pool fee service.
+
+Keeps minute bars for every configured pair in one bounded `CandleCache`,
+and just after each bar closes (see `scheduler.BarScheduler`) syncs them
+all over a pooled async session, engineers features on the closed bars,
+runs one batched inference for every pair whose features changed, and
+maps the LLMADs to fees. The latest fee per pool is served
+as JSON over a small local HTTP endpoint, so the Streamlit app (and
+anything else) can read fees without running the pipeline itself.
+
+With `--stream`, bars are built from Binance's live trade stream (see
+`ticks.TickConsumer`) instead of polled from CryptoCompare, which is then
+only used to backfill history and gaps.
+
+    python -m feeopt serve --pairs ETH/USDT,BTC/USDT --port 8080
+
+Endpoints:
+    GET /health                 service status and last update round
+    GET /fees                   latest fee for every pool
+    GET /fees/{fsym}/{tsym}     latest fee for one pool
+    GET /metrics                stage latencies and counters, Prometheus text format
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+from aiohttp import web
+
+from candles import CandleBuffer
+from config import CRYPTOCOMPARE_API
+from features import MIN_CANDLES, engineer_features
+from fees import llmad_to_fee
+from fetcher import AsyncCandleFetcher, CandleCache
+from inference import InferenceCache, local_estimate_batch, run_inference_batch, set_local_model
+from ledger import InferenceLedger
+from metrics import CONTENT_TYPE, METRICS, STAGE_SECONDS, histogram, record_inference, timer
+from scheduler import CATCH_UP_MODES, BarScheduler
+from smoothing import FeeSmoother
+from ticks import BINANCE_WS, TickConsumer, cryptocompare_backfill
+from validation import validate_candles
+
+log = logging.getLogger("feeopt")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+
+def parse_pairs(text):
+    """"ETH/USDT,BTC/USDT" (or one pair per line) -> [("ETH", "USDT"), ...]."""
+    pairs = []
+    for item in text.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item or item.startswith("#"):
+            continue
+        fsym, _, tsym = item.partition("/")
+        if not tsym:
+            raise ValueError(f"expected FSYM/TSYM, got {item!r}")
+        pairs.append((fsym.strip().upper(), tsym.strip().upper()))
+    return list(dict.fromkeys(pairs))
+
+
+class FeeService:
+    """
+    Computes the latest dynamic fee for many pools.
+
+    Memory is bounded by construction: the candle cache keeps `limit + 1`
+    bars per pair, the inference cache holds at most `cache_size` results,
+    and `latest` holds one small record per pair. `client` is an
+    OpenGradient client; without one, fees come from the local model.
+    `stream` is an unstarted `ticks.TickConsumer` for the same pairs;
+    when given, rounds read the bars it builds instead of polling.
+    `smoother` (a `smoothing.FeeSmoother`) decides which new fees are
+    worth publishing; `fee` is then the fee in effect on the pool.
+    """
+
+    def __init__(self, pairs, client=None, limit=120, max_batch_size=64, cache_size=4096,
+                 cache_ttl=300.0, fetcher_options=None, ledger=None, stream=None, smoother=None):
+        self.pairs = list(pairs)
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.candles = CandleCache(limit=limit)
+        self.cache = InferenceCache(maxsize=cache_size, ttl=cache_ttl)
+        self.fetcher = AsyncCandleFetcher(**(fetcher_options or {}))
+        self.ledger = ledger
+        self.latest = {}
+        self.rounds = 0
+        self.last_round = None
+        self.scheduler = None
+        self.stream = stream
+        self.smoother = smoother
+        if stream is not None:
+            stream.on_bars = self._on_bars
+
+    def _on_bars(self, pair, bars, features):
+        self.candles.merge(pair[0], pair[1], bars)
+
+    async def open(self):
+        await self.fetcher.open()
+
+    async def close(self):
+        await self.fetcher.close()
+
+    def _infer(self, rows):
+        if self.client is None:
+            results = [{"success": True, "tx_hash": None, "llmad": float(llmad), "source": "local-model"}
+                       for llmad in local_estimate_batch(rows)]
+            for result in results:
+                record_inference(result)
+            return results
+        return run_inference_batch(self.client, rows, self.max_batch_size)
+
+    async def update(self, now=None, bar_close=None):
+        """
+        One round over every pair: sync bars, engineer features, run one
+        batched inference for the cache misses and refresh `latest`.
+
+        With `bar_close`, features use only bars that closed by then, so a
+        round's fee depends on the bar it is for, not on when it ran.
+        Returns a summary dict of the round.
+        """
+        now = time.time() if now is None else now
+        t0 = time.perf_counter()
+        if self.stream is not None:
+            synced = {pair: self.candles.get(*pair) or CandleBuffer() for pair in self.pairs}
+        else:
+            with timer("sync"):
+                synced = await self.candles.sync_many(self.fetcher, self.pairs, now=now,
+                                                      return_exceptions=True)
+
+        ready, rows, errors = [], [], 0
+        with timer("features"):
+            for pair, candles in synced.items():
+                if isinstance(candles, BaseException):
+                    errors += 1
+                    self._record_error(pair, f"fetch failed: {candles!r}", now)
+                    continue
+                if bar_close is not None:
+                    candles = candles[:int(candles.time.searchsorted(bar_close, side="left"))]
+                try:
+                    candles = validate_candles(candles)[0]
+                except ValueError as e:
+                    errors += 1
+                    self._record_error(pair, str(e), now)
+                    continue
+                if len(candles) < MIN_CANDLES:
+                    self._record_error(pair, f"only {len(candles)} closed bars", now)
+                    continue
+                ready.append((pair, candles))
+                rows.append(engineer_features(candles))
+
+        results = [None] * len(ready)
+        misses = []
+        for k, features in enumerate(rows):
+            hit = self.cache.get(features, now=now)
+            if hit is not None:
+                results[k] = hit
+            else:
+                misses.append(k)
+
+        if misses:
+            batch = np.asarray([rows[k] for k in misses], dtype=np.float32)
+            # The OpenGradient client blocks; keep the HTTP endpoint responsive
+            with timer("infer"):
+                fresh = await asyncio.get_running_loop().run_in_executor(None, self._infer, batch)
+            for k, result in zip(misses, fresh):
+                self.cache.put(rows[k], result, now=now)
+                results[k] = result
+
+        for (pair, candles), result in zip(ready, results):
+            if result.get("success"):
+                self._record_fee(pair, candles, result, now)
+            else:
+                errors += 1
+                self._record_error(pair, result.get("error", "inference failed"), now)
+
+        if self.ledger is not None and ready:
+            self.ledger.append(np.concatenate([
+                self.ledger.entry(f"{pair[0]}/{pair[1]}", float(candles.close[-1]), features, result,
+                                  self.latest[pair]["fee"] if result.get("success") else None, now)
+                for (pair, candles), features, result in zip(ready, rows, results)
+            ]))
+
+        self.rounds += 1
+        histogram(STAGE_SECONDS).observe(time.perf_counter() - t0, stage="round")
+        self.last_round = {
+            "time": now,
+            "bar_close": bar_close,
+            "pairs": len(self.pairs),
+            "updated": len(ready) - sum(1 for r in results if not r.get("success")),
+            "inferred": len(misses),
+            "errors": errors,
+            "seconds": time.perf_counter() - t0,
+        }
+        return self.last_round
+
+    def _record_fee(self, pair, candles, result, now):
+        fee = raw_fee = llmad_to_fee(result["llmad"])
+        published = True
+        if self.smoother is not None:
+            decision = self.smoother.update(pair, raw_fee, now)
+            fee, published = decision["fee"], decision["publish"]
+        self.latest[pair] = {
+            "pair": f"{pair[0]}/{pair[1]}",
+            "fee": fee,
+            "raw_fee": raw_fee,
+            "published": published,
+            "llmad": result["llmad"],
+            "source": result.get("source"),
+            "cached": bool(result.get("cached")),
+            "tx_hash": result.get("tx_hash"),
+            "price": float(candles.close[-1]),
+            "bar_time": int(candles.last_time),
+            "updated_at": now,
+            "error": None,
+        }
+
+    def _record_error(self, pair, message, now):
+        # Keep serving the last good fee; just flag it as stale
+        entry = dict(self.latest.get(pair) or {"pair": f"{pair[0]}/{pair[1]}", "fee": None})
+        entry["error"] = message
+        entry["error_at"] = now
+        self.latest[pair] = entry
+
+    def snapshot(self):
+        return [self.latest[pair] for pair in self.pairs if pair in self.latest]
+
+    async def on_tick(self, tick):
+        """Scheduler callback: one round for the bar that just closed."""
+        summary = await self.update(bar_close=tick.bar_close)
+        summary["start_delay"] = tick.delay
+        summary["publish_delay"] = time.time() - tick.bar_close
+        summary["missed"] = tick.missed
+        log.info("bar %d: %d/%d pools updated, %d inferred, %d errors, published %.2fs after close",
+                 tick.bar_close, summary["updated"], summary["pairs"], summary["inferred"],
+                 summary["errors"], summary["publish_delay"])
+
+    async def run(self, scheduler=None, stop=None):
+        """Run one round per closed bar on `scheduler` until `stop` is set."""
+        self.scheduler = scheduler or BarScheduler()
+        await self.scheduler.run(self.on_tick, stop=stop)
+
+
+# ─── HTTP Endpoint ───────────────────────────────────────────────────────────
+def create_app(service):
+    """aiohttp application serving `service`'s latest fees as JSON."""
+
+    async def health(request):
+        return web.json_response({
+            "status": "ok" if service.rounds else "starting",
+            "pairs": len(service.pairs),
+            "rounds": service.rounds,
+            "last_round": service.last_round,
+            "cache": service.cache.stats(),
+            "scheduler": service.scheduler.stats() if service.scheduler else None,
+            "stream": service.stream.stats() if service.stream else None,
+            "smoothing": service.smoother.stats() if service.smoother else None,
+        })
+
+    async def fees(request):
+        return web.json_response({"fees": service.snapshot()})
+
+    async def metrics(request):
+        return web.Response(body=METRICS.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def fee(request):
+        pair = (request.match_info["fsym"].upper(), request.match_info["tsym"].upper())
+        entry = service.latest.get(pair)
+        if entry is None:
+            raise web.HTTPNotFound(text=f"no fee for {pair[0]}/{pair[1]}")
+        return web.json_response(entry)
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    app.router.add_get("/fees", fees)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/fees/{fsym}/{tsym}", fee)
+    return app
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, scheduler=None, stop=None):
+    """Run the update loop and the HTTP endpoint until `stop` is set."""
+    stop = stop or asyncio.Event()
+    runner = web.AppRunner(create_app(service))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info("serving %d pools on http://%s:%d", len(service.pairs), host, port)
+    await service.open()
+    consumer = asyncio.ensure_future(service.stream.run(stop)) if service.stream else None
+    try:
+        await service.run(scheduler, stop=stop)
+    finally:
+        stop.set()
+        if consumer is not None:
+            await consumer
+        await service.close()
+        await runner.cleanup()
+
+
+def make_client(local_only=False):
+    """An OpenGradient client from PRIVATE_KEY, or None to use the local model."""
+    private_key = os.getenv("PRIVATE_KEY")
+    if local_only or not private_key:
+        return None
+    import opengradient as og
+    return og.init(private_key=private_key)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m feeopt", description="Multi-pool fee service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("serve", help="compute fees for many pools and serve them over HTTP")
+    run.add_argument("--pairs", default=os.getenv("FEEOPT_PAIRS", "ETH/USDT"),
+                     help="comma-separated FSYM/TSYM list")
+    run.add_argument("--pairs-file", help="file with one FSYM/TSYM per line")
+    run.add_argument("--host", default=DEFAULT_HOST)
+    run.add_argument("--port", type=int, default=DEFAULT_PORT)
+    run.add_argument("--offset", type=float, default=2.0,
+                     help="seconds after each bar close to start a round")
+    run.add_argument("--jitter", type=float, default=0.0,
+                     help="random extra delay (s) to spread load across instances")
+    run.add_argument("--catch-up", choices=CATCH_UP_MODES, default="coalesce",
+                     help="after missed bars: one round for the newest bar, or one per bar")
+    run.add_argument("--limit", type=int, default=120, help="bars kept per pool")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--ledger-dir", default=os.getenv("INFERENCE_LEDGER_DIR"),
+                     help="append every fee decision to a columnar log here")
+    run.add_argument("--local-only", action="store_true", help="never submit on-chain inferences")
+    run.add_argument("--stream", action="store_true",
+                     help="build bars from the Binance trade stream instead of polling")
+    run.add_argument("--stream-url", default=BINANCE_WS)
+    run.add_argument("--smooth", action="store_true",
+                     help="publish a new fee only when FeeSmoother's rules allow it")
+    run.add_argument("--min-change-bps", type=float, default=5.0)
+    run.add_argument("--min-interval", type=float, default=300.0,
+                     help="seconds between fee publications per pool (rises of --urgent-bps excepted)")
+    run.add_argument("--urgent-bps", type=float, default=25.0)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    pairs = parse_pairs(args.pairs)
+    if args.pairs_file:
+        with open(args.pairs_file) as f:
+            pairs = parse_pairs(f.read())
+
+    from local_model import load_local_model
+    set_local_model(load_local_model())
+
+    stream = (TickConsumer(pairs, url=args.stream_url, warmup=args.limit, maxlen=args.limit + 1)
+              if args.stream else None)
+    service = FeeService(pairs, client=make_client(args.local_only), limit=args.limit,
+                         fetcher_options={"base_url": CRYPTOCOMPARE_API,
+                                          "concurrency": args.concurrency},
+                         ledger=InferenceLedger(args.ledger_dir) if args.ledger_dir else None,
+                         stream=stream,
+                         smoother=FeeSmoother(min_change_bps=args.min_change_bps,
+                                              min_interval=args.min_interval,
+                                              urgent_bps=args.urgent_bps) if args.smooth else None)
+    if stream is not None:
+        stream.backfill = cryptocompare_backfill(service.fetcher)
+    try:
+        scheduler = BarScheduler(offset=args.offset, jitter=args.jitter, catch_up=args.catch_up)
+        asyncio.run(serve(service, args.host, args.port, scheduler))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+LLMAD → dynamic fee mapping.
+
+`llmad_to_fee` maps one prediction; `llmad_to_fee_batch` is the same
+linear curve over a whole array of predictions. `fee_curve` adds the
+alternative shapes explored by sweep.py.
+"""
+
+import numpy as np
+
+MIN_FEE = 0.0005    # 0.05% — calm market
+MAX_FEE = 0.008     # 0.80% — very volatile market
+LLMAD_MAX = 0.01    # expected max LLMAD for ETH/USDT
+
+
+def llmad_to_fee(llmad_prediction):
+    """
+    Convert LLMAD volatility prediction to a dynamic fee.
+
+    Maps LLMAD range [0, 0.01] → fee range [0.05%, 0.80%].
+    Higher volatility → higher fee to compensate LPs for risk.
+    """
+    min_fee = MIN_FEE
+    max_fee = MAX_FEE
+    llmad_max = LLMAD_MAX
+
+    # Normalize LLMAD to [0, 1]
+    normalized = min(abs(llmad_prediction) / llmad_max, 1.0)
+
+    # Map to fee range
+    fee = min_fee + normalized * (max_fee - min_fee)
+    return fee
+
+
+def llmad_to_fee_batch(llmad, min_fee=MIN_FEE, max_fee=MAX_FEE, llmad_max=LLMAD_MAX):
+    """Vectorized `llmad_to_fee` over an array of LLMAD predictions."""
+    normalized = np.minimum(np.abs(np.asarray(llmad, dtype=np.float64)) / llmad_max, 1.0)
+    return min_fee + normalized * (max_fee - min_fee)
+
+
+# ─── Alternative Curves ──────────────────────────────────────────────────────
+CURVE_SHAPES = ("linear", "piecewise", "log", "sigmoid")
+
+
+def fee_curve(llmad, shape="linear", min_fee=MIN_FEE, max_fee=MAX_FEE, llmad_max=LLMAD_MAX,
+              steepness=10.0, midpoint=0.5):
+    """
+    Map LLMAD to a fee with a configurable curve shape.
+
+    Every shape maps normalized LLMAD x = min(|llmad| / llmad_max, 1) from
+    [0, 1] onto [min_fee, max_fee]:
+    - linear:    x (same as `llmad_to_fee_batch`)
+    - piecewise: flat at min_fee until x = midpoint, then linear to max_fee
+    - log:       log1p(steepness * x) / log1p(steepness) (reacts early)
+    - sigmoid:   logistic around midpoint, rescaled to hit both ends
+    """
+    x = np.minimum(np.abs(np.asarray(llmad, dtype=np.float64)) / llmad_max, 1.0)
+    if shape == "linear":
+        y = x
+    elif shape == "piecewise":
+        y = np.clip((x - midpoint) / (1.0 - midpoint), 0.0, 1.0)
+    elif shape == "log":
+        y = np.log1p(steepness * x) / np.log1p(steepness)
+    elif shape == "sigmoid":
+        lo = 1.0 / (1.0 + np.exp(steepness * midpoint))
+        hi = 1.0 / (1.0 + np.exp(-steepness * (1.0 - midpoint)))
+        y = (1.0 / (1.0 + np.exp(-steepness * (x - midpoint))) - lo) / (hi - lo)
+    else:
+        raise ValueError(f"unknown fee curve shape {shape!r}; expected one of {CURVE_SHAPES}")
+    return min_fee + y * (max_fee - min_fee)
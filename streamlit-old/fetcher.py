@@ -0,0 +1,220 @@
+"""
+CryptoCompare minute-bar fetching.
+
+`parse_histominute` turns a `histominute` response into a CandleBuffer and
+is shared by the Streamlit app and the async fetcher. `AsyncCandleFetcher`
+fetches many symbol pairs concurrently over one pooled aiohttp session,
+with bounded concurrency and retries with exponential backoff.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from candles import PRICE_COLUMNS, CandleBuffer
+from config import CRYPTOCOMPARE_API
+from metrics import API_ERRORS, API_REQUESTS, counter, timer
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CryptoCompareError(Exception):
+    """CryptoCompare answered, but with `Response != "Success"`."""
+
+
+def parse_histominute(raw, maxlen=None):
+    """Parse a `histominute` JSON payload into a CandleBuffer."""
+    if raw.get("Response") != "Success":
+        counter(API_ERRORS).inc(kind="response")
+        raise CryptoCompareError(raw.get("Message") or "unknown error")
+    return CandleBuffer.from_cryptocompare(raw["Data"]["Data"], maxlen=maxlen)
+
+
+class AsyncCandleFetcher:
+    """
+    Concurrent multi-pair OHLC fetcher.
+
+    Use as an async context manager so every request shares one pooled
+    HTTP session:
+
+        async with AsyncCandleFetcher(concurrency=8) as fetcher:
+            candles = await fetcher.fetch_many([("ETH", "USDT"), ("BTC", "USDT")])
+    """
+
+    def __init__(self, base_url=CRYPTOCOMPARE_API, concurrency=8, retries=3,
+                 backoff=0.5, timeout=10, api_key=None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.api_key = api_key
+        self.requests_made = 0
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        import aiohttp  # imported on first use so the Streamlit app starts without it
+
+        if self._session is None:
+            headers = {"authorization": f"Apikey {self.api_key}"} if self.api_key else None
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=headers,
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch_raw(self, fsym, tsym, limit=120, to_ts=None):
+        """GET one `histominute` payload, retrying transient failures."""
+        params = {"fsym": fsym, "tsym": tsym, "limit": limit}
+        if to_ts is not None:
+            params["toTs"] = int(to_ts)
+
+        with timer("fetch"):
+            return await self._fetch_raw(params)
+
+    async def _fetch_raw(self, params):
+        import aiohttp
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.requests_made += 1
+                    counter(API_REQUESTS).inc()
+                    async with self._session.get(self.base_url, params=params) as resp:
+                        if resp.status in RETRYABLE_STATUS:
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history,
+                                status=resp.status, message=resp.reason,
+                            )
+                        resp.raise_for_status()
+                        return await resp.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                counter(API_ERRORS).inc(kind=str(status) if status else type(e).__name__)
+                if attempt >= self.retries or (status is not None and status not in RETRYABLE_STATUS):
+                    raise
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                attempt += 1
+
+    async def fetch(self, fsym, tsym, limit=120, to_ts=None):
+        """Fetch one pair as a CandleBuffer."""
+        raw = await self.fetch_raw(fsym, tsym, limit=limit, to_ts=to_ts)
+        return parse_histominute(raw)
+
+    async def fetch_many(self, pairs, limit=120, return_exceptions=False):
+        """
+        Fetch every (fsym, tsym) pair concurrently.
+
+        Returns a dict mapping each pair to its CandleBuffer. With
+        `return_exceptions=True`, failed pairs map to their exception
+        instead of aborting the whole round.
+        """
+        pairs = list(pairs)
+        results = await asyncio.gather(
+            *(self.fetch(fsym, tsym, limit=limit) for fsym, tsym in pairs),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(pairs, results))
+
+
+def fetch_many(pairs, limit=120, **kwargs):
+    """Blocking wrapper around `AsyncCandleFetcher.fetch_many`."""
+    return_exceptions = kwargs.pop("return_exceptions", False)
+
+    async def run():
+        async with AsyncCandleFetcher(**kwargs) as fetcher:
+            return await fetcher.fetch_many(pairs, limit=limit, return_exceptions=return_exceptions)
+
+    return asyncio.run(run())
+
+
+# ─── Incremental Sync ────────────────────────────────────────────────────────
+class CandleCache:
+    """
+    Per-pair candle cache that only downloads bars it does not have yet.
+
+    After the first full window, each sync asks CryptoCompare for just the
+    bars since the last cached timestamp (`limit` = minutes elapsed,
+    `toTs` = now). Returned bars are merged by timestamp: older ones are
+    dropped, the still-forming last bar is replaced in place, and newer
+    ones are appended. Each pair keeps at most `limit + 1` bars, the same
+    window a full `histominute` request returns.
+    """
+
+    def __init__(self, limit=120, interval=60):
+        self.limit = limit
+        self.interval = interval
+        self.bars_received = 0
+        self._buffers = {}
+        self._lock = threading.Lock()  # the Streamlit app shares one cache across sessions
+
+    def get(self, fsym, tsym):
+        return self._buffers.get((fsym, tsym))
+
+    def request_params(self, fsym, tsym, now):
+        """`histominute` params covering everything after the cached bars."""
+        buf = self._buffers.get((fsym, tsym))
+        params = {"fsym": fsym, "tsym": tsym, "limit": self.limit}
+        if buf is not None and len(buf):
+            missing = (int(now) // self.interval * self.interval - buf.last_time) // self.interval
+            if 0 <= missing < self.limit:
+                # The last cached bar may still be forming, so include it again
+                params["limit"] = max(missing, 1)
+                params["toTs"] = int(now)
+        return params
+
+    def merge(self, fsym, tsym, candles):
+        """Merge freshly fetched bars into the cache; returns the cached buffer."""
+        with self._lock:
+            return self._merge(fsym, tsym, candles)
+
+    def _merge(self, fsym, tsym, candles):
+        self.bars_received += len(candles)
+        buf = self._buffers.get((fsym, tsym))
+        if buf is None or not len(buf):
+            buf = CandleBuffer(maxlen=self.limit + 1)
+            buf.extend(candles)
+            self._buffers[(fsym, tsym)] = buf
+            return buf
+
+        times = candles.time
+        last = buf.last_time
+        same = int(times.searchsorted(last, side="left"))
+        if same < len(times) and times[same] == last:
+            buf.set_last(*(float(candles.column(name)[same]) for name in PRICE_COLUMNS))
+        buf.extend(candles[int(times.searchsorted(last, side="right")):])
+        return buf
+
+    async def sync(self, fetcher, fsym, tsym, now=None):
+        """Bring one pair up to date through an AsyncCandleFetcher."""
+        now = time.time() if now is None else now
+        params = self.request_params(fsym, tsym, now)
+        raw = await fetcher.fetch_raw(fsym, tsym, limit=params["limit"], to_ts=params.get("toTs"))
+        return self.merge(fsym, tsym, parse_histominute(raw))
+
+    async def sync_many(self, fetcher, pairs, now=None, return_exceptions=False):
+        """Sync every pair concurrently; returns {pair: CandleBuffer}."""
+        pairs = list(pairs)
+        now = time.time() if now is None else now
+        results = await asyncio.gather(
+            *(self.sync(fetcher, fsym, tsym, now=now) for fsym, tsym in pairs),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(pairs, results))
@@ -0,0 +1,476 @@
+"""
+On-chain inference via OpenGradient.
+
+`run_inference` sends one feature vector per transaction. The model input
+`X` is already 2-D, so `run_inference_batch` packs many rows (several pairs
+or several timestamps) into a single `client.alpha.infer` call and splits
+the per-row outputs back out. `InferenceBatcher` collects rows submitted
+from anywhere and flushes them as one batch when it is full or when the
+flush interval elapses. `InferenceQueue` runs inference jobs in the
+background so the dashboard never blocks on transaction confirmation, and
+`InferenceCache` skips the transaction entirely for near-identical inputs.
+"""
+
+import functools
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from config import MODEL_CID
+from metrics import CACHE_LOOKUPS, TX_CONFIRMATION_SECONDS, counter, histogram, record_inference
+
+DEVNET_MISSING_EVENT = "InferenceResult event not found"
+
+
+# ─── Local Estimate ──────────────────────────────────────────────────────────
+LLMAD_WEIGHTS = np.array([
+    0.15, 0.12, 0.08,   # HL Range 1m, 5m, 15m (most direct)
+    0.05, 0.04, 0.03,   # High LogRet 1m, 5m, 15m
+    0.05, 0.04, 0.03,   # Low LogRet 1m, 5m, 15m
+    0.12, 0.10, 0.07,   # RollStd 5m, 15m, 30m (strong signal)
+    0.02,                # Range Ratio
+    0.03,                # Momentum 5m
+    0.07,                # Vol-Wt Proxy
+])
+
+
+def estimate_llmad_from_features(features):
+    """
+    Estimate LLMAD locally from the 15 engineered features.
+
+    Since the model is a linear regression, we approximate the prediction
+    using a weighted combination of the volatility-related features.
+    The features already encode volatility information:
+    - Features 0-2: log high-low ranges (direct volatility measures)
+    - Features 9-11: rolling std of returns (variance measures)
+    - Feature 14: volume-weighted volatility proxy
+    """
+    llmad = sum(abs(f) * w for f, w in zip(features, LLMAD_WEIGHTS))
+    return float(llmad)
+
+
+def estimate_llmad_batch(rows):
+    """`estimate_llmad_from_features` for every row of an (N, 15) array."""
+    return np.abs(np.asarray(rows, dtype=np.float64)) @ LLMAD_WEIGHTS
+
+
+_local_model = None
+
+
+def set_local_model(model):
+    """
+    Use `model` (see local_model.py) for the off-chain fallback.
+
+    Passing None restores the weighted heuristic.
+    """
+    global _local_model
+    _local_model = model
+
+
+def local_estimate_batch(rows):
+    """Off-chain LLMAD for every row: the local model if set, else the heuristic."""
+    if _local_model is None:
+        return estimate_llmad_batch(rows)
+    return np.asarray(_local_model.predict(np.asarray(rows, dtype=np.float32)), dtype=np.float64)
+
+
+# ─── Run Inference ───────────────────────────────────────────────────────────
+def _submit(client, rows):
+    """`client.alpha.infer` on an (n, 15) array, timing the transaction's confirmation."""
+    import opengradient as og  # heavy (seconds); only paths that submit transactions need it
+
+    t0 = time.perf_counter()
+    try:
+        result = client.alpha.infer(
+            model_cid=MODEL_CID,
+            model_input={"X": rows},
+            inference_mode=og.InferenceMode.VANILLA,
+        )
+    except Exception as e:
+        if DEVNET_MISSING_EVENT in str(e):
+            histogram(TX_CONFIRMATION_SECONDS).observe(time.perf_counter() - t0)
+        raise
+    histogram(TX_CONFIRMATION_SECONDS).observe(time.perf_counter() - t0)
+    return result
+
+
+def _count_sources(infer):
+    """Count the result(s) `infer` returns by source (on-chain, local-estimate, error)."""
+    @functools.wraps(infer)
+    def wrapper(*args, **kwargs):
+        results = infer(*args, **kwargs)
+        for result in results if isinstance(results, list) else [results]:
+            record_inference(result)
+        return results
+    return wrapper
+
+
+@_count_sources
+def run_inference(client, features):
+    """Run on-chain inference via OpenGradient."""
+    feature_array = np.array([features], dtype=np.float32)
+
+    # Local LLMAD estimate from features (always available)
+    local_llmad = float(local_estimate_batch(feature_array)[0])
+
+    try:
+        result = _submit(client, feature_array)
+        # Try to get on-chain output, fallback to local estimate
+        on_chain_llmad = None
+        if result.model_output:
+            try:
+                on_chain_llmad = float(list(result.model_output.values())[0].flatten()[0])
+            except Exception:
+                pass
+
+        return {
+            "success": True,
+            "tx_hash": result.transaction_hash,
+            "output": result.model_output,
+            "llmad": on_chain_llmad if on_chain_llmad is not None else local_llmad,
+            "source": "on-chain" if on_chain_llmad is not None else "local-estimate",
+        }
+    except Exception as e:
+        error_msg = str(e)
+        if DEVNET_MISSING_EVENT in error_msg:
+            # Transaction succeeded on-chain but output not emitted (devnet)
+            # Use local estimate so the UI updates
+            return {
+                "success": True,
+                "tx_hash": "confirmed (devnet)",
+                "output": None,
+                "llmad": local_llmad,
+                "source": "local-estimate",
+                "devnet_note": True,
+            }
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+
+
+def _split_output(model_output, n):
+    """Per-row LLMAD values from a batched model output, or None."""
+    if not model_output:
+        return None
+    try:
+        values = np.asarray(list(model_output.values())[0], dtype=np.float64)
+    except Exception:
+        return None
+    if values.size == 0 or values.size % n:
+        return None
+    return values.reshape(n, -1)[:, 0]
+
+
+@_count_sources
+def _infer_chunk(client, chunk):
+    """One `alpha.infer` call for an (n, 15) chunk -> list of n result dicts."""
+    n = len(chunk)
+    local = local_estimate_batch(chunk)
+    try:
+        result = _submit(client, chunk)
+    except Exception as e:
+        error_msg = str(e)
+        if DEVNET_MISSING_EVENT in error_msg:
+            return [{
+                "success": True,
+                "tx_hash": "confirmed (devnet)",
+                "output": None,
+                "llmad": float(llmad),
+                "source": "local-estimate",
+                "devnet_note": True,
+                "batch_size": n,
+            } for llmad in local]
+        return [{"success": False, "error": error_msg, "batch_size": n} for _ in range(n)]
+
+    on_chain = _split_output(result.model_output, n)
+    return [{
+        "success": True,
+        "tx_hash": result.transaction_hash,
+        "output": None if on_chain is None else {"llmad": float(on_chain[k])},
+        "llmad": float(local[k] if on_chain is None else on_chain[k]),
+        "source": "local-estimate" if on_chain is None else "on-chain",
+        "batch_size": n,
+    } for k in range(n)]
+
+
+def run_inference_batch(client, rows, max_batch_size=64):
+    """
+    Run on-chain inference for many feature rows.
+
+    Rows are packed into `model_input={"X": (n, 15)}` calls of at most
+    `max_batch_size` rows, so N rows cost ceil(N / max_batch_size)
+    transactions instead of N. Returns one result dict per row, shaped like
+    `run_inference`'s, in input order; rows from the same call share its
+    `tx_hash`.
+    """
+    rows = np.asarray(rows, dtype=np.float32)
+    if rows.ndim == 1:
+        rows = rows[None, :]
+    results = []
+    for start in range(0, len(rows), max_batch_size):
+        results.extend(_infer_chunk(client, rows[start:start + max_batch_size]))
+    return results
+
+
+# ─── Micro-Batching ──────────────────────────────────────────────────────────
+class InferenceBatcher:
+    """
+    Collects single-row submissions and sends them as batched inferences.
+
+    `submit(features)` returns a Future resolving to that row's result
+    dict. A background thread flushes the pending rows as soon as
+    `max_batch_size` are queued, or `flush_interval` seconds after the
+    oldest pending row arrived, whichever comes first.
+    """
+
+    def __init__(self, client, max_batch_size=64, flush_interval=1.0):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.batches_sent = 0
+        self._pending = []  # (features, future)
+        self._oldest = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("InferenceBatcher is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((features, future))
+            self._cond.notify()
+        return future
+
+    def _take_batch(self):
+        """Wait until a batch is due; return it (empty once closed and drained)."""
+        with self._cond:
+            while True:
+                if len(self._pending) >= self.max_batch_size:
+                    break
+                if self._pending:
+                    remaining = self._oldest + self.flush_interval - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._cond.wait(remaining)
+                elif self._closed:
+                    return []
+                else:
+                    self._cond.wait()
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            self._oldest = time.monotonic() if self._pending else None
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            futures = [future for _, future in batch]
+            try:
+                results = run_inference_batch(
+                    self.client, [features for features, _ in batch],
+                    max_batch_size=self.max_batch_size,
+                )
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches_sent += 1
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def close(self, wait=True):
+        """Flush whatever is pending and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if wait:
+            self._thread.join()
+
+
+# ─── Result Cache ────────────────────────────────────────────────────────────
+class InferenceCache:
+    """
+    LRU + TTL cache in front of `client.alpha.infer`.
+
+    Keys are `MODEL_CID` plus the feature vector quantized to multiples of
+    `quantum` (a scalar, or one step per feature), so the near-identical
+    vectors a calm market produces minute after minute share one on-chain
+    result. Only successful results are cached; a hit returns the original
+    LLMAD and tx hash with `cached=True`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0, quantum=1e-5, model_cid=MODEL_CID):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantum = np.asarray(quantum, dtype=np.float64)
+        self.model_cid = model_cid
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+
+    def key(self, features):
+        steps = np.round(np.asarray(features, dtype=np.float64) / self.quantum)
+        return self.model_cid, steps.astype(np.int64).tobytes()
+
+    def get(self, features, now=None):
+        now = time.monotonic() if now is None else now
+        key = self.key(features)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                counter(CACHE_LOOKUPS).inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            counter(CACHE_LOOKUPS).inc(result="hit")
+            return {**entry[1], "cached": True, "cached_age": now - entry[0]}
+
+    def put(self, features, result, now=None):
+        if not result.get("success"):
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries[self.key(features)] = (now, result)
+            self._entries.move_to_end(self.key(features))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def run_inference(self, client, features, infer=run_inference):
+        """Drop-in `run_inference` that consults the cache first."""
+        result = self.get(features)
+        if result is None:
+            result = infer(client, features)
+            self.put(features, result)
+        return result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# ─── Background Jobs ─────────────────────────────────────────────────────────
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+class InferenceJob:
+    """One background inference: its status, timings and result dict."""
+
+    def __init__(self, job_id, key, meta, features=None):
+        self.id = job_id
+        self.key = key
+        self.meta = meta
+        self.features = features
+        self.status = PENDING
+        self.result = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status != PENDING
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class InferenceQueue:
+    """
+    Thread-pool executor for inference jobs, polled by the UI.
+
+    `submit` returns a job id immediately; `get` reports the job as
+    pending, confirmed or failed. Submitting a feature vector identical to
+    one still in flight returns the existing job instead of paying for a
+    second transaction. Only the newest `max_jobs` finished jobs are kept.
+
+    `submit(..., key=..., infer=...)` overrides the dedupe key (e.g. a
+    (pair, bar) tuple) and the inference callable for one job.
+    """
+
+    def __init__(self, client, max_workers=4, max_jobs=256, infer=run_inference):
+        self.client = client
+        self.max_jobs = max_jobs
+        self.deduplicated = 0
+        self._infer = infer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        self._in_flight = {}  # feature key -> job
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(features):
+        return np.asarray(features, dtype=np.float32).tobytes()
+
+    def submit(self, features, key=None, infer=None, **meta):
+        """Queue one inference; returns its job id."""
+        key = self.key(features) if key is None else key
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.deduplicated += 1
+                return job.id
+            job = InferenceJob(next(self._ids), key, meta, np.asarray(features, dtype=np.float32))
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._executor.submit(self._run, job, list(features), infer or self._infer)
+        return job.id
+
+    def _run(self, job, features, infer):
+        try:
+            # `client` may be a Future while the SDK is still initializing
+            client = self.client.result() if isinstance(self.client, Future) else self.client
+            result = infer(client, features)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        with self._lock:
+            job.result = result
+            job.status = CONFIRMED if result.get("success") else FAILED
+            job.finished_at = time.time()
+            self._in_flight.pop(job.key, None)
+            self._evict()
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def pending(self):
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
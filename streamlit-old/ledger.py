@@ -0,0 +1,227 @@
+"""
+Inference ledger: every fee decision, bounded in memory and logged to disk.
+
+Each entry is one fixed-width record (`LEDGER_DTYPE`): timestamp, pair,
+price, the 15 input features, LLMAD, fee, source and transaction hash.
+The newest `capacity` entries live in a preallocated NumPy ring, so
+memory stays flat however long a session runs. With a `root` directory,
+every entry is also appended to a columnar log: one raw file per column
+(`time.bin`, `features.bin`, ...), so time-range queries read the sorted
+`time` column, binary-search it and slice only the columns they need from
+memory-mapped files.
+
+    ledger = InferenceLedger("ledger/", capacity=1000)
+    ledger.record("ETH/USDT", price, features, result, fee)
+    ledger.page(0, per_page=10)          # newest first
+    ledger.query(start=t0, end=t1, pair="ETH/USDT")
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from features import N_FEATURES
+
+LEDGER_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("pair", "S16"),
+    ("price", "<f8"),
+    ("features", "<f4", (N_FEATURES,)),
+    ("llmad", "<f8"),
+    ("fee", "<f8"),
+    ("source", "S16"),
+    ("tx_hash", "S80"),
+])
+COLUMNS = LEDGER_DTYPE.names
+TEXT_COLUMNS = ("pair", "source", "tx_hash")
+
+
+def _text(value):
+    return value if isinstance(value, bytes) else str(value or "").encode()
+
+
+def _decode(entries):
+    """Structured entries -> list of plain dicts (text decoded, features as lists)."""
+    out = []
+    for entry in entries:
+        row = {name: entry[name] for name in COLUMNS}
+        for name in TEXT_COLUMNS:
+            row[name] = row[name].decode(errors="replace")
+        row["features"] = [float(v) for v in row["features"]]
+        for name in ("time", "price", "llmad", "fee"):
+            row[name] = float(row[name])
+        out.append(row)
+    return out
+
+
+class InferenceLedger:
+    """
+    Bounded in-memory ring of the newest entries, plus an optional
+    append-only columnar log under `root` holding all of them.
+
+    Entries are expected in time order (each one is stamped when it is
+    recorded); the log's `time` column is kept non-decreasing so range
+    queries can binary-search it.
+    """
+
+    def __init__(self, root=None, capacity=1000):
+        self.root = root
+        self.capacity = capacity
+        self._ring = np.zeros(capacity, dtype=LEDGER_DTYPE)
+        self._head = 0   # next slot to write
+        self._size = 0   # filled slots
+        self._last_time = -np.inf
+        self._lock = threading.Lock()
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+            count = self._log_length()
+            self._truncate(count)
+            if count:
+                # Warm the ring with the newest persisted entries
+                tail = self._read_log(max(0, count - capacity), count)
+                self._last_time = float(tail["time"][-1])
+                self._push(tail)
+
+    # ─── Writing ──────────────────────────────────────────────────────────
+    @staticmethod
+    def entry(pair, price, features, result, fee, now=None):
+        """One ledger record from an inference result dict."""
+        entry = np.zeros(1, dtype=LEDGER_DTYPE)
+        entry["time"] = time.time() if now is None else now
+        entry["pair"] = _text(pair)
+        entry["price"] = price
+        entry["features"] = np.asarray(features, dtype=np.float32)
+        entry["llmad"] = result.get("llmad", np.nan) if result.get("success") else np.nan
+        entry["fee"] = np.nan if fee is None else fee
+        source = result.get("source") if result.get("success") else "error"
+        if result.get("cached"):
+            source = "cache"
+        entry["source"] = _text(source)
+        entry["tx_hash"] = _text(result.get("tx_hash"))
+        return entry
+
+    def record(self, pair, price, features, result, fee, now=None):
+        """Append one decision; returns the stored record."""
+        entry = self.entry(pair, price, features, result, fee, now)
+        self.append(entry)
+        return entry[0]
+
+    def append(self, entries):
+        """Append a structured array of `LEDGER_DTYPE` entries (e.g. a whole round)."""
+        entries = np.array(entries, dtype=LEDGER_DTYPE, ndmin=1)
+        if not len(entries):
+            return
+        with self._lock:
+            times = np.maximum.accumulate(np.maximum(entries["time"], self._last_time))
+            entries["time"] = times
+            self._last_time = float(times[-1])
+            self._push(entries)
+            if self.root is not None:
+                for name in COLUMNS:
+                    with open(self._column_path(name), "ab") as f:
+                        f.write(np.ascontiguousarray(entries[name]).tobytes())
+
+    def _push(self, entries):
+        entries = entries[-self.capacity:]
+        n = len(entries)
+        first = min(n, self.capacity - self._head)
+        self._ring[self._head:self._head + first] = entries[:first]
+        self._ring[:n - first] = entries[first:]
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    # ─── Reading ──────────────────────────────────────────────────────────
+    def __len__(self):
+        """Entries available: the whole log if persisted, else the ring."""
+        if self.root is not None:
+            return self._log_length()
+        return self._size
+
+    def recent(self):
+        """The in-memory entries, oldest first (a copy)."""
+        with self._lock:
+            if self._size < self.capacity:
+                return self._ring[:self._size].copy()
+            return np.concatenate([self._ring[self._head:], self._ring[:self._head]])
+
+    def page(self, number, per_page=10):
+        """Page `number` (0 = newest) of entries, newest first, as dicts."""
+        total = len(self)
+        hi = total - number * per_page
+        lo = max(0, hi - per_page)
+        if hi <= 0:
+            return []
+        if self.root is not None:
+            entries = self._read_log(lo, hi)
+        else:
+            entries = self.recent()[lo:hi]
+        return _decode(entries[::-1])
+
+    def query(self, start=None, end=None, pair=None, columns=COLUMNS):
+        """
+        Entries with start <= time < end (optionally for one pair) as a
+        dict of column arrays. Only the requested columns are read.
+        """
+        if self.root is not None:
+            n = self._log_length()
+            times = self._column(name="time", count=n)
+        else:
+            entries = self.recent()
+            times = entries["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+
+        def column(name):
+            if self.root is not None:
+                return self._column(name, n)[lo:hi]
+            return entries[name][lo:hi]
+
+        mask = None
+        if pair is not None:
+            mask = column("pair") == _text(pair)
+        out = {}
+        for name in columns:
+            values = column(name)
+            out[name] = np.array(values[mask] if mask is not None else values)
+        return out
+
+    # ─── Columnar Log ─────────────────────────────────────────────────────
+    def _column_path(self, name):
+        return os.path.join(self.root, f"{name}.bin")
+
+    def _log_length(self):
+        # Columns are written one after another; a crash mid-append can
+        # leave some longer than others, so trust the shortest
+        lengths = []
+        for name in COLUMNS:
+            path = self._column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // LEDGER_DTYPE.fields[name][0].itemsize)
+        return min(lengths)
+
+    def _truncate(self, count):
+        """Drop rows past `count` left in some columns by a torn append."""
+        for name in COLUMNS:
+            path = self._column_path(name)
+            size = count * LEDGER_DTYPE.fields[name][0].itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+            elif not os.path.exists(path):
+                open(path, "ab").close()
+
+    def _column(self, name, count):
+        """The first `count` values of one column, memory-mapped read-only."""
+        dtype = LEDGER_DTYPE.fields[name][0]
+        if count == 0:
+            return np.empty((0,) + dtype.shape, dtype=dtype.base)
+        return np.memmap(self._column_path(name), dtype=dtype.base, mode="r",
+                         shape=(count,) + dtype.shape)
+
+    def _read_log(self, lo, hi):
+        """Log entries [lo, hi) as an in-memory structured array."""
+        log = np.empty(hi - lo, dtype=LEDGER_DTYPE)
+        for name in COLUMNS:
+            log[name] = self._column(name, hi)[lo:hi]
+        return log
@@ -0,0 +1,194 @@
+"""
+Local replica of the on-chain LLMAD model.
+
+The fallback used whenever the on-chain output is missing should produce
+the same fee as the on-chain path. Backends here all expose
+`predict(X) -> (N,)` for batched (N, 15) float32 inputs:
+
+- `LinearModel`: exported linear-regression coefficients (JSON or NPZ).
+  The on-chain model is a linear regression, so the coefficients can also
+  be recovered exactly from recorded on-chain outputs with `fit`.
+- `OnnxModel`: the model artifact itself, run on CPU with onnxruntime.
+- `HeuristicModel`: the weighted `estimate_llmad_from_features` fallback.
+
+Install a backend for the app with `inference.set_local_model(...)`.
+Recordings are the on-chain decisions of an inference ledger (the app's
+or feeopt's `INFERENCE_LEDGER_DIR`):
+
+    python local_model.py record $INFERENCE_LEDGER_DIR --out recordings.npz
+    python local_model.py fit recordings.npz --out models/<MODEL_CID>.json
+    python local_model.py parity recordings.npz
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from config import MODEL_CID
+from fees import llmad_to_fee_batch
+from inference import estimate_llmad_batch
+from ledger import InferenceLedger
+
+MODEL_DIR = os.getenv("LOCAL_MODEL_DIR", "models")
+
+
+class HeuristicModel:
+    """The hand-weighted estimate; what the app used before a replica existed."""
+
+    name = "heuristic"
+
+    def predict(self, X):
+        return estimate_llmad_batch(X)
+
+
+class LinearModel:
+    """y = X @ coef + intercept."""
+
+    name = "linear"
+
+    def __init__(self, coef, intercept=0.0):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    @classmethod
+    def fit(cls, features, outputs):
+        """Least-squares coefficients reproducing recorded on-chain outputs."""
+        X = np.asarray(features, dtype=np.float64)
+        A = np.hstack([X, np.ones((len(X), 1))])
+        solution, *_ = np.linalg.lstsq(A, np.asarray(outputs, dtype=np.float64), rcond=None)
+        return cls(solution[:-1], solution[-1])
+
+    @classmethod
+    def load(cls, path):
+        if path.endswith(".npz"):
+            data = np.load(path)
+            return cls(data["coef"], float(data["intercept"]))
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["coef"], data.get("intercept", 0.0))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".npz"):
+            np.savez(path, coef=self.coef, intercept=self.intercept)
+            return
+        with open(path, "w") as f:
+            json.dump({"coef": self.coef.tolist(), "intercept": self.intercept}, f, indent=2)
+
+
+class OnnxModel:
+    """The exported model artifact, evaluated with onnxruntime on CPU."""
+
+    name = "onnx"
+
+    def __init__(self, path):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("OnnxModel needs onnxruntime: pip install onnxruntime") from e
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        out = self.session.run(None, {self.input_name: X})[0]
+        return np.asarray(out, dtype=np.float64).reshape(len(X), -1)[:, 0]
+
+
+def load_local_model(model_cid=MODEL_CID, model_dir=MODEL_DIR):
+    """
+    The best available replica for `model_cid`: `<cid>.onnx`, then
+    `<cid>.json` / `<cid>.npz` coefficients, else the heuristic.
+    """
+    base = os.path.join(model_dir, model_cid)
+    if os.path.exists(base + ".onnx"):
+        try:
+            return OnnxModel(base + ".onnx")
+        except ImportError:
+            pass
+    for ext in (".json", ".npz"):
+        if os.path.exists(base + ext):
+            return LinearModel.load(base + ext)
+    return HeuristicModel()
+
+
+# ─── Parity ──────────────────────────────────────────────────────────────────
+def save_recordings(path, features, llmad):
+    """Store (features, on-chain LLMAD) pairs for `fit` and `check_parity`."""
+    np.savez_compressed(path, features=np.asarray(features, dtype=np.float32),
+                        llmad=np.asarray(llmad, dtype=np.float64))
+
+
+def load_recordings(path):
+    data = np.load(path)
+    return data["features"], data["llmad"]
+
+
+def ledger_recordings(ledger, start=None, end=None, pair=None):
+    """(features, LLMAD) of the on-chain decisions in an `InferenceLedger`."""
+    rows = ledger.query(start, end, pair, columns=("features", "llmad", "source"))
+    on_chain = (rows["source"] == b"on-chain") & np.isfinite(rows["llmad"])
+    return rows["features"][on_chain], rows["llmad"][on_chain]
+
+
+def check_parity(model, features, on_chain_llmad, fee_tol=1e-6):
+    """
+    Compare a local model against recorded on-chain outputs.
+
+    Parity holds when every row maps to the same fee within `fee_tol`
+    (fees are what the pool publishes, so that is the tolerance that matters).
+    """
+    predicted = np.asarray(model.predict(np.asarray(features, dtype=np.float32)), dtype=np.float64)
+    on_chain = np.asarray(on_chain_llmad, dtype=np.float64)
+    fee_diff = np.abs(llmad_to_fee_batch(predicted) - llmad_to_fee_batch(on_chain))
+    return {
+        "model": model.name,
+        "rows": len(on_chain),
+        "max_llmad_error": float(np.max(np.abs(predicted - on_chain))) if len(on_chain) else 0.0,
+        "max_fee_diff": float(fee_diff.max()) if len(on_chain) else 0.0,
+        "ok": bool(np.all(fee_diff <= fee_tol)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local replica of the on-chain LLMAD model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="export on-chain decisions from an inference ledger")
+    record.add_argument("ledger_dir")
+    record.add_argument("--out", default="recordings.npz")
+    record.add_argument("--pair", help='only this pair, e.g. "ETH/USDT"')
+    fit = sub.add_parser("fit", help="recover linear coefficients from recordings")
+    fit.add_argument("recordings")
+    fit.add_argument("--out", default=os.path.join(MODEL_DIR, MODEL_CID + ".json"))
+    parity = sub.add_parser("parity", help="check a local model against recordings")
+    parity.add_argument("recordings")
+    parity.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if not os.path.isdir(args.ledger_dir):
+            parser.error(f"no ledger at {args.ledger_dir}")
+        features, llmad = ledger_recordings(InferenceLedger(args.ledger_dir), pair=args.pair)
+        save_recordings(args.out, features, llmad)
+        print(f"wrote {len(llmad)} recordings to {args.out}")
+        return 0 if len(llmad) else 1
+
+    features, llmad = load_recordings(args.recordings)
+    if args.command == "fit":
+        model = LinearModel.fit(features, llmad)
+        model.save(args.out)
+        print(f"wrote {args.out}")
+        model_report = check_parity(model, features, llmad)
+    else:
+        model_report = check_parity(load_local_model(model_dir=args.model_dir), features, llmad)
+    print(json.dumps(model_report, indent=2))
+    return 0 if model_report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+"""
+Lightweight in-process metrics for the fee pipeline.
+
+Counters and fixed-bucket latency histograms, cheap enough to leave on in
+production: an observation is one `bisect` plus a few integer updates
+under a lock, with no per-sample storage. Quantiles (p50/p95/p99) are
+interpolated from the buckets, and `render()` emits the Prometheus text
+exposition format.
+
+    with timer("fetch"):
+        ...
+    METRICS.counter("feeopt_cache_lookups_total").inc(result="hit")
+    print(METRICS.render())
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 10 µs .. ~340 s in steps of sqrt(2): interpolated quantiles stay within ~20%
+DEFAULT_BUCKETS = tuple(1e-5 * 2 ** (k / 2) for k in range(51))
+QUANTILES = (0.5, 0.95, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                    for k, v in items)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self):
+        return {key: value for key, value in self._values.items()}
+
+    def render(self):
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels and interpolated quantiles."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.count += 1
+            series.sum += value
+            if value < series.min:
+                series.min = value
+            if value > series.max:
+                series.max = value
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return series.count if series else 0
+
+    def quantile(self, q, **labels):
+        """Estimate the q-quantile by linear interpolation inside its bucket."""
+        series = self._series.get(_label_key(labels))
+        if series is None or not series.count:
+            return None
+        return self._quantile(series, q)
+
+    def _quantile(self, series, q):
+        rank = q * series.count
+        seen = 0
+        for index, n in enumerate(series.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else series.max
+                lower, upper = max(lower, series.min), min(upper, series.max)
+                return lower + (upper - lower) * max(rank - seen, 0) / n
+            seen += n
+        return series.max
+
+    def summary(self, quantiles=QUANTILES):
+        """{labels: {"count", "sum", "mean", "max", "p50", ...}} for every series."""
+        out = {}
+        with self._lock:
+            for key, series in self._series.items():
+                if not series.count:
+                    continue
+                row = {"count": series.count, "sum": series.sum,
+                       "mean": series.sum / series.count, "max": series.max}
+                for q in quantiles:
+                    row[f"p{q * 100:g}"] = self._quantile(series, q)
+                out[key] = row
+        return out
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (math.inf,), series.counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket"
+                                 f"{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+
+class Registry:
+    """Named metrics, created on first use and rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help, **kwargs)
+        if not isinstance(metric, cls):
+            raise TypeError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def metrics(self):
+        return list(self._metrics.values())
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+METRICS = Registry()
+
+# ─── Pipeline Metrics ────────────────────────────────────────────────────────
+STAGE_SECONDS = "feeopt_stage_seconds"
+API_REQUESTS = "feeopt_api_requests_total"
+API_ERRORS = "feeopt_api_errors_total"
+CACHE_LOOKUPS = "feeopt_cache_lookups_total"
+INFERENCES = "feeopt_inferences_total"
+TX_CONFIRMATION_SECONDS = "feeopt_tx_confirmation_seconds"
+FEE_DECISIONS = "feeopt_fee_decisions_total"
+
+_HELP = {
+    STAGE_SECONDS: "Wall time per pipeline stage",
+    API_REQUESTS: "CryptoCompare requests sent",
+    API_ERRORS: "CryptoCompare requests that failed, by kind",
+    CACHE_LOOKUPS: "Inference cache lookups, by result",
+    INFERENCES: "Inference results, by source",
+    TX_CONFIRMATION_SECONDS: "Time from submitting an on-chain inference to its receipt",
+    FEE_DECISIONS: "Fee updates published or suppressed, by outcome",
+}
+
+
+def counter(name, registry=None):
+    return (registry or METRICS).counter(name, _HELP.get(name, ""))
+
+
+def histogram(name, registry=None):
+    return (registry or METRICS).histogram(name, _HELP.get(name, ""))
+
+
+def timer(stage, registry=None):
+    """Context manager recording the block's wall time under `stage`."""
+    return histogram(STAGE_SECONDS, registry).time(stage=stage)
+
+
+def record_inference(result, registry=None):
+    """Count one inference result dict by where its LLMAD came from."""
+    source = (result.get("source") or "unknown") if result.get("success") else "error"
+    counter(INFERENCES, registry).inc(source=source)
+
+
+def stage_table(registry=None):
+    """Rows of {"stage", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"} for display."""
+    rows = []
+    for name in (STAGE_SECONDS, TX_CONFIRMATION_SECONDS):
+        for key, s in sorted(histogram(name, registry).summary().items()):
+            label = dict(key).get("stage", "tx confirmation")
+            rows.append({
+                "stage": label,
+                "count": s["count"],
+                "p50_ms": s["p50"] * 1000,
+                "p95_ms": s["p95"] * 1000,
+                "p99_ms": s["p99"] * 1000,
+                "max_ms": s["max"] * 1000,
+            })
+    return rows
+
+
+def counter_table(registry=None):
+    """Rows of {"metric", "labels", "value"} for every pipeline counter."""
+    rows = []
+    for name in (API_REQUESTS, API_ERRORS, CACHE_LOOKUPS, INFERENCES, FEE_DECISIONS):
+        for key, value in sorted(counter(name, registry).snapshot().items()):
+            rows.append({
+                "metric": name,
+                "labels": ", ".join(f"{k}={v}" for k, v in key),
+                "value": value,
+            })
+    return rows
+
+
+# ─── Text Endpoint ───────────────────────────────────────────────────────────
+def serve(port, host="127.0.0.1", registry=None):
+    """Serve `GET /metrics` from a daemon thread; returns the HTTP server."""
+    registry = registry or METRICS
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,186 @@
+"""
+Multi-resolution feature windows.
+
+`engineer_features` looks back in minute bars only. `MultiResolutionFeatures`
+computes the same 15 feature families at several resolutions (10s, 1m,
+5m and 1h by default) from one store of base bars, e.g. the 10-second
+bars `ticks.BarBuilder(interval=10)` builds from the trade stream.
+
+A resolution of k base bars is read as bars of k base bars ending at the
+row's bar, so every resolution is current as of the newest base bar
+instead of the last clock-aligned hour. All resolutions share one set of
+aggregates over the base bars: sparse tables for window highs and lows
+(any max/min is two lookups), a prefix sum of volume, and log closes.
+Each resolution then only gathers a few dozen values per row, so adding
+one costs a fraction of a full feature pass.
+
+At a resolution equal to the base interval the block equals
+`engineer_features` on the same bars, and at k > 1 it equals
+`engineer_features` on the base bars resampled into k-bar groups ending
+at the row.
+"""
+
+import numpy as np
+
+from features import (
+    FEATURE_NAMES,
+    LOOKBACKS,
+    MIN_CANDLES,
+    MOMENTUM_LOOKBACK,
+    N_FEATURES,
+    RANGE_WINDOW,
+    STD_WINDOWS,
+    VWV_WINDOW,
+    _columns,
+    _safe_log_ratio,
+)
+
+RESOLUTIONS = (10, 60, 300, 3600)
+BASE_INTERVAL = 10
+
+
+def resolution_label(seconds):
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+def feature_names(resolutions=RESOLUTIONS):
+    """Column names of the wide matrix, resolution-major."""
+    return [f"{name} @{resolution_label(r)}" for r in resolutions for name in FEATURE_NAMES]
+
+
+class _SparseTable:
+    """O(n log n) table answering max (or min) over any window with two lookups."""
+
+    def __init__(self, x, op):
+        self.op = op
+        self.levels = [x]
+        span = 1
+        while 2 * span <= len(x):
+            prev = self.levels[-1]
+            self.levels.append(op(prev[:-span], prev[span:]))
+            span *= 2
+
+    def query(self, lo, length):
+        """op(x[lo:lo + length]) for an array of `lo` and one window length."""
+        level = int(length).bit_length() - 1
+        table = self.levels[level]
+        return self.op(table[lo], table[lo + length - (1 << level)])
+
+
+class MultiResolutionFeatures:
+    """
+    The 15 features at each of `resolutions` (seconds, multiples of
+    `base`) from bars of `base` seconds, as one wide float32 row.
+    """
+
+    def __init__(self, resolutions=RESOLUTIONS, base=BASE_INTERVAL):
+        for r in resolutions:
+            if r % base:
+                raise ValueError(f"resolution {r}s is not a multiple of the {base}s base bars")
+        self.resolutions = tuple(resolutions)
+        self.base = base
+        self.factors = tuple(r // base for r in self.resolutions)
+        self.names = feature_names(self.resolutions)
+
+    @property
+    def width(self):
+        return N_FEATURES * len(self.resolutions)
+
+    @property
+    def min_bars(self):
+        """Base bars needed before every resolution has `MIN_CANDLES` bars of history."""
+        return MIN_CANDLES * max(self.factors)
+
+    def compute(self, candles, ends=None):
+        """
+        (len(ends), width) float32 features for the rows ending at base
+        bar indices `ends` (default: the newest bar only). Every end needs
+        `min_bars - 1` bars before it.
+        """
+        highs, lows, closes, volumes = _columns(candles)
+        n = len(closes)
+        ends = np.asarray([n - 1] if ends is None else ends, dtype=np.int64)
+        if len(ends) and (ends.min() < self.min_bars - 1 or ends.max() >= n):
+            raise ValueError(f"need {self.min_bars} base bars of history per row")
+        if len(ends):
+            # Aggregates only over the bars some row reads
+            lo, hi = ends.min() - self.min_bars + 1, ends.max() + 1
+            highs, lows, closes, volumes = (x[lo:hi] for x in (highs, lows, closes, volumes))
+            ends = ends - lo
+
+        # Shared aggregates over the base bars
+        max_high = _SparseTable(highs, np.maximum)
+        min_low = _SparseTable(lows, np.minimum)
+        volume_sum = np.concatenate([[0.0], np.cumsum(volumes)])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_closes = np.log(closes)
+
+        out = np.empty((len(ends), self.width), dtype=np.float32)
+        for block, k in enumerate(self.factors):
+            out[:, block * N_FEATURES:(block + 1) * N_FEATURES] = self._block(
+                ends, k, highs, lows, max_high, min_low, volume_sum, log_closes)
+        return out
+
+    def latest(self, candles):
+        """The newest row as a flat float32 vector, or None without enough history."""
+        if len(candles) < self.min_bars:
+            return None
+        return self.compute(candles)[0]
+
+    def matrix(self, histories):
+        """(len(histories), width) float32 batch of each history's newest row."""
+        return np.stack([self.compute(candles)[0] for candles in histories]) if histories \
+            else np.empty((0, self.width), dtype=np.float32)
+
+    def _block(self, ends, k, highs, lows, max_high, min_low, volume_sum, log_closes):
+        """The 15 features at k base bars per bar; bar j ends at base index end - j * k."""
+        out = np.empty((len(ends), N_FEATURES))
+
+        def bar_high(j):
+            return highs[ends - j] if k == 1 else max_high.query(ends - (j + 1) * k + 1, k)
+
+        def bar_low(j):
+            return lows[ends - j] if k == 1 else min_low.query(ends - (j + 1) * k + 1, k)
+
+        def log_close(j):
+            return log_closes[ends - j * k]
+
+        # 1-3: Log high-low range over the last lb + 1 bars
+        for col, lb in enumerate(LOOKBACKS):
+            lo, length = ends - (lb + 1) * k + 1, (lb + 1) * k
+            out[:, col] = _safe_log_ratio(max_high.query(lo, length), min_low.query(lo, length))
+
+        # 4-9: Log return of bar highs and lows
+        high_now, low_now = bar_high(0), bar_low(0)
+        for col, lb in enumerate(LOOKBACKS):
+            out[:, 3 + col] = _safe_log_ratio(high_now, bar_high(lb))
+            out[:, 6 + col] = _safe_log_ratio(low_now, bar_low(lb))
+
+        # 10-12: Rolling std of bar log returns
+        longest = max(STD_WINDOWS)
+        strided = log_closes[ends[:, None] - k * np.arange(longest, -1, -1)]
+        returns = np.diff(strided, axis=1)
+        for col, window in enumerate(STD_WINDOWS):
+            out[:, 9 + col] = np.std(returns[:, -window:], axis=1)
+
+        # 13: High-low range ratio (current bar vs the mean over RANGE_WINDOW + 1 bars)
+        ranges = np.stack([bar_high(j) - bar_low(j) for j in range(RANGE_WINDOW + 1)])
+        avg_range = ranges.mean(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, 12] = np.where(avg_range > 0, ranges[0] / avg_range, 1.0)
+
+        # 14: Price momentum
+        out[:, 13] = log_close(0) - log_close(MOMENTUM_LOOKBACK)
+
+        # 15: Volume-weighted volatility proxy (return j weighted by bar j's volume)
+        bar_volume = np.stack([volume_sum[ends - j * k + 1] - volume_sum[ends - (j + 1) * k + 1]
+                               for j in range(VWV_WINDOW)])
+        abs_returns = np.abs(returns[:, ::-1][:, :VWV_WINDOW].T)
+        den = bar_volume.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, 14] = np.where(den > 0, (abs_returns * bar_volume).sum(axis=0) / den, 0.0)
+        return out
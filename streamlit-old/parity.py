@@ -0,0 +1,357 @@
+"""
+Feature-parity harness for the feature engines.
+
+The reference specification is the scalar path: `engineer_features` for
+the 15 features, `estimate_llmad_from_features` for the local LLMAD and
+`llmad_to_fee` for the fee. Every other engine (the batch, streaming and
+multi-resolution paths here, `src/lib/features.ts` in the web app, any
+faster engine that replaces them) must reproduce it.
+
+`generate` writes a golden fixture: a few deterministic candle series
+chosen to hit the edge cases (flat bars, zero volume, jumps, tiny and
+large prices), a set of windows into them, and the reference features,
+LLMAD and fee for each window. `compare` checks an engine's output for
+the same windows in one vectorized pass and reports the worst error per
+column.
+
+Fixtures and results share one compact binary layout that needs nothing
+but a typed-array view to read from any language:
+
+    b"FPAR" | u32 version | u32 header length | JSON header | arrays
+
+The header holds free-form "meta" plus, per array, its dtype ("<f8",
+"<i8" or "<i4"), shape and byte offset from the start of the data. Arrays
+are little-endian, C-ordered and 8-byte aligned.
+
+    python parity.py generate                     # fixtures/feature_parity.bin
+    python parity.py check                        # every Python engine
+    python parity.py check ts_results.bin         # output of another engine
+    npx tsx ../scripts/feature-parity.ts fixtures/feature_parity.bin ts_results.bin
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from candles import CandleBuffer
+from features import (
+    FEATURE_NAMES,
+    LOOKBACKS,
+    MIN_CANDLES,
+    MOMENTUM_LOOKBACK,
+    N_FEATURES,
+    RANGE_WINDOW,
+    STD_WINDOWS,
+    VWV_WINDOW,
+    engineer_features,
+    engineer_features_batch,
+)
+from fees import LLMAD_MAX, MAX_FEE, MIN_FEE, llmad_to_fee, llmad_to_fee_batch
+from inference import LLMAD_WEIGHTS, estimate_llmad_batch, estimate_llmad_from_features
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures",
+                           "feature_parity.bin")
+MAGIC = b"FPAR"
+VERSION = 1
+DTYPES = ("<f8", "<i8", "<i4")
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+SPEC = {
+    "names": FEATURE_NAMES,
+    "min_candles": MIN_CANDLES,
+    "lookbacks": LOOKBACKS,
+    "std_windows": STD_WINDOWS,
+    "range_window": RANGE_WINDOW,
+    "momentum_lookback": MOMENTUM_LOOKBACK,
+    "vwv_window": VWV_WINDOW,
+    "llmad_weights": LLMAD_WEIGHTS.tolist(),
+    "fee": {"min_fee": MIN_FEE, "max_fee": MAX_FEE, "llmad_max": LLMAD_MAX},
+}
+
+SERIES = ("walk", "volatile", "flat", "micro")
+RTOL = 1e-6
+ATOL = 1e-9
+
+
+# ─── Binary Layout ───────────────────────────────────────────────────────────
+def _pad(n):
+    return -n % 8
+
+
+def write_arrays(path, arrays, meta=None):
+    """Write a dict of arrays (and a JSON-able `meta`) in the layout above."""
+    header = {"meta": meta or {}, "arrays": {}}
+    blobs, offset = [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.newbyteorder("<").str
+        if dtype not in DTYPES:
+            raise ValueError(f"array {name!r} has unsupported dtype {array.dtype}")
+        data = array.astype(dtype, copy=False).tobytes()
+        header["arrays"][name] = {"dtype": dtype, "shape": list(array.shape), "offset": offset}
+        blobs.append(data + b"\0" * _pad(len(data)))
+        offset += len(blobs[-1])
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    encoded += b" " * _pad(12 + len(encoded))
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<II", VERSION, len(encoded)) + encoded)
+        for blob in blobs:
+            f.write(blob)
+
+
+def read_arrays(path):
+    """(meta, {name: array}) from a file written by `write_arrays`."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a feature-parity file")
+    version, length = struct.unpack_from("<II", data, 4)
+    if version != VERSION:
+        raise ValueError(f"{path} has layout version {version}, expected {VERSION}")
+    header = json.loads(data[12:12 + length])
+    base = 12 + length
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        arrays[name] = np.frombuffer(data, dtype=entry["dtype"], count=int(np.prod(shape)),
+                                     offset=base + entry["offset"]).reshape(shape)
+    return header["meta"], arrays
+
+
+# ─── Golden Fixture ──────────────────────────────────────────────────────────
+def _series(kind, n, rng):
+    """(open, high, low, close, volume) of one synthetic series."""
+    price, sigma, volume = {"walk": (2500.0, 1e-3, 50.0), "volatile": (40000.0, 6e-3, 5.0),
+                            "flat": (1.0, 5e-4, 1e4), "micro": (2e-5, 2e-3, 1e9)}[kind]
+    returns = rng.normal(0.0, sigma, n)
+    if kind == "volatile":
+        jumps = rng.random(n) < 0.03
+        returns[jumps] += rng.normal(0.0, 0.03, jumps.sum())
+    flat = np.zeros(n, dtype=bool)
+    if kind == "flat":
+        # Scattered flat bars plus a run long enough to zero every window
+        flat = rng.random(n) < 0.3
+        flat[100:170] = True
+        returns[flat] = 0.0
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[price], close[:-1]])
+    body_high, body_low = np.maximum(open_, close), np.minimum(open_, close)
+    high = body_high * np.exp(np.abs(rng.normal(0.0, sigma / 2, n)))
+    low = body_low * np.exp(-np.abs(rng.normal(0.0, sigma / 2, n)))
+    volume = volume * rng.lognormal(0.0, 0.8, n)
+    high[flat], low[flat], volume[flat] = close[flat], close[flat], 0.0
+    return open_, high, low, close, volume
+
+
+def reference(candles):
+    """The reference (features, llmad, fee) for the newest bar of `candles`."""
+    features = engineer_features(candles)
+    llmad = estimate_llmad_from_features(features)
+    return features, llmad, llmad_to_fee(llmad)
+
+
+def generate(path=GOLDEN_PATH, bars=300, seed=7, start=1_700_000_040):
+    """
+    Write the golden fixture to `path` and return its arrays.
+
+    Each series contributes one window per bar from `MIN_CANDLES` on; the
+    window lengths vary from 60 to 120 bars so engines are also checked
+    for reading only the tail they need.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {name: [] for name in COLUMNS}
+    series_start, starts, stops = [], [], []
+    for s, kind in enumerate(SERIES):
+        offset = s * bars
+        series_start.append(offset)
+        for name, values in zip(COLUMNS, _series(kind, bars, rng)):
+            columns[name].append(values)
+        for stop in range(MIN_CANDLES, bars + 1):
+            length = MIN_CANDLES + (stop * 7) % (MIN_CANDLES + 1)
+            starts.append(offset + max(0, stop - length))
+            stops.append(offset + stop)
+    arrays = {"time": np.concatenate([start + 60 * np.arange(bars, dtype=np.int64)] * len(SERIES))}
+    arrays.update((name, np.concatenate(values)) for name, values in columns.items())
+    arrays["series_start"] = np.array(series_start, dtype=np.int32)
+    arrays["start"] = np.array(starts, dtype=np.int32)
+    arrays["stop"] = np.array(stops, dtype=np.int32)
+
+    candles = golden_candles(arrays)
+    rows = [reference(candles[a:b]) for a, b in zip(arrays["start"].tolist(), arrays["stop"].tolist())]
+    arrays["features"] = np.array([r[0] for r in rows], dtype=np.float64)
+    arrays["llmad"] = np.array([r[1] for r in rows], dtype=np.float64)
+    arrays["fee"] = np.array([r[2] for r in rows], dtype=np.float64)
+    write_arrays(path, arrays, {"kind": "golden", "series": list(SERIES), "bars": bars,
+                                "seed": seed, "spec": SPEC})
+    return arrays
+
+
+def load_golden(path=GOLDEN_PATH):
+    meta, arrays = read_arrays(path)
+    if meta.get("kind") != "golden":
+        raise ValueError(f"{path} is not a golden fixture")
+    return meta, arrays
+
+
+def golden_candles(golden):
+    return CandleBuffer.from_arrays(golden["time"], *(golden[name] for name in COLUMNS))
+
+
+# ─── Python Engines ──────────────────────────────────────────────────────────
+def _per_series(golden, rows_for):
+    """
+    Run `rows_for(series_candles, ends)` on each series and gather one
+    feature row per window (`ends` are indices into the series).
+    """
+    candles = golden_candles(golden)
+    bounds = list(golden["series_start"]) + [len(candles)]
+    stop = golden["stop"].astype(np.int64)
+    out = np.empty((len(stop), N_FEATURES))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        rows = np.flatnonzero((stop > lo) & (stop <= hi))
+        out[rows] = rows_for(candles[lo:hi], stop[rows] - 1 - lo)
+    return out
+
+
+def _reference_engine(golden):
+    candles = golden_candles(golden)
+    return np.array([engineer_features(candles[a:b]) for a, b in
+                     zip(golden["start"].tolist(), golden["stop"].tolist())], dtype=np.float64)
+
+
+def _batch_engine(golden):
+    return _per_series(golden, lambda candles, ends: engineer_features_batch(candles)[ends])
+
+
+def _streaming_engine(golden):
+    from streaming import StreamingFeatureEngine
+
+    def rows_for(candles, ends):
+        engine = StreamingFeatureEngine()
+        rows = [engine.push(candle) for candle in candles.to_records()]
+        return np.array([rows[end] for end in ends], dtype=np.float64)
+
+    return _per_series(golden, rows_for)
+
+
+def _multires_engine(golden):
+    from multires import MultiResolutionFeatures
+
+    engine = MultiResolutionFeatures(resolutions=(60,), base=60)
+    return _per_series(golden, engine.compute)
+
+
+ENGINES = {
+    "reference": _reference_engine,
+    "batch": _batch_engine,
+    "streaming": _streaming_engine,
+    "multires": _multires_engine,
+}
+
+
+def run_engine(name, golden):
+    """{"features", "llmad", "fee"} from the Python engine `name`."""
+    features = ENGINES[name](golden)
+    llmad = estimate_llmad_batch(features)
+    return {"features": features, "llmad": llmad, "fee": llmad_to_fee_batch(llmad)}
+
+
+# ─── Comparison ──────────────────────────────────────────────────────────────
+def _column_report(name, expected, got, rtol, atol):
+    error = np.abs(got - expected)
+    bad = ~(error <= atol + rtol * np.abs(expected))  # NaN counts as a mismatch
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(expected != 0, error / np.abs(expected), error)
+    return {"name": name, "max_abs": float(np.nanmax(error, initial=0.0)),
+            "max_rel": float(np.nanmax(relative, initial=0.0)),
+            "mismatches": int(bad.sum())}, bad
+
+
+def compare(golden, results, rtol=RTOL, atol=ATOL, examples=5):
+    """
+    Check `results` ({"features" (rows, 15), optional "llmad" and "fee"})
+    against the golden arrays. Returns a report: per column the largest
+    absolute and relative error and the mismatch count, the first few
+    mismatching (row, series, stop, column, expected, got), and "ok".
+    """
+    expected = golden["features"]
+    features = np.asarray(results["features"], dtype=np.float64)
+    if features.shape != expected.shape:
+        raise ValueError(f"features have shape {features.shape}, expected {expected.shape}")
+    columns, masks = [], []
+    for col, name in enumerate(FEATURE_NAMES):
+        report, bad = _column_report(name, expected[:, col], features[:, col], rtol, atol)
+        columns.append(report)
+        masks.append((name, expected[:, col], features[:, col], bad))
+    for key in ("llmad", "fee"):
+        if key in results:
+            got = np.asarray(results[key], dtype=np.float64).reshape(-1)
+            if got.shape != golden[key].shape:
+                raise ValueError(f"{key} has shape {got.shape}, expected {golden[key].shape}")
+            report, bad = _column_report(key, golden[key], got, rtol, atol)
+            columns.append(report)
+            masks.append((key, golden[key], got, bad))
+
+    series = np.searchsorted(golden["series_start"], golden["start"], side="right") - 1
+    first = []
+    for name, want, got, bad in masks:
+        for row in np.flatnonzero(bad)[:examples].tolist():
+            first.append({"row": row, "series": int(series[row]), "stop": int(golden["stop"][row]),
+                          "column": name, "expected": float(want[row]), "got": float(got[row])})
+    first.sort(key=lambda m: m["row"])
+    return {"rows": len(expected), "ok": not any(c["mismatches"] for c in columns),
+            "columns": columns, "first": first[:examples]}
+
+
+def format_report(report, label=""):
+    lines = [f"{label or 'results'}: {report['rows']:,} rows, "
+             + ("OK" if report["ok"] else "MISMATCH"),
+             f"{'column':<18}{'max abs':>12}{'max rel':>12}{'mismatches':>12}"]
+    for c in report["columns"]:
+        lines.append(f"{c['name']:<18}{c['max_abs']:>12.3g}{c['max_rel']:>12.3g}{c['mismatches']:>12,}")
+    for m in report["first"]:
+        lines.append(f"  row {m['row']} (series {m['series']}, stop {m['stop']}) {m['column']}: "
+                     f"expected {m['expected']!r}, got {m['got']!r}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-fixture parity checks for feature engines")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write the golden fixture")
+    gen.add_argument("--out", default=GOLDEN_PATH)
+    gen.add_argument("--bars", type=int, default=300, help="bars per series")
+    gen.add_argument("--seed", type=int, default=7)
+    check = sub.add_parser("check", help="compare engines against the golden fixture")
+    check.add_argument("results", nargs="*", help="result files written by other engines")
+    check.add_argument("--engine", action="append", choices=sorted(ENGINES),
+                       help="Python engine to check (default: all, unless result files are given)")
+    check.add_argument("--golden", default=GOLDEN_PATH)
+    check.add_argument("--rtol", type=float, default=RTOL)
+    check.add_argument("--atol", type=float, default=ATOL)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        arrays = generate(args.out, bars=args.bars, seed=args.seed)
+        print(f"wrote {len(arrays['stop']):,} windows over {len(arrays['time']):,} bars "
+              f"to {args.out} ({os.path.getsize(args.out):,} bytes)")
+        return 0
+
+    _, golden = load_golden(args.golden)
+    engines = args.engine or ([] if args.results else list(ENGINES))
+    checks = [(name, lambda name=name: run_engine(name, golden)) for name in engines]
+    checks += [(path, lambda path=path: read_arrays(path)[1]) for path in args.results]
+    ok = True
+    for label, load in checks:
+        report = compare(golden, load(), rtol=args.rtol, atol=args.atol)
+        print(format_report(report, label))
+        ok &= report["ok"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
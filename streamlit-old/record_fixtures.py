@@ -0,0 +1,95 @@
+"""
+Record CryptoCompare `histominute` payloads as offline test fixtures.
+
+    python record_fixtures.py ETH USDT              # live snapshot, 2001 bars
+    python record_fixtures.py ETH USDT --synthetic  # seeded random walk, no network
+
+Fixtures are gzipped JSON in exactly the shape the API returns, so
+benchmarks exercise the same parsing path as `fetch_ohlc`.
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+import numpy as np
+import requests
+
+from config import CRYPTOCOMPARE_API
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MAX_LIMIT = 2000
+
+
+def fixture_path(fsym, tsym, root=FIXTURE_DIR):
+    return os.path.join(root, f"histominute_{fsym}-{tsym}.json.gz".lower())
+
+
+def load_fixture(fsym="ETH", tsym="USDT", root=FIXTURE_DIR):
+    """The recorded payload as a dict, ready for `parse_histominute`."""
+    with gzip.open(fixture_path(fsym, tsym, root), "rt") as f:
+        return json.load(f)
+
+
+def record(fsym, tsym, limit=MAX_LIMIT, to_ts=None):
+    params = {"fsym": fsym, "tsym": tsym, "limit": limit}
+    if to_ts is not None:
+        params["toTs"] = int(to_ts)
+    resp = requests.get(CRYPTOCOMPARE_API, params=params, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def synthesize(limit=MAX_LIMIT, seed=0, end=1_700_000_000, price=2500.0):
+    """A `histominute`-shaped payload from a seeded random walk with volatility bursts."""
+    rng = np.random.default_rng(seed)
+    n = limit + 1
+    # Regime-switching volatility so features and fees cover calm and busy periods
+    vol = 0.0006 * np.exp(np.cumsum(rng.normal(0, 0.05, n)).clip(-1.5, 1.5))
+    closes = price * np.exp(np.cumsum(rng.normal(0, vol)))
+    opens = np.concatenate([[price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 1, n) * vol)
+    lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 1, n) * vol)
+    volumes = rng.gamma(2.0, 40.0, n) * (vol / vol.mean())
+    start = end // 60 * 60 - 60 * limit
+    rows = [{
+        "time": int(start + 60 * k),
+        "high": round(float(highs[k]), 2),
+        "low": round(float(lows[k]), 2),
+        "open": round(float(opens[k]), 2),
+        "volumefrom": round(float(volumes[k]), 4),
+        "volumeto": round(float(volumes[k] * closes[k]), 2),
+        "close": round(float(closes[k]), 2),
+        "conversionType": "direct",
+        "conversionSymbol": "",
+    } for k in range(n)]
+    return {
+        "Response": "Success",
+        "Message": "",
+        "HasWarning": False,
+        "Type": 100,
+        "Data": {"Aggregated": False, "TimeFrom": rows[0]["time"], "TimeTo": rows[-1]["time"],
+                 "Data": rows},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record histominute fixtures")
+    parser.add_argument("fsym")
+    parser.add_argument("tsym")
+    parser.add_argument("--limit", type=int, default=MAX_LIMIT)
+    parser.add_argument("--synthetic", action="store_true", help="generate instead of fetching")
+    parser.add_argument("--root", default=FIXTURE_DIR)
+    args = parser.parse_args(argv)
+
+    payload = synthesize(args.limit) if args.synthetic else record(args.fsym, args.tsym, args.limit)
+    os.makedirs(args.root, exist_ok=True)
+    path = fixture_path(args.fsym, args.tsym, args.root)
+    with gzip.open(path, "wt") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    print(f"wrote {len(payload['Data']['Data'])} bars to {path}")
+
+
+if __name__ == "__main__":
+    main()
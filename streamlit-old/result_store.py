@@ -0,0 +1,251 @@
+"""
+Shared inference results keyed by (pair, bar timestamp), with single-flight.
+
+Every dashboard viewer of the same pair and minute needs the same result,
+so `ResultStore.get_or_compute(pair, bar, compute)` runs `compute` at most
+once per key: concurrent callers in this process wait on the in-flight
+call's Future, and with the SQLite backend callers in *other* processes
+see the key claimed and poll for its result instead of paying for a
+second transaction. A claim whose owner died is taken over after
+`claim_timeout` seconds. Failed results are not stored, so the next
+caller retries.
+
+    store = ResultStore(SqliteBackend("results.db"))
+    result = store.get_or_compute("ETH/USDT", bar, lambda: run_inference(client, features))
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class MemoryBackend:
+    """Process-local LRU of finished results."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pair, bar):
+        with self._lock:
+            entry = self._entries.get((pair, bar))
+            if entry is not None:
+                self._entries.move_to_end((pair, bar))
+            return entry
+
+    def put(self, pair, bar, result, now):
+        with self._lock:
+            self._entries[(pair, bar)] = (result, now)
+            self._entries.move_to_end((pair, bar))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # A single process has no one else to coordinate with
+    def claim(self, pair, bar, owner, now, claim_timeout):
+        return True
+
+    def release(self, pair, bar, owner):
+        pass
+
+    def prune(self, before):
+        with self._lock:
+            stale = [key for key, (_, t) in self._entries.items() if t < before]
+            for key in stale:
+                del self._entries[key]
+
+
+class SqliteBackend:
+    """
+    Results in a local SQLite file shared by every process on the host.
+
+    A row is either a claim (`result IS NULL`, held by `owner` since
+    `updated`) or a finished result as JSON.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            pair    TEXT    NOT NULL,
+            bar     INTEGER NOT NULL,
+            owner   TEXT,
+            result  TEXT,
+            updated REAL    NOT NULL,
+            PRIMARY KEY (pair, bar)
+        )
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(self.SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections are not shareable across threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return db
+
+    def get(self, pair, bar):
+        row = self._connect().execute(
+            "SELECT result, updated FROM results WHERE pair = ? AND bar = ? AND result IS NOT NULL",
+            (pair, bar),
+        ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def put(self, pair, bar, result, now):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO results (pair, bar, owner, result, updated) "
+            "VALUES (?, ?, NULL, ?, ?)",
+            (pair, bar, json.dumps(result, default=_jsonable), now),
+        )
+
+    def claim(self, pair, bar, owner, now, claim_timeout):
+        """Try to become the one process computing (pair, bar)."""
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT owner, result, updated FROM results WHERE pair = ? AND bar = ?",
+                             (pair, bar)).fetchone()
+            if row is None or (row[1] is None and now - row[2] > claim_timeout):
+                db.execute("INSERT OR REPLACE INTO results (pair, bar, owner, result, updated) "
+                           "VALUES (?, ?, ?, NULL, ?)", (pair, bar, owner, now))
+                claimed = True
+            else:
+                claimed = False
+            db.execute("COMMIT")
+            return claimed
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def release(self, pair, bar, owner):
+        """Drop our claim without a result so another caller can retry."""
+        self._connect().execute(
+            "DELETE FROM results WHERE pair = ? AND bar = ? AND owner = ? AND result IS NULL",
+            (pair, bar, owner),
+        )
+
+    def prune(self, before):
+        self._connect().execute("DELETE FROM results WHERE updated < ?", (before,))
+
+
+class ResultStore:
+    """
+    Single-flight result store in front of an expensive per-(pair, bar)
+    computation. See the module docstring.
+    """
+
+    def __init__(self, backend=None, ttl=3600.0, claim_timeout=120.0, poll_interval=0.25,
+                 clock=time.time):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.owner = uuid.uuid4().hex
+        self.computed = 0  # compute() calls made by this process
+        self.joined = 0    # callers that waited on an in-flight call in this process
+        self.awaited = 0   # callers that waited on another process's claim
+        self.hits = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def get(self, pair, bar):
+        """The stored result for (pair, bar), marked `cached`, or None."""
+        entry = self.backend.get(pair, bar)
+        if entry is None:
+            return None
+        result, stored_at = entry
+        return {**result, "cached": True, "cached_age": self.clock() - stored_at}
+
+    def get_or_compute(self, pair, bar, compute, timeout=None):
+        """
+        The result for (pair, bar), computing it at most once across all
+        concurrent callers. `compute()` returns a result dict; only
+        successful results are stored.
+        """
+        result = self.get(pair, bar)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        key = (pair, bar)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.joined += 1
+        if not leader:
+            return {**future.result(timeout), "shared": True}
+
+        try:
+            result = self._lead(pair, bar, compute, timeout)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _lead(self, pair, bar, compute, timeout):
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            now = self.clock()
+            if self.backend.claim(pair, bar, self.owner, now, self.claim_timeout):
+                break
+            # Another process is computing this key; wait for its result
+            result = self.get(pair, bar)
+            if result is not None:
+                self.awaited += 1
+                return {**result, "shared": True}
+            if deadline is not None and now >= deadline:
+                raise TimeoutError(f"timed out waiting for {pair} @ {bar}")
+            time.sleep(self.poll_interval)
+
+        try:
+            self.computed += 1
+            result = compute()
+        except BaseException:
+            self.backend.release(pair, bar, self.owner)
+            raise
+        if result.get("success"):
+            now = self.clock()
+            self.backend.put(pair, bar, result, now)
+            self._maybe_prune(now)
+        else:
+            self.backend.release(pair, bar, self.owner)
+        return result
+
+    def _maybe_prune(self, now):
+        if now - self._last_prune > self.ttl / 4:
+            self._last_prune = now
+            self.backend.prune(now - self.ttl)
+
+    def stats(self):
+        return {"computed": self.computed, "joined": self.joined, "awaited": self.awaited,
+                "hits": self.hits}
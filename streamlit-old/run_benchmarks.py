@@ -0,0 +1,55 @@
+"""
+Run the benchmark suite, track it over time and fail on regressions.
+
+Every run is saved under .benchmarks/ (one directory per machine, so
+numbers from different hardware are never compared) and checked against
+the previous saved run on this machine. The run fails if any
+benchmark's median got slower by more than `--threshold` percent.
+
+    python run_benchmarks.py                  # compare with the last run, then save this one
+    python run_benchmarks.py --threshold 10
+    python run_benchmarks.py --no-save        # compare only, e.g. while iterating
+    python run_benchmarks.py -- -k features   # extra pytest arguments after --
+
+The first run on a machine has nothing to compare with and only records
+the baseline. The wall-clock assertions in test_benchmarks.py (speedup
+and throughput floors) only apply under this runner.
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+from pytest_benchmark.utils import get_machine_id
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STORAGE = os.path.join(HERE, ".benchmarks")
+DEFAULT_THRESHOLD = 25.0  # percent
+
+
+def pytest_args(threshold=DEFAULT_THRESHOLD, save=True, extra=()):
+    args = [sys.executable, "-m", "pytest", "test_benchmarks.py", "--benchmark-only",
+            f"--benchmark-storage=file://{STORAGE}"]
+    # Only this machine's runs (the directory pytest-benchmark saves to and
+    # compares within); another machine's history is no baseline here
+    if glob.glob(os.path.join(STORAGE, get_machine_id(), "*.json")):
+        args += ["--benchmark-compare", f"--benchmark-compare-fail=median:{threshold:g}%"]
+    if save:
+        args.append("--benchmark-autosave")
+    return args + list(extra)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks with regression tracking")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="largest tolerated median regression, in percent")
+    parser.add_argument("--no-save", action="store_true", help="do not record this run")
+    parser.add_argument("pytest", nargs="*", help="extra pytest arguments (after --)")
+    args = parser.parse_args(argv)
+    return subprocess.call(pytest_args(args.threshold, not args.no_save, args.pytest), cwd=HERE)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Bar-close aligned scheduling.
+
+`BarScheduler` wakes once per bar, `offset` seconds after the bar closes
+(so the data provider has published it), optionally spread by up to
+`jitter` seconds so several instances do not hit the API in lock-step.
+Each wake-up runs one callback for the whole round of pairs; the
+callback gets a `Tick` describing which bar closed and how late the
+round started.
+
+Missed ticks (a round overran, the host slept) are either coalesced into
+a single catch-up round for the newest bar (`catch_up="coalesce"`, the
+default; incremental candle syncs backfill the gap anyway) or replayed
+one by one, oldest first, up to `max_catch_up` bars (`catch_up="each"`).
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+log = logging.getLogger("feeopt.scheduler")
+
+INTERVAL = 60
+CATCH_UP_MODES = ("coalesce", "each")
+
+
+def bar_close(now, interval=INTERVAL):
+    """Close time of the newest fully closed bar at `now` (= open of the forming one)."""
+    return int(now) // interval * interval
+
+
+class Tick:
+    """One scheduled round: the bar that closed and when the round started."""
+
+    def __init__(self, bar_close, scheduled, started, missed=0, catch_up=False):
+        self.bar_close = bar_close  # close time of the bar this round is for
+        self.scheduled = scheduled  # bar_close + offset + jitter
+        self.started = started
+        self.missed = missed        # ticks skipped since the previous round
+        self.catch_up = catch_up    # replaying a missed tick ("each" mode)
+
+    @property
+    def lateness(self):
+        """Seconds between the planned and the actual start."""
+        return self.started - self.scheduled
+
+    @property
+    def delay(self):
+        """Seconds from bar close to round start."""
+        return self.started - self.bar_close
+
+    def __repr__(self):
+        return (f"Tick(bar_close={self.bar_close}, delay={self.delay:.3f}s, "
+                f"missed={self.missed}, catch_up={self.catch_up})")
+
+
+class BarScheduler:
+    """
+    Runs `callback(tick)` once per closed bar.
+
+    `clock` and `sleep` default to the wall clock and `asyncio.sleep` and
+    can be swapped for a fake clock in tests. `stats()` reports rounds,
+    missed ticks, and start-delay / round-duration figures for the most
+    recent `history` rounds.
+    """
+
+    def __init__(self, interval=INTERVAL, offset=2.0, jitter=0.0, catch_up="coalesce",
+                 max_catch_up=5, clock=time.time, sleep=asyncio.sleep, history=1024):
+        if catch_up not in CATCH_UP_MODES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_MODES}, got {catch_up!r}")
+        if not 0 <= offset + jitter < interval:
+            raise ValueError("offset + jitter must fit inside one interval")
+        self.interval = interval
+        self.offset = offset
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.history = history
+        self.rounds = 0
+        self.missed = 0
+        self.failures = 0
+        self.last_bar = None
+        self._delays = []
+        self._durations = []
+
+    def next_wake(self, now):
+        """(bar_close, wake time) of the next round after `now`."""
+        close = bar_close(now - self.offset - self.jitter, self.interval)
+        if self.last_bar is not None and close <= self.last_bar:
+            close = self.last_bar + self.interval
+        spread = random.uniform(0.0, self.jitter) if self.jitter else 0.0
+        return close, close + self.offset + spread
+
+    def due(self, now):
+        """Ticks to run at `now`, oldest first (empty if the next bar has not closed)."""
+        latest = bar_close(now - self.offset, self.interval)
+        if self.last_bar is None:
+            return [latest]
+        missing = (latest - self.last_bar) // self.interval
+        if missing <= 0:
+            return []
+        if self.catch_up == "coalesce" or missing == 1:
+            return [latest]
+        count = min(missing, self.max_catch_up)
+        return [latest - self.interval * k for k in range(count - 1, -1, -1)]
+
+    async def run(self, callback, stop=None):
+        """Schedule `callback` (sync or async) until `stop` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            close, wake = self.next_wake(self.clock())
+            wait = wake - self.clock()
+            if wait > 0 and await self._wait(wait, stop):
+                break
+            await self.run_due(callback, scheduled=wake)
+
+    async def _wait(self, seconds, stop):
+        """Sleep `seconds` through `self.sleep`; True if `stop` was set meanwhile."""
+        sleeper = asyncio.ensure_future(self.sleep(seconds))
+        stopper = asyncio.ensure_future(stop.wait())
+        await asyncio.wait({sleeper, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (sleeper, stopper):
+            task.cancel()
+        return stop.is_set()
+
+    async def run_due(self, callback, scheduled=None):
+        """Run every due tick now; returns the ticks that ran."""
+        ticks = self.due(self.clock())
+        if not ticks:
+            return []
+        skipped = 0 if self.last_bar is None else (ticks[-1] - self.last_bar) // self.interval - 1
+        self.missed += max(skipped, 0)
+        ran = []
+        for k, close in enumerate(ticks):
+            started = self.clock()
+            tick = Tick(
+                close,
+                scheduled if scheduled is not None and close == ticks[-1] else close + self.offset,
+                started,
+                missed=max(skipped, 0) if k == len(ticks) - 1 else 0,
+                catch_up=k < len(ticks) - 1,
+            )
+            try:
+                result = callback(tick)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                self.failures += 1
+                log.exception("round for bar %d failed", close)
+            self.last_bar = close
+            self.rounds += 1
+            self._record(self._delays, tick.delay)
+            self._record(self._durations, self.clock() - started)
+            ran.append(tick)
+        return ran
+
+    def _record(self, values, value):
+        values.append(value)
+        if len(values) > self.history:
+            del values[:len(values) - self.history]
+
+    def stats(self):
+        def summary(values):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return {
+                "min": ordered[0],
+                "p50": ordered[len(ordered) // 2],
+                "max": ordered[-1],
+            }
+
+        return {
+            "rounds": self.rounds,
+            "missed": self.missed,
+            "failures": self.failures,
+            "last_bar": self.last_bar,
+            "start_delay": summary(self._delays),
+            "duration": summary(self._durations),
+        }
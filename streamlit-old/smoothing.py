@@ -0,0 +1,119 @@
+"""
+Fee smoothing and hysteresis between `llmad_to_fee` and publication.
+
+Publishing every raw fee would send a pool update transaction almost
+every minute, mostly for noise. `FeeSmoother` decides per pool whether
+a new fee is worth a transaction:
+
+1. EWMA: the raw fee is smoothed, faster upwards (`alpha_up`) than
+   downwards (`alpha_down`), so LPs are protected as soon as volatility
+   rises and the fee only relaxes once it has stayed low.
+2. Minimum change: the smoothed fee must differ from the published one
+   by at least `min_change_bps`.
+3. Hysteresis: a move against the direction of the last published
+   change needs `hysteresis_bps` more, so the fee does not flip-flop
+   around a threshold.
+4. Rate limit: at most one publication per pool every `min_interval`
+   seconds, unless the fee rises by `urgent_bps` or more.
+
+Every decision is counted in `feeopt_fee_decisions_total` by outcome.
+`apply` runs the same rules over a whole fee series for backtests.
+
+    smoother = FeeSmoother(min_change_bps=5, min_interval=300)
+    decision = smoother.update("ETH/USDT", llmad_to_fee(llmad), now)
+    if decision["publish"]:
+        set_pool_fee(decision["fee"])
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from metrics import FEE_DECISIONS, counter
+
+BPS = 1e-4
+OUTCOMES = ("published", "min_change", "hysteresis", "rate_limited")
+
+
+class FeeSmoother:
+    """Per-pool publish decisions for a stream of raw fees. See the module docstring."""
+
+    def __init__(self, alpha_up=0.5, alpha_down=0.1, min_change_bps=5.0, hysteresis_bps=5.0,
+                 min_interval=300.0, urgent_bps=25.0, clock=time.time):
+        self.alpha_up = alpha_up
+        self.alpha_down = alpha_down
+        self.min_change = min_change_bps * BPS
+        self.hysteresis = hysteresis_bps * BPS
+        self.min_interval = min_interval
+        self.urgent = urgent_bps * BPS
+        self.clock = clock
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _step(self, state, fee, now):
+        """
+        Advance one pool's state [smoothed, published, published_at,
+        direction] by one raw fee; returns the outcome.
+        """
+        smoothed, published, published_at, direction = state
+        if smoothed is None:
+            state[:] = [fee, fee, now, 0]
+            return "published"
+        smoothed += (self.alpha_up if fee > smoothed else self.alpha_down) * (fee - smoothed)
+        state[0] = smoothed
+        change = smoothed - published
+        if abs(change) < self.min_change:
+            return "min_change"
+        if direction and (change > 0) != (direction > 0) and abs(change) < self.min_change + self.hysteresis:
+            return "hysteresis"
+        if now - published_at < self.min_interval and change < self.urgent:
+            return "rate_limited"
+        state[1:] = [smoothed, now, 1 if change > 0 else -1]
+        return "published"
+
+    def update(self, pool, fee, now=None):
+        """
+        Feed one raw fee for `pool`. Returns {"publish", "fee" (the fee
+        now in effect), "smoothed", "raw", "outcome"}.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._pools.setdefault(pool, [None, None, None, 0])
+            outcome = self._step(state, float(fee), now)
+            self.counts[outcome] += 1
+        counter(FEE_DECISIONS).inc(outcome=outcome)
+        return {"publish": outcome == "published", "fee": state[1], "smoothed": state[0],
+                "raw": float(fee), "outcome": outcome}
+
+    def published(self, pool):
+        """The fee last published for `pool`, or None."""
+        state = self._pools.get(pool)
+        return None if state is None else state[1]
+
+    def apply(self, fees, times):
+        """
+        Run the rules over one pool's raw fee series (fresh state, no
+        metrics). Returns (fee in effect per step, bool mask of publications).
+        """
+        effective = np.empty(len(fees))
+        publish = np.zeros(len(fees), dtype=bool)
+        state = [None, None, None, 0]
+        step = self._step
+        for k, (fee, now) in enumerate(zip(np.asarray(fees, dtype=np.float64).tolist(),
+                                           np.asarray(times, dtype=np.float64).tolist())):
+            publish[k] = step(state, fee, now) == "published"
+            effective[k] = state[1]
+        return effective, publish
+
+    def stats(self):
+        total = sum(self.counts.values())
+        return {**self.counts, "decisions": total,
+                "suppressed": total - self.counts["published"], "pools": len(self._pools)}
+
+
+def count_updates(fees):
+    """Publications a fee series needs without smoothing: one per change."""
+    fees = np.asarray(fees)
+    return int(len(fees) > 0) + int(np.count_nonzero(np.diff(fees)))
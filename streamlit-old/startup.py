@@ -0,0 +1,124 @@
+"""
+Startup import-time report.
+
+Runs `python -X importtime` in a fresh interpreter and summarizes where
+cold-start time goes, flagging heavy dependencies (the OpenGradient SDK,
+plotly) that should only load on the paths that need them.
+
+    python startup.py                       # the modules app.py imports at load
+    python startup.py feeopt --top 10
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def top_level_imports(path):
+    """
+    Non-stdlib packages a script imports at module level, in source order.
+    Imports nested in functions or blocks are lazy and not included.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    roots = (name.split(".")[0] for name in names)
+    return tuple(dict.fromkeys(r for r in roots if r not in sys.stdlib_module_names))
+
+
+# What app.py imports before the first render (Streamlit itself included)
+APP_MODULES = top_level_imports(os.path.join(HERE, "app.py"))
+HEAVY_MODULES = ("opengradient", "plotly", "onnxruntime")
+# What these import is out of our hands
+THIRD_PARTY = tuple(m for m in APP_MODULES if not os.path.exists(os.path.join(HERE, f"{m}.py")))
+
+
+def import_profile(modules, python=sys.executable, cwd=None):
+    """
+    Import `modules` in a fresh interpreter under `-X importtime`.
+
+    Returns a list of (module, self_us, cumulative_us, depth) in load order.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([python, "-X", "importtime", "-c", code], capture_output=True,
+                          text=True, cwd=cwd)
+    if proc.returncode:
+        raise RuntimeError(f"importing {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def parse_importtime(text):
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def total_seconds(profile):
+    return sum(self_us for _, self_us, _, _ in profile) / 1e6
+
+
+def heavy_loaded(profile, heavy=HEAVY_MODULES):
+    """{heavy package: the top-level import that pulled it in}."""
+    found = {}
+    pending = []
+    # importtime lists a module after everything it imported, so the next
+    # depth-0 line after a heavy module is the import that caused it
+    for name, _, _, depth in profile:
+        root = name.split(".")[0]
+        if root in heavy and root not in found:
+            pending.append(root)
+        if depth == 0:
+            for package in pending:
+                found.setdefault(package, name)
+            pending = []
+    return found
+
+
+def report(profile, top=15):
+    """Text summary: total, slowest top-level packages, heavy modules."""
+    packages = {}
+    for name, self_us, _, _ in profile:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    lines = [f"total import time: {total_seconds(profile) * 1000:.1f} ms "
+             f"({len(profile)} modules)", "", f"{'package':<28}{'ms':>10}"]
+    for root, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"{root:<28}{us / 1000:>10.1f}")
+    heavy = heavy_loaded(profile)
+    lines.append("")
+    lines.append("heavy modules loaded: " + (", ".join(f"{package} (via {importer})"
+                                                     for package, importer in sorted(heavy.items()))
+                                            or "none"))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import report")
+    parser.add_argument("modules", nargs="*", default=list(APP_MODULES))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--fail-on-heavy", action="store_true",
+                        help="exit 1 if one of our own modules imports a heavy package")
+    args = parser.parse_args(argv)
+
+    profile = import_profile(args.modules)
+    print(report(profile, args.top))
+    if args.fail_on_heavy and set(heavy_loaded(profile).values()) - set(THIRD_PARTY):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Incremental feature engine.
+
+`StreamingFeatureEngine` keeps just enough state (small ring buffers,
+running sums and monotonic deques) to update all 15 features in constant
+time per new candle, instead of re-running `engineer_features` over the
+whole window on every bar.
+"""
+
+import math
+from collections import deque
+
+from features import (
+    LOOKBACKS,
+    MIN_CANDLES,
+    MOMENTUM_LOOKBACK,
+    RANGE_WINDOW,
+    STD_WINDOWS,
+    VWV_WINDOW,
+)
+
+# Running sums are rebuilt from the ring buffers this often to stop
+# floating-point drift from accumulating on long-lived streams.
+RESYNC_EVERY = 1024
+
+
+def _log_ratio(a, b):
+    if b <= 0 or a <= 0:
+        return 0.0
+    return math.log(a / b)
+
+
+def _clean_log_ratio(a, b):
+    return math.log(a / b)
+
+
+def _safe_log(x):
+    return math.log(x) if x > 0 else math.nan
+
+
+class _MonotonicWindow:
+    """Sliding max (or min) over the last `size` values, amortized O(1)."""
+
+    def __init__(self, size, is_max=True):
+        self.size = size
+        self.is_max = is_max
+        self._items = deque()  # (index, value), best value at the front
+
+    def push(self, index, value):
+        items = self._items
+        if self.is_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((index, value))
+        while items[0][0] <= index - self.size:
+            items.popleft()
+        return items[0][1]
+
+
+class _RollingSums:
+    """Running sum and sum of squares over the last `size` values."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if not math.isfinite(self.total):
+            # A NaN poisons the running sums even after it leaves the window
+            self.resync()
+
+    def resync(self):
+        self.total = math.fsum(self.values)
+        self.total_sq = math.fsum(v * v for v in self.values)
+
+    def std(self):
+        n = len(self.values)
+        if n == 0:
+            return 0.0
+        mean = self.total / n
+        return math.sqrt(max(self.total_sq / n - mean * mean, 0.0))
+
+
+class StreamingFeatureEngine:
+    """
+    Stateful, O(1)-per-candle version of `engineer_features`.
+
+    Feed closed candles in time order with `push`. Once `MIN_CANDLES`
+    candles have been seen, each push returns the same 15 features that
+    `engineer_features` would return for the history so far.
+
+    `clean=True` promises validated candles (see
+    `validation.validate_candles`) and skips the per-value guards.
+    """
+
+    def __init__(self, clean=False):
+        self.count = 0
+        # Validated input (positive, finite prices) skips the per-value guards
+        self._log_ratio = _clean_log_ratio if clean else _log_ratio
+        self._log = math.log if clean else _safe_log
+        self.features = None
+
+        longest = max(max(LOOKBACKS), MOMENTUM_LOOKBACK)
+        self._highs = deque(maxlen=longest + 1)
+        self._lows = deque(maxlen=longest + 1)
+        self._closes = deque(maxlen=longest + 1)
+        self._last_log_close = None
+
+        self._max_high = [_MonotonicWindow(lb + 1, is_max=True) for lb in LOOKBACKS]
+        self._min_low = [_MonotonicWindow(lb + 1, is_max=False) for lb in LOOKBACKS]
+        self._returns = [_RollingSums(w) for w in STD_WINDOWS]
+        # Short windows are summed exactly so all-zero windows compare as zero
+        self._ranges = deque(maxlen=RANGE_WINDOW + 1)
+        self._weighted_returns = deque(maxlen=VWV_WINDOW)
+        self._volumes = deque(maxlen=VWV_WINDOW)
+
+    @classmethod
+    def from_history(cls, candles, clean=False):
+        """Build an engine warmed up on an existing list of candles."""
+        engine = cls(clean)
+        for candle in candles:
+            engine.push(candle)
+        return engine
+
+    def _lagged(self, values, lag):
+        """values[max(0, i - lag)] from a ring holding the latest bars."""
+        return values[max(0, len(values) - 1 - lag)]
+
+    def push(self, candle):
+        """Add one closed candle; return the 15 features once warmed up."""
+        high = float(candle["high"])
+        low = float(candle["low"])
+        close = float(candle["close"])
+        volume = float(candle["volume"])
+        i = self.count
+
+        self._highs.append(high)
+        self._lows.append(low)
+        self._closes.append(close)
+
+        log_ratio = self._log_ratio
+        features = []
+
+        # 1-3: Log high-low range
+        for max_high, min_low in zip(self._max_high, self._min_low):
+            features.append(log_ratio(max_high.push(i, high), min_low.push(i, low)))
+
+        # 4-9: Log return of high and low prices
+        for lb in LOOKBACKS:
+            features.append(log_ratio(high, self._lagged(self._highs, lb)))
+        for lb in LOOKBACKS:
+            features.append(log_ratio(low, self._lagged(self._lows, lb)))
+
+        # 10-12: Rolling std of log returns
+        log_close = self._log(close)
+        if self._last_log_close is not None:
+            ret = log_close - self._last_log_close
+            for sums in self._returns:
+                sums.push(ret)
+            self._weighted_returns.append(abs(ret) * volume)
+            self._volumes.append(volume)
+        self._last_log_close = log_close
+        for sums in self._returns:
+            features.append(sums.std())
+
+        # 13: High-low range ratio
+        current_range = high - low
+        self._ranges.append(current_range)
+        avg_range = math.fsum(self._ranges) / len(self._ranges)
+        features.append(current_range / avg_range if avg_range > 0 else 1.0)
+
+        # 14: Price momentum
+        features.append(log_ratio(close, self._lagged(self._closes, MOMENTUM_LOOKBACK)))
+
+        # 15: Volume-weighted volatility proxy
+        den = math.fsum(self._volumes)
+        num = math.fsum(self._weighted_returns)
+        features.append(num / den if den > 0 else 0.0)
+
+        self.count += 1
+        if self.count % RESYNC_EVERY == 0:
+            for sums in self._returns:
+                sums.resync()
+
+        self.features = features if self.count >= MIN_CANDLES else None
+        return self.features
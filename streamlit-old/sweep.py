@@ -0,0 +1,206 @@
+"""
+Parallel parameter sweep over fee-curve settings.
+
+Evaluates a grid of `fee_curve` parameters (shape, min/max fee, LLMAD
+cap, steepness, midpoint) against one historical LLMAD series using the
+backtest's LP simulation, and ranks the configurations by net LP revenue.
+
+The LLMAD, volume and price arrays are placed in one shared-memory block
+that every worker process maps at start-up, so a sweep over months of
+bars never pickles the series to the workers; only the small parameter
+dicts travel over the pool's pipes.
+
+    python sweep.py ETH USDT --root candles/ --days 30
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from archive import CandleArchive
+from backtest import DEFAULT_ELASTICITY, DEFAULT_POOL_VALUE, simulate_policy
+from config import STATIC_FEE
+from features import MIN_CANDLES, engineer_features_batch
+from fees import fee_curve
+from validation import validate_candles
+
+SERIES = ("llmad", "volume", "close", "next_close")
+
+DEFAULT_GRID = {
+    "shape": ["linear", "piecewise", "log", "sigmoid"],
+    "min_fee": [0.0001, 0.0005, 0.001],
+    "max_fee": [0.005, 0.008, 0.01],
+    "llmad_max": [0.005, 0.01, 0.02],
+    "steepness": [5.0, 10.0],
+    "midpoint": [0.3, 0.5],
+}
+
+
+def expand_grid(grid):
+    """Every combination of a {param: [values]} grid, minus duplicates that
+    differ only in parameters their shape ignores."""
+    keys = list(grid)
+    seen = set()
+    out = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(zip(keys, values))
+        shape = params.get("shape", "linear")
+        if shape == "linear":
+            params.pop("steepness", None)
+            params.pop("midpoint", None)
+        elif shape == "piecewise":
+            params.pop("steepness", None)
+        elif shape == "log":
+            params.pop("midpoint", None)
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(params)
+    return out
+
+
+def evaluate(params, series, static_fee=STATIC_FEE, elasticity=DEFAULT_ELASTICITY,
+             pool_value=DEFAULT_POOL_VALUE):
+    """Net LP revenue and friends for one fee-curve configuration."""
+    fee = fee_curve(series["llmad"], **params)
+    sim = simulate_policy(fee, series["volume"], series["close"], series["next_close"],
+                          static_fee, elasticity, pool_value)
+    revenue = float(sim["revenue"].sum())
+    arb_loss = float(sim["arb_loss"].sum())
+    return {
+        **params,
+        "mean_fee": float(fee.mean()),
+        "revenue": revenue,
+        "arb_loss": arb_loss,
+        "net": revenue - arb_loss,
+    }
+
+
+# ─── Worker Side ─────────────────────────────────────────────────────────────
+_worker = {}
+
+
+def _attach(name, length, options):
+    """Pool initializer: map the shared block as read-only column views."""
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(SERIES), length), dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    _worker["shm"] = shm
+    _worker["series"] = dict(zip(SERIES, block))
+    _worker["options"] = options
+
+
+def _evaluate_chunk(chunk):
+    return [evaluate(params, _worker["series"], **_worker["options"]) for params in chunk]
+
+
+# ─── Driver ──────────────────────────────────────────────────────────────────
+def run_sweep(series, grid=None, workers=None, chunk_size=8, static_fee=STATIC_FEE,
+              elasticity=DEFAULT_ELASTICITY, pool_value=DEFAULT_POOL_VALUE):
+    """
+    Evaluate every grid configuration over `series` on a process pool.
+
+    `series` maps "llmad", "volume", "close" and "next_close" to equal-length
+    arrays (see `build_series`). Returns (ranked results, stats),
+    best net revenue first; the first row is the static-fee baseline for
+    reference.
+    """
+    configs = expand_grid(grid or DEFAULT_GRID)
+    length = len(series["llmad"])
+    options = {"static_fee": static_fee, "elasticity": elasticity, "pool_value": pool_value}
+    workers = workers or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(SERIES) * length * 8))
+    try:
+        block = np.ndarray((len(SERIES), length), dtype=np.float64, buffer=shm.buf)
+        for row, name in zip(block, SERIES):
+            row[:] = series[name]
+        chunks = [configs[k:k + chunk_size] for k in range(0, len(configs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, length, options)) as pool:
+            results = [r for chunk in pool.map(_evaluate_chunk, chunks) for r in chunk]
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+    elapsed = time.perf_counter() - t0
+
+    baseline = evaluate({"shape": "linear", "min_fee": static_fee, "max_fee": static_fee}, series,
+                        **options)
+    baseline["shape"] = "static"
+    results.sort(key=lambda r: r["net"], reverse=True)
+    stats = {
+        "configs": len(configs),
+        "rows": length,
+        "workers": workers,
+        "seconds": elapsed,
+        "configs_per_s": len(configs) / elapsed if elapsed else float("inf"),
+    }
+    return [baseline] + results, stats
+
+
+def build_series(candles, model=None, validate=True):
+    """
+    The arrays a sweep needs: LLMAD predictions aligned with next-bar
+    prices. `validate` repairs the bars first, as `run_backtest` does, so
+    the sweep and the backtest see the same features.
+    """
+    if model is None:
+        from local_model import load_local_model
+        model = load_local_model()
+    if validate:
+        candles = validate_candles(candles)[0]
+    features = engineer_features_batch(candles, clean=validate)
+    rows = slice(MIN_CANDLES - 1, max(MIN_CANDLES - 1, len(candles) - 1))
+    return {
+        "llmad": np.asarray(model.predict(features[rows]), dtype=np.float64),
+        "volume": candles.volume[rows],
+        "close": candles.close[rows],
+        "next_close": candles.close[1:][rows],
+    }
+
+
+def format_table(results, limit=20):
+    cols = ["shape", "min_fee", "max_fee", "llmad_max", "steepness", "midpoint",
+            "mean_fee", "net"]
+    lines = ["  ".join(f"{c:>10}" for c in cols)]
+    for r in results[:limit]:
+        cells = []
+        for c in cols:
+            v = r.get(c, "")
+            if isinstance(v, float):
+                v = f"{v:,.2f}" if c == "net" else f"{v:.4g}"
+            cells.append(f"{v:>10}")
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank fee-curve settings over archived history")
+    parser.add_argument("fsym")
+    parser.add_argument("tsym")
+    parser.add_argument("--root", default=os.getenv("CANDLE_ARCHIVE_DIR", "candles"))
+    parser.add_argument("--days", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    archive = CandleArchive(args.root)
+    start = None
+    if args.days is not None:
+        start = (archive.last_time(args.fsym, args.tsym) or 0) - args.days * 86400
+    series = build_series(archive.read(args.fsym, args.tsym, start=start))
+    results, stats = run_sweep(series, workers=args.workers)
+    print(format_table(results, args.top))
+    print(f"{stats['configs']} configs x {stats['rows']:,} bars on {stats['workers']} workers "
+          f"in {stats['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Tests for the memory-mapped candle archive."""
+
+import asyncio
+import os
+
+import numpy as np
+
+from archive import CandleArchive, backfill
+from candles import RECORD_DTYPE, CandleBuffer
+from features import engineer_features_batch
+from fetcher import AsyncCandleFetcher
+
+
+def test_append_skips_forming_bar_and_duplicates(tmp_path, make_candles):
+    archive = CandleArchive(tmp_path)
+    buf = CandleBuffer.from_candles(make_candles(100))
+    now = buf.last_time + 30  # last bar still forming
+
+    assert archive.append("ETH", "USDT", buf, now=now) == 99
+    assert archive.append("ETH", "USDT", buf, now=now + 60) == 1
+    assert archive.append("ETH", "USDT", buf, now=now + 60) == 0
+    np.testing.assert_array_equal(archive.read("ETH", "USDT").close, buf.close)
+
+
+def test_read_range_is_memory_mapped(tmp_path, make_candles):
+    archive = CandleArchive(tmp_path)
+    buf = CandleBuffer.from_candles(make_candles(500))
+    archive.append("ETH", "USDT", buf, now=buf.last_time + 60)
+
+    part = archive.read("ETH", "USDT", start=buf.time[100], end=buf.time[200])
+    assert len(part) == 100
+    assert not part.close.flags.writeable  # a view of the read-only mapping, not a copy
+    np.testing.assert_array_equal(engineer_features_batch(archive.read("ETH", "USDT")),
+                                  engineer_features_batch(buf))
+
+
+def test_torn_trailing_record_is_ignored(tmp_path, make_candles):
+    archive = CandleArchive(tmp_path)
+    buf = CandleBuffer.from_candles(make_candles(10))
+    archive.append("ETH", "USDT", buf, now=buf.last_time + 60)
+    with open(archive.path("ETH", "USDT"), "ab") as f:
+        f.write(b"\x00" * 7)
+
+    assert len(archive.read("ETH", "USDT")) == 10
+    assert archive.pairs() == [("ETH", "USDT")]
+
+    # The next append drops the torn bytes instead of writing after them
+    more = CandleBuffer.from_candles(make_candles(15))
+    assert archive.append("ETH", "USDT", more, now=more.last_time + 60) == 5
+    read = archive.read("ETH", "USDT")
+    assert os.path.getsize(archive.path("ETH", "USDT")) == 15 * RECORD_DTYPE.itemsize
+    np.testing.assert_array_equal(read.time, more.time)
+    np.testing.assert_array_equal(read.close, more.close)
+
+
+def test_backfill_pages_and_resumes(tmp_path, cryptocompare):
+    archive = CandleArchive(tmp_path)
+    end = cryptocompare.now // 60 * 60
+    start = end - 60 * 5000
+
+    async def run(start):
+        async with AsyncCandleFetcher(base_url=cryptocompare.url) as fetcher:
+            return await backfill(archive, fetcher, "ETH", "USDT", start, end=end)
+
+    assert asyncio.run(run(start)) == 5000
+    times = archive.read("ETH", "USDT").time
+    assert times[0] == start and times[-1] == end - 60
+    assert np.all(np.diff(times) == 60)
+    assert asyncio.run(run(start)) == 0
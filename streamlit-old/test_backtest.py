@@ -0,0 +1,27 @@
+"""Tests for the vectorized fee backtester."""
+
+import numpy as np
+import pytest
+
+from backtest import run_backtest
+from config import STATIC_FEE
+from fees import llmad_to_fee, llmad_to_fee_batch
+from local_model import HeuristicModel
+
+
+def test_fee_batch_matches_scalar():
+    llmad = np.linspace(-0.02, 0.02, 101)
+    np.testing.assert_allclose(llmad_to_fee_batch(llmad), [llmad_to_fee(x) for x in llmad])
+
+
+def test_static_fee_policy_matches_baseline(make_buffer):
+    candles = make_buffer(5000)
+    result = run_backtest(candles, model=HeuristicModel(),
+                          fee_fn=lambda llmad: np.full_like(llmad, STATIC_FEE))
+    summary = result.summary()
+
+    assert len(result) == 5000 - 60
+    assert summary["dynamic"]["revenue"] == pytest.approx(summary["static"]["revenue"])
+    assert summary["static"]["volume"] == pytest.approx(
+        float(np.sum(candles.volume[59:-1] * candles.close[59:-1])))
+
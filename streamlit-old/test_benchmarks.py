@@ -0,0 +1,203 @@
+"""
+Offline benchmarks for the fee pipeline's hot paths (pytest-benchmark).
+
+Inputs come from the recorded `histominute` payload in fixtures/ (see
+record_fixtures.py) and the mock OpenGradient client, so nothing touches
+the network.
+
+    pip install pytest-benchmark
+    # save this run under .benchmarks/ and fail if any median regressed
+    # by more than 25% against the previous saved run
+    python run_benchmarks.py
+
+Saved runs accumulate in .benchmarks/ so trends can be compared with
+`pytest-benchmark compare`. The plain test run executes the benchmarks
+too (a few seconds) and checks their results, so a broken hot path fails
+either way. Wall-clock floors (speedups, throughput) are only asserted
+under --benchmark-only, so a loaded CI machine cannot fail the unit run.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backtest import run_backtest  # noqa: E402
+from conftest import MockOpenGradientClient  # noqa: E402
+from features import MIN_CANDLES, N_FEATURES, engineer_features, engineer_features_batch  # noqa: E402
+from fees import MAX_FEE, MIN_FEE, llmad_to_fee, llmad_to_fee_batch  # noqa: E402
+from fetcher import parse_histominute  # noqa: E402
+from inference import (  # noqa: E402
+    DEVNET_MISSING_EVENT, estimate_llmad_batch, estimate_llmad_from_features, run_inference,
+    run_inference_batch,
+)
+from local_model import HeuristicModel  # noqa: E402
+from metrics import Histogram  # noqa: E402
+from multires import MultiResolutionFeatures  # noqa: E402
+from record_fixtures import load_fixture  # noqa: E402
+from startup import APP_MODULES  # noqa: E402
+
+WINDOW = 121  # bars `fetch_ohlc` hands to engineer_features
+
+
+@pytest.fixture
+def speed_checks(request):
+    """True when timing assertions apply (--benchmark-only, as run_benchmarks.py runs)."""
+    return request.config.getoption("benchmark_only")
+
+
+@pytest.fixture(scope="module")
+def payload():
+    return load_fixture("ETH", "USDT")
+
+
+@pytest.fixture(scope="module")
+def recorded(payload):
+    return parse_histominute(payload)
+
+
+@pytest.fixture(scope="module")
+def window(recorded):
+    return recorded[-WINDOW:]
+
+
+@pytest.fixture(scope="module")
+def features(window):
+    return engineer_features(window)
+
+
+@pytest.fixture(scope="module")
+def feature_rows(recorded):
+    return engineer_features_batch(recorded)[MIN_CANDLES - 1:]
+
+
+# ─── Candles ─────────────────────────────────────────────────────────────────
+def test_parse_histominute(benchmark, payload):
+    candles = benchmark(parse_histominute, payload)
+    assert len(candles) == len(payload["Data"]["Data"])
+
+
+def test_parse_histominute_window(benchmark, payload):
+    # What `fetch_ohlc` parses on a cold cache
+    raw = {**payload, "Data": {"Data": payload["Data"]["Data"][-WINDOW:]}}
+    candles = benchmark(parse_histominute, raw)
+    assert len(candles) == WINDOW
+
+
+# ─── Features ────────────────────────────────────────────────────────────────
+def test_engineer_features(benchmark, window):
+    features = benchmark(engineer_features, window)
+    assert len(features) == N_FEATURES
+
+
+def test_engineer_features_dicts(benchmark, window):
+    candles = [window[k] for k in range(len(window))]
+    features = benchmark(engineer_features, candles)
+    assert len(features) == N_FEATURES
+
+
+def test_engineer_features_batch(benchmark, recorded, speed_checks):
+    rows = benchmark(engineer_features_batch, recorded)
+    assert rows.shape == (len(recorded), N_FEATURES)
+    if speed_checks:
+        t0 = time.perf_counter()
+        for i in range(MIN_CANDLES - 1, len(recorded)):
+            engineer_features(recorded[:i + 1])
+        per_index = time.perf_counter() - t0
+        assert per_index / benchmark.stats.stats.median >= 50
+
+
+def test_multires_features(benchmark, recorded):
+    builder = MultiResolutionFeatures(resolutions=(60, 300, 900), base=60)
+    row = benchmark(builder.latest, recorded)
+    assert row.shape == (builder.width,)
+
+
+# ─── Estimates And Fees ──────────────────────────────────────────────────────
+def test_estimate_llmad_from_features(benchmark, features):
+    llmad = benchmark(estimate_llmad_from_features, features)
+    assert llmad >= 0
+
+
+def test_estimate_llmad_batch(benchmark, feature_rows):
+    llmad = benchmark(estimate_llmad_batch, feature_rows)
+    assert len(llmad) == len(feature_rows)
+
+
+def test_llmad_to_fee(benchmark):
+    fee = benchmark(llmad_to_fee, 0.004)
+    assert MIN_FEE <= fee <= MAX_FEE
+
+
+def test_llmad_to_fee_batch(benchmark, feature_rows):
+    llmad = estimate_llmad_batch(feature_rows)
+    fees = benchmark(llmad_to_fee_batch, llmad)
+    assert np.all((fees >= MIN_FEE) & (fees <= MAX_FEE))
+
+
+# ─── Inference Branches ──────────────────────────────────────────────────────
+def test_run_inference_on_chain(benchmark, features):
+    result = benchmark(run_inference, MockOpenGradientClient(), features)
+    assert result["source"] == "on-chain"
+
+
+def test_run_inference_missing_output(benchmark, features):
+    result = benchmark(run_inference, MockOpenGradientClient(output=False), features)
+    assert result["source"] == "local-estimate"
+
+
+def test_run_inference_devnet_missing_event(benchmark, features):
+    client = MockOpenGradientClient(error=RuntimeError(f"tx ok: {DEVNET_MISSING_EVENT}"))
+    result = benchmark(run_inference, client, features)
+    assert result.get("devnet_note")
+
+
+def test_run_inference_error(benchmark, features):
+    result = benchmark(run_inference, MockOpenGradientClient(error=RuntimeError("rpc down")), features)
+    assert not result["success"]
+
+
+def test_run_inference_batch(benchmark, feature_rows):
+    rows = feature_rows[:256]
+    results = benchmark(run_inference_batch, MockOpenGradientClient(), rows)
+    assert len(results) == len(rows)
+
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+def test_histogram_observe(benchmark, speed_checks):
+    hist = Histogram("overhead_seconds")
+    benchmark(hist.observe, 0.001, stage="x")
+    assert hist.count(stage="x") >= 1
+    if speed_checks:
+        assert benchmark.stats.stats.median < 20e-6
+
+
+# ─── Backtest ────────────────────────────────────────────────────────────────
+def test_backtest_throughput(benchmark, make_buffer, speed_checks):
+    candles = make_buffer(1_000_000)
+    result = benchmark.pedantic(run_backtest, args=(candles,), kwargs={"model": HeuristicModel()},
+                                rounds=3, iterations=1)
+    summary = result.summary()
+    assert summary["rows"] == 1_000_000 - 60
+    assert summary["dynamic"]["revenue"] > 0
+    if speed_checks:
+        assert summary["rows"] / benchmark.stats.stats.median > 200_000
+
+
+# ─── Startup ─────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("modules", [APP_MODULES, ("feeopt",)], ids=["app", "feeopt"])
+def test_cold_import(benchmark, modules):
+    # A fresh interpreter per round: what a new container pays before the first render
+    code = "; ".join(f"import {m}" for m in modules)
+    cwd = os.path.dirname(os.path.abspath(__file__))
+
+    def run():
+        return subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True)
+
+    proc = benchmark.pedantic(run, rounds=3, iterations=1, warmup_rounds=1)
+    assert proc.returncode == 0, proc.stderr.decode()[-500:]
@@ -0,0 +1,71 @@
+"""Tests for the columnar candle buffer."""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from candles import CandleBuffer
+from features import engineer_features, engineer_features_batch
+
+
+def test_from_candles_roundtrip(make_candles):
+    candles = make_candles(120)
+    buf = CandleBuffer.from_candles(candles)
+
+    assert len(buf) == 120
+    assert buf[-1] == candles[-1]
+    assert buf.last_time == int(candles[-1]["timestamp"].timestamp())
+    assert engineer_features(buf) == engineer_features(candles)
+    np.testing.assert_array_equal(engineer_features_batch(buf), engineer_features_batch(candles))
+
+
+def test_column_views_are_zero_copy(make_candles):
+    buf = CandleBuffer.from_candles(make_candles(10))
+    view = buf.close
+    buf.set_last(1.0, 2.0, 0.5, 1.5, 10.0)
+
+    assert view[-1] == 1.5
+    assert np.shares_memory(buf[2:5].close, buf.close)
+
+
+def test_append_and_maxlen_trim():
+    buf = CandleBuffer(maxlen=100)
+    for t in range(1000):
+        buf.append(60 * t, t, t + 1, t - 1, t, 1.0)
+
+    assert len(buf) == 100
+    np.testing.assert_array_equal(buf.time, 60 * np.arange(900, 1000))
+    np.testing.assert_array_equal(buf.close, np.arange(900, 1000))
+
+
+def test_slice_append_does_not_touch_parent(make_candles):
+    buf = CandleBuffer.from_candles(make_candles(10))
+    head = buf[:5]
+    head.append(0, 1.0, 1.0, 1.0, 1.0, 1.0)
+
+    assert len(head) == 6 and len(buf) == 10
+    assert buf.close[5] != 1.0
+
+
+def test_parent_compaction_does_not_shift_live_slices():
+    buf = CandleBuffer(maxlen=100)
+    for t in range(150):
+        buf.append(60 * t, t, t + 1, t - 1, t, 1.0)
+    tail = buf[-10:]
+    before = tail.close.copy()
+    for t in range(150, 1000):  # trims and compacts the parent many times
+        buf.append(60 * t, t, t + 1, t - 1, t, 1.0)
+
+    np.testing.assert_array_equal(tail.close, before)
+    with pytest.raises(IndexError):
+        CandleBuffer().set_last(1.0, 1.0, 1.0, 1.0, 1.0)
+
+
+def test_pickle_keeps_only_live_bars(make_candles):
+    buf = CandleBuffer(capacity=4096)
+    buf.extend(CandleBuffer.from_candles(make_candles(10)))
+    clone = pickle.loads(pickle.dumps(buf))
+
+    assert len(pickle.dumps(buf)) < 4096
+    np.testing.assert_array_equal(clone.close, buf.close)
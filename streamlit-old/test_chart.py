@@ -0,0 +1,93 @@
+"""Tests for the downsampled chart pyramid."""
+
+import numpy as np
+import pytest
+
+from candles import PRICE_COLUMNS, CandleBuffer
+from chart import ChartPyramid, resample
+
+
+def _naive_resample(candles, interval):
+    buckets = {}
+    for k in range(len(candles)):
+        bucket = int(candles.time[k]) // interval * interval
+        o, h, l, c, v = (float(candles.column(name)[k]) for name in PRICE_COLUMNS)
+        if bucket not in buckets:
+            buckets[bucket] = [o, h, l, c, v]
+        else:
+            bar = buckets[bucket]
+            bar[1], bar[2], bar[3], bar[4] = max(bar[1], h), min(bar[2], l), c, bar[4] + v
+    return buckets
+
+
+def _assert_same(a, b):
+    assert list(a.time) == list(b.time)
+    for name in PRICE_COLUMNS:
+        np.testing.assert_allclose(a.column(name), b.column(name))
+
+
+@pytest.mark.parametrize("interval", [300, 3600])
+def test_resample_matches_naive(make_buffer, interval):
+    candles = make_buffer(1000, start=1_700_000_020 // 60 * 60)
+    bars = resample(candles, interval)
+    naive = _naive_resample(candles, interval)
+
+    assert list(bars.time) == sorted(naive)
+    for k, bucket in enumerate(sorted(naive)):
+        assert [float(bars.column(name)[k]) for name in PRICE_COLUMNS] == \
+            pytest.approx(naive[bucket])
+
+
+def test_incremental_updates_match_full_resample(make_buffer):
+    candles = make_buffer(1960)
+    pyramid = ChartPyramid()
+    pyramid.extend(candles[:700])
+    # Live polls overlap the previous one and end in a still-forming bar
+    # whose final values only arrive with the next poll
+    for end in range(760, 1961, 60):
+        window = candles[end - 120:end].to_records()
+        window["close"][-1] *= 1.001
+        pyramid.extend(CandleBuffer.from_records(window))
+    pyramid.extend(candles[-1:])
+
+    _assert_same(pyramid.base, candles)
+    for interval in pyramid.levels[1:]:
+        _assert_same(pyramid.level(interval), resample(candles, interval))
+
+
+def test_view_is_bounded_by_max_points(make_buffer):
+    candles = make_buffer(30 * 1440)  # a month of minute bars
+    pyramid = ChartPyramid(max_points=600)
+    pyramid.extend(candles)
+    end = candles.last_time + 60
+
+    assert pyramid.view(end - 6 * 3600, end)[0] == 60
+    assert pyramid.view(end - 24 * 3600, end)[0] == 300
+    interval, bars = pyramid.view()
+    assert interval == 3600
+    assert len(bars) == 600
+    assert bars.last_time == candles.last_time // 3600 * 3600
+
+
+def test_since_returns_only_the_delta(make_buffer):
+    candles = make_buffer(600)
+    pyramid = ChartPyramid()
+    pyramid.extend(candles[:500])
+    held = pyramid.level(300).last_time
+    pyramid.extend(candles[500:])
+
+    delta = pyramid.since(300, held)
+    assert delta.time[0] == held
+    assert delta.last_time == pyramid.level(300).last_time
+    _assert_same(delta, resample(candles, 300)[-len(delta):])
+
+
+def test_maxlen_bounds_every_level(make_buffer):
+    pyramid = ChartPyramid(maxlen=1440)
+    candles = make_buffer(10 * 1440)
+    for k in range(0, len(candles), 1000):
+        pyramid.extend(candles[k:k + 1000])
+
+    assert len(pyramid.base) == 1440
+    assert len(pyramid.level(300)) <= 1440 // 5 + 1
+    assert len(pyramid.level(3600)) <= 1440 // 60 + 1
@@ -0,0 +1,29 @@
+"""Parity checks for the batch feature engine."""
+
+import numpy as np
+
+from features import MIN_CANDLES, N_FEATURES, engineer_features, engineer_features_batch
+
+
+def test_batch_matches_per_index(make_candles):
+    candles = make_candles(400, seed=1)
+    batch = engineer_features_batch(candles)
+
+    assert batch.shape == (400, N_FEATURES)
+    assert batch.dtype == np.float32
+    for i in range(MIN_CANDLES - 1, len(candles)):
+        expected = np.array(engineer_features(candles[:i + 1]), dtype=np.float32)
+        np.testing.assert_allclose(batch[i], expected, rtol=1e-5, atol=1e-9)
+
+
+def test_batch_handles_zero_volume_and_flat_bars(make_candles):
+    candles = make_candles(120, seed=2)
+    for c in candles[70:80]:
+        c["volume"] = 0.0
+        c["high"] = c["low"] = c["open"] = c["close"] = candles[69]["close"]
+    batch = engineer_features_batch(candles)
+
+    for i in (75, 79, 85):
+        expected = np.array(engineer_features(candles[:i + 1]), dtype=np.float32)
+        np.testing.assert_allclose(batch[i], expected, rtol=1e-5, atol=1e-9)
+
@@ -0,0 +1,180 @@
+"""Tests for the headless multi-pool fee service."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from feeopt import FeeService, create_app, parse_pairs
+from fees import MAX_FEE, MIN_FEE
+from ledger import InferenceLedger
+from smoothing import FeeSmoother
+from ticks import TickConsumer, cryptocompare_backfill
+
+PAIRS = [(f"SYM{k}", "USDT") for k in range(50)]
+
+
+def _service(cryptocompare, pairs, client=None, **kwargs):
+    return FeeService(pairs, client=client, fetcher_options={"base_url": cryptocompare.url},
+                      **kwargs)
+
+
+async def _round(service, now):
+    await service.open()
+    try:
+        return await service.update(now=now)
+    finally:
+        await service.close()
+
+
+def test_parse_pairs():
+    assert parse_pairs("eth/usdt, BTC/USDT\n# comment\nETH/USDT") == [("ETH", "USDT"), ("BTC", "USDT")]
+    with pytest.raises(ValueError):
+        parse_pairs("ETHUSDT")
+
+
+def test_update_computes_fee_for_every_pool(cryptocompare, og_client):
+    service = _service(cryptocompare, PAIRS, client=og_client, ledger=InferenceLedger(capacity=100))
+    summary = asyncio.run(_round(service, cryptocompare.now))
+
+    assert summary["updated"] == len(PAIRS)
+    assert summary["errors"] == 0
+    assert len(og_client.calls) == 1  # one batched inference for all pools
+    for entry in service.snapshot():
+        assert MIN_FEE <= entry["fee"] <= MAX_FEE
+        assert entry["source"] == "on-chain"
+        assert entry["bar_time"] == cryptocompare.now // 60 * 60
+    assert len(service.ledger) == len(PAIRS)
+    assert set(service.ledger.query(columns=("source",))["source"]) == {b"on-chain"}
+
+
+def test_memory_is_bounded_across_rounds(cryptocompare):
+    service = _service(cryptocompare, PAIRS[:5], limit=80)
+
+    async def run():
+        await service.open()
+        try:
+            for k in range(5):
+                cryptocompare.now += 60
+                await service.update(now=cryptocompare.now)
+        finally:
+            await service.close()
+
+    asyncio.run(run())
+    for pair in PAIRS[:5]:
+        assert len(service.candles.get(*pair)) == 81
+    # After the first round only the new bars are requested
+    assert all(int(r["limit"]) <= 2 for r in cryptocompare.requests[5:])
+
+
+def test_failed_pool_keeps_others_and_last_fee(cryptocompare):
+    pairs = [("ETH", "USDT"), ("BAD", "USDT")]
+    service = _service(cryptocompare, pairs)
+    summary = asyncio.run(_round(service, cryptocompare.now))
+
+    assert summary["updated"] == 1
+    assert summary["errors"] == 1
+    assert service.latest[("ETH", "USDT")]["error"] is None
+    assert service.latest[("BAD", "USDT")]["fee"] is None
+    assert "fetch failed" in service.latest[("BAD", "USDT")]["error"]
+
+
+def test_http_endpoint_serves_latest_fees(cryptocompare):
+    service = _service(cryptocompare, PAIRS[:3])
+
+    async def run():
+        await service.open()
+        runner = aiohttp.web.AppRunner(create_app(service))
+        await runner.setup()
+        site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{base}/health") as resp:
+                    before = await resp.json()
+                await service.update(now=cryptocompare.now)
+                async with session.get(f"{base}/fees") as resp:
+                    fees = await resp.json()
+                async with session.get(f"{base}/fees/sym1/usdt") as resp:
+                    one = await resp.json()
+                async with session.get(f"{base}/fees/NOPE/USDT") as resp:
+                    missing = resp.status
+        finally:
+            await runner.cleanup()
+            await service.close()
+        return before, fees, one, missing
+
+    before, fees, one, missing = asyncio.run(run())
+    assert before["status"] == "starting"
+    assert [f["pair"] for f in fees["fees"]] == ["SYM0/USDT", "SYM1/USDT", "SYM2/USDT"]
+    assert one["pair"] == "SYM1/USDT"
+    assert missing == 404
+
+
+def test_round_for_bar_close_uses_closed_bars_only(cryptocompare):
+    service = _service(cryptocompare, PAIRS[:2])
+    close = cryptocompare.now // 60 * 60
+
+    async def run():
+        await service.open()
+        try:
+            return await service.update(now=cryptocompare.now, bar_close=close)
+        finally:
+            await service.close()
+
+    summary = asyncio.run(run())
+    assert summary["bar_close"] == close
+    # The stub's last bar opens at `close` and is still forming
+    assert all(entry["bar_time"] == close - 60 for entry in service.snapshot())
+
+
+def test_stream_fed_rounds_skip_polling(cryptocompare, binance_stream):
+    pytest.importorskip("websockets")
+    bar = cryptocompare.now // 60 * 60
+    trades = [{"data": {"e": "aggTrade", "s": "ETHUSDT", "p": price, "q": "1.0", "T": t * 1000}}
+              for t, price in [(bar + 5, "2500.5"), (bar + 30, "2510.0"), (bar + 65, "2511.0")]]
+    server = binance_stream([trades])
+    stream = TickConsumer([("ETH", "USDT")], url=server.url, close_delay=None, maxlen=121)
+    service = _service(cryptocompare, [("ETH", "USDT")], stream=stream)
+    stream.backfill = cryptocompare_backfill(service.fetcher)
+
+    async def run():
+        await service.open()
+        stop = asyncio.Event()
+        consumer = asyncio.ensure_future(stream.run(stop))
+        try:
+            while stream.trades < len(trades):
+                await asyncio.sleep(0.01)
+            return await service.update(now=bar + 66, bar_close=bar + 60)
+        finally:
+            stop.set()
+            await consumer
+            await service.close()
+
+    summary = asyncio.run(run())
+    assert summary["updated"] == 1
+    entry = service.latest[("ETH", "USDT")]
+    assert entry["bar_time"] == bar and entry["price"] == 2510.0
+    # CryptoCompare was only asked once, for the warm-up history
+    assert len(cryptocompare.requests) == 1
+
+
+def test_smoother_suppresses_unchanged_fees(cryptocompare):
+    service = _service(cryptocompare, PAIRS[:3], smoother=FeeSmoother())
+
+    async def run():
+        await service.open()
+        try:
+            await service.update(now=cryptocompare.now)
+            first = [dict(entry) for entry in service.snapshot()]
+            await service.update(now=cryptocompare.now + 5)
+            return first, service.snapshot()
+        finally:
+            await service.close()
+
+    first, second = asyncio.run(run())
+    assert all(entry["published"] for entry in first)
+    assert not any(entry["published"] for entry in second)
+    assert [e["fee"] for e in second] == [e["fee"] for e in first]
+    assert service.smoother.stats()["suppressed"] == 3
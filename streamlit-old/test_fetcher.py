@@ -0,0 +1,99 @@
+"""Tests for the async multi-pair fetcher against a local stub server."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from candles import CandleBuffer
+from fetcher import AsyncCandleFetcher, CandleCache, CryptoCompareError, fetch_many
+
+PAIRS = [(f"SYM{k}", "USDT") for k in range(20)]
+
+
+def test_fetch_many_returns_candles_per_pair(cryptocompare):
+    result = fetch_many(PAIRS, limit=120, base_url=cryptocompare.url, concurrency=4)
+
+    assert list(result) == PAIRS
+    for candles in result.values():
+        assert isinstance(candles, CandleBuffer)
+        assert len(candles) == 121
+        assert candles.last_time == cryptocompare.now // 60 * 60
+
+
+def test_concurrency_is_bounded(cryptocompare):
+    cryptocompare.delay = 0.02
+    fetch_many(PAIRS, base_url=cryptocompare.url, concurrency=4)
+
+    assert 1 < cryptocompare.max_in_flight <= 4
+
+
+def test_retries_transient_errors(cryptocompare):
+    cryptocompare.fail_next[("ETH", "USDT")] = 2
+
+    async def run():
+        async with AsyncCandleFetcher(base_url=cryptocompare.url, backoff=0.01) as fetcher:
+            candles = await fetcher.fetch("ETH", "USDT", limit=10)
+            return candles, fetcher.requests_made
+
+    candles, requests_made = asyncio.run(run())
+    assert len(candles) == 11
+    assert requests_made == 3
+
+
+def test_gives_up_after_retries(cryptocompare):
+    cryptocompare.fail_next[("ETH", "USDT")] = 10
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        fetch_many([("ETH", "USDT")], base_url=cryptocompare.url, retries=1, backoff=0.01)
+
+
+def test_return_exceptions_keeps_other_pairs(cryptocompare):
+    result = fetch_many([("ETH", "USDT"), ("BAD", "USDT")], base_url=cryptocompare.url,
+                        return_exceptions=True)
+
+    assert len(result[("ETH", "USDT")]) == 121
+    assert isinstance(result[("BAD", "USDT")], CryptoCompareError)
+
+
+def _bars(times, close=1.0):
+    n = len(times)
+    return CandleBuffer.from_arrays(times, [close] * n, [close] * n, [close] * n, [close] * n, [1.0] * n)
+
+
+def test_cache_merge_replaces_forming_bar_and_dedupes():
+    cache = CandleCache(limit=5)
+    cache.merge("ETH", "USDT", _bars([0, 60, 120, 180, 240, 300]))
+    buf = cache.merge("ETH", "USDT", _bars([240, 300, 360], close=2.0))
+
+    assert list(buf.time) == [60, 120, 180, 240, 300, 360]
+    assert list(buf.close) == [1.0, 1.0, 1.0, 1.0, 2.0, 2.0]
+
+
+def test_cache_requests_only_the_delta(cryptocompare):
+    cache = CandleCache(limit=120)
+
+    async def run():
+        async with AsyncCandleFetcher(base_url=cryptocompare.url) as fetcher:
+            first = await cache.sync(fetcher, "ETH", "USDT", now=cryptocompare.now)
+            first_last = first.last_time
+            cryptocompare.now += 180
+            second = await cache.sync(fetcher, "ETH", "USDT", now=cryptocompare.now)
+            return first_last, second
+
+    first_last, candles = asyncio.run(run())
+    assert cryptocompare.requests[1]["limit"] == "3"
+    assert len(candles) == 121
+    assert candles.last_time == first_last + 180
+    full = fetch_many([("ETH", "USDT")], base_url=cryptocompare.url)[("ETH", "USDT")]
+    assert list(candles.time) == list(full.time)
+    assert list(candles.close) == list(full.close)
+
+
+def test_cache_refetches_full_window_after_long_gap():
+    cache = CandleCache(limit=120)
+    cache.merge("ETH", "USDT", _bars([0, 60]))
+
+    assert cache.request_params("ETH", "USDT", now=60 * 500) == {
+        "fsym": "ETH", "tsym": "USDT", "limit": 120,
+    }
@@ -0,0 +1,149 @@
+"""Tests for single, batched, micro-batched and queued inference with a mock client."""
+
+import time
+
+import numpy as np
+import pytest
+
+from conftest import MockOpenGradientClient
+from inference import (
+    InferenceBatcher,
+    InferenceCache,
+    InferenceQueue,
+    estimate_llmad_batch,
+    estimate_llmad_from_features,
+    run_inference,
+    run_inference_batch,
+)
+
+ROWS = np.random.default_rng(0).normal(0, 0.01, (10, 15)).astype(np.float32)
+
+
+def test_run_inference_on_chain(og_client):
+    result = run_inference(og_client, list(ROWS[0]))
+
+    assert result["source"] == "on-chain"
+    assert result["llmad"] == pytest.approx(og_client.expected(ROWS[:1])[0])
+    assert og_client.calls[0].shape == (1, 15)
+
+
+def test_batch_splits_rows_into_chunks(og_client):
+    results = run_inference_batch(og_client, ROWS, max_batch_size=4)
+
+    assert [len(x) for x in og_client.calls] == [4, 4, 2]
+    expected = og_client.expected(ROWS)
+    for k, result in enumerate(results):
+        assert result["source"] == "on-chain"
+        assert result["llmad"] == pytest.approx(expected[k])
+    assert results[0]["tx_hash"] == results[3]["tx_hash"] != results[4]["tx_hash"]
+
+
+def test_batch_falls_back_to_local_estimate():
+    client = MockOpenGradientClient(output=False)
+    results = run_inference_batch(client, ROWS)
+
+    np.testing.assert_allclose([r["llmad"] for r in results], estimate_llmad_batch(ROWS))
+    assert {r["source"] for r in results} == {"local-estimate"}
+    assert estimate_llmad_batch(ROWS)[0] == pytest.approx(estimate_llmad_from_features(ROWS[0]))
+
+
+def test_batch_devnet_and_errors():
+    devnet = MockOpenGradientClient(error=RuntimeError("InferenceResult event not found"))
+    assert all(r["devnet_note"] for r in run_inference_batch(devnet, ROWS))
+
+    broken = MockOpenGradientClient(error=RuntimeError("nonce too low"))
+    results = run_inference_batch(broken, ROWS)
+    assert [r["success"] for r in results] == [False] * len(ROWS)
+    assert results[0]["error"] == "nonce too low"
+
+
+def test_batcher_flushes_when_full(og_client):
+    batcher = InferenceBatcher(og_client, max_batch_size=5, flush_interval=60)
+    futures = [batcher.submit(row) for row in ROWS]
+    results = [f.result(timeout=5) for f in futures]
+    batcher.close()
+
+    assert [len(x) for x in og_client.calls] == [5, 5]
+    np.testing.assert_allclose([r["llmad"] for r in results], og_client.expected(ROWS), rtol=1e-6)
+
+
+def test_batcher_flushes_after_interval(og_client):
+    batcher = InferenceBatcher(og_client, max_batch_size=100, flush_interval=0.05)
+    futures = [batcher.submit(row) for row in ROWS[:3]]
+
+    assert all(f.result(timeout=5)["success"] for f in futures)
+    assert [len(x) for x in og_client.calls] == [3]
+    batcher.close()
+
+
+def _wait(queue, job_id):
+    for _ in range(500):
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_queue_runs_jobs_in_background():
+    client = MockOpenGradientClient(delay=0.1)
+    queue = InferenceQueue(client)
+    job_id = queue.submit(ROWS[0], price=2500.0)
+
+    assert queue.get(job_id).status == "pending"
+    job = _wait(queue, job_id)
+    assert job.status == "confirmed"
+    assert job.result["source"] == "on-chain"
+    assert job.meta == {"price": 2500.0}
+    queue.shutdown()
+
+
+def test_queue_dedupes_identical_in_flight_vectors():
+    client = MockOpenGradientClient(delay=0.1)
+    queue = InferenceQueue(client)
+    first = queue.submit(ROWS[0])
+    second = queue.submit(list(ROWS[0]))
+    other = queue.submit(ROWS[1])
+
+    assert first == second != other
+    _wait(queue, first)
+    _wait(queue, other)
+    assert len(client.calls) == 2 and queue.deduplicated == 1
+    assert queue.submit(ROWS[0]) != first  # finished jobs are not reused
+    queue.shutdown()
+
+
+def test_queue_marks_failures():
+    queue = InferenceQueue(MockOpenGradientClient(error=RuntimeError("out of gas")))
+    job = _wait(queue, queue.submit(ROWS[0]))
+
+    assert job.status == "failed"
+    assert job.result["error"] == "out of gas"
+    queue.shutdown()
+
+
+def test_cache_hits_on_quantized_neighbours(og_client):
+    cache = InferenceCache(quantum=1e-4)
+    row = np.round(ROWS[0].astype(np.float64), 4)
+    first = cache.run_inference(og_client, row)
+    again = cache.run_inference(og_client, row + 1e-6)
+
+    assert len(og_client.calls) == 1
+    assert again["cached"] and again["tx_hash"] == first["tx_hash"]
+    assert again["llmad"] == first["llmad"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_cache_ttl_and_size_bound():
+    cache = InferenceCache(maxsize=2, ttl=10)
+    ok = {"success": True, "llmad": 0.001, "tx_hash": "0x1"}
+    cache.put(ROWS[0], ok, now=0)
+    cache.put(ROWS[1], ok, now=0)
+    cache.put(ROWS[2], ok, now=0)
+
+    assert cache.evictions == 1
+    assert cache.get(ROWS[0], now=1) is None
+    assert cache.get(ROWS[2], now=11) is None
+    assert cache.expirations == 1
+    cache.put(ROWS[3], {"success": False, "error": "x"})
+    assert cache.get(ROWS[3]) is None
@@ -0,0 +1,103 @@
+"""Tests for the bounded, persisted inference ledger."""
+
+import os
+
+import numpy as np
+import pytest
+
+from ledger import COLUMNS, LEDGER_DTYPE, InferenceLedger
+
+FEATURES = np.arange(15, dtype=np.float32) / 100
+
+
+def _result(k):
+    return {"success": True, "llmad": 0.001 * k, "source": "on-chain", "tx_hash": f"0x{k:04x}"}
+
+
+def _fill(ledger, n, start=1_000.0, pair="ETH/USDT"):
+    for k in range(n):
+        ledger.record(pair, 2500.0 + k, FEATURES + k, _result(k), 0.001 + k * 1e-6, now=start + k)
+
+
+def test_ring_is_bounded():
+    ledger = InferenceLedger(capacity=8)
+    nbytes = ledger._ring.nbytes
+    _fill(ledger, 100)
+
+    recent = ledger.recent()
+    assert len(ledger) == 8
+    assert list(recent["price"]) == [2500.0 + k for k in range(92, 100)]
+    assert ledger._ring.nbytes == nbytes
+
+
+def test_pages_are_newest_first():
+    ledger = InferenceLedger(capacity=100)
+    _fill(ledger, 25)
+
+    first = ledger.page(0, per_page=10)
+    last = ledger.page(2, per_page=10)
+    assert [e["price"] for e in first] == [2500.0 + k for k in range(24, 14, -1)]
+    assert [e["price"] for e in last] == [2500.0 + k for k in range(4, -1, -1)]
+    assert ledger.page(3, per_page=10) == []
+    assert first[0]["tx_hash"] == "0x0018"
+    assert first[0]["features"] == pytest.approx(list(FEATURES + 24))
+
+
+def test_log_keeps_everything_and_survives_restart(tmp_path):
+    ledger = InferenceLedger(tmp_path, capacity=4)
+    _fill(ledger, 50)
+
+    reopened = InferenceLedger(tmp_path, capacity=4)
+    assert len(reopened) == 50
+    assert list(reopened.recent()["price"]) == [2546.0, 2547.0, 2548.0, 2549.0]
+    assert reopened.page(4, per_page=10)[-1]["price"] == 2500.0
+    for name in COLUMNS:
+        assert (tmp_path / f"{name}.bin").exists()
+
+
+def test_range_query_reads_requested_columns(tmp_path):
+    ledger = InferenceLedger(tmp_path, capacity=4)
+    _fill(ledger, 20, pair="ETH/USDT")
+    _fill(ledger, 20, start=1_020.0, pair="BTC/USDT")
+
+    out = ledger.query(start=1_010, end=1_030, columns=("time", "fee"))
+    assert set(out) == {"time", "fee"}
+    assert list(out["time"]) == [float(t) for t in range(1_010, 1_030)]
+
+    eth = ledger.query(start=1_010, pair="ETH/USDT")
+    assert len(eth["time"]) == 10
+    assert eth["features"].shape == (10, 15)
+
+    # The in-memory ring answers the same query shape
+    mem = InferenceLedger(capacity=100)
+    _fill(mem, 20)
+    assert len(mem.query(start=1_005, end=1_008)["time"]) == 3
+
+
+def test_failed_and_cached_results_are_recorded():
+    ledger = InferenceLedger(capacity=4)
+    ledger.record("ETH/USDT", 1.0, FEATURES, {"success": False, "error": "rpc"}, None, now=1.0)
+    ledger.record("ETH/USDT", 1.0, FEATURES, {**_result(1), "cached": True}, 0.002, now=2.0)
+
+    failed, cached = ledger.recent()
+    assert failed["source"] == b"error" and np.isnan(failed["llmad"]) and np.isnan(failed["fee"])
+    assert cached["source"] == b"cache"
+
+
+def test_torn_append_is_repaired(tmp_path):
+    ledger = InferenceLedger(tmp_path, capacity=4)
+    _fill(ledger, 5)
+    # Simulate a crash after only the first columns of a sixth entry were written
+    torn = np.zeros(1, dtype=LEDGER_DTYPE)
+    for name in COLUMNS[:3]:
+        with open(tmp_path / f"{name}.bin", "ab") as f:
+            f.write(torn[name].tobytes())
+
+    reopened = InferenceLedger(tmp_path, capacity=4)
+    assert len(reopened) == 5
+    _fill(reopened, 1, start=2_000.0)
+    assert len(reopened) == 6
+    sizes = {name: os.path.getsize(tmp_path / f"{name}.bin") // LEDGER_DTYPE.fields[name][0].itemsize
+             for name in COLUMNS}
+    assert set(sizes.values()) == {6}
+    assert reopened.page(0, per_page=1)[0]["time"] == 2_000.0
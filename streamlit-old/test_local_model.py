@@ -0,0 +1,83 @@
+"""Parity tests for the local model replicas."""
+
+import numpy as np
+
+import inference
+from config import MODEL_CID
+from conftest import MockOpenGradientClient
+from ledger import InferenceLedger
+from local_model import (
+    HeuristicModel,
+    LinearModel,
+    check_parity,
+    load_local_model,
+    load_recordings,
+    main,
+    save_recordings,
+)
+
+FEATURES = np.random.default_rng(1).normal(0, 0.01, (500, 15)).astype(np.float32)
+
+
+def _recorded():
+    return FEATURES, MockOpenGradientClient.expected(FEATURES)
+
+
+def test_fitted_linear_model_matches_on_chain(tmp_path):
+    features, llmad = _recorded()
+    model = LinearModel.fit(features[:100], llmad[:100])
+
+    assert check_parity(model, features, llmad)["ok"]
+    assert not check_parity(HeuristicModel(), features, llmad)["ok"]
+
+    path = str(tmp_path / "cid.json")
+    model.save(path)
+    np.testing.assert_allclose(LinearModel.load(path).predict(features), model.predict(features))
+
+
+def test_load_local_model_prefers_artifact(tmp_path):
+    assert isinstance(load_local_model("cid", str(tmp_path)), HeuristicModel)
+    LinearModel(np.ones(15)).save(str(tmp_path / "cid.npz"))
+    assert isinstance(load_local_model("cid", str(tmp_path)), LinearModel)
+
+
+def test_recordings_roundtrip(tmp_path):
+    path = str(tmp_path / "rec.npz")
+    save_recordings(path, *_recorded())
+    features, llmad = load_recordings(path)
+
+    assert features.shape == (500, 15)
+    np.testing.assert_allclose(llmad, _recorded()[1])
+
+
+def test_fallback_uses_installed_local_model():
+    features, llmad = _recorded()
+    client = MockOpenGradientClient(output=False)
+    inference.set_local_model(LinearModel.fit(features, llmad))
+    try:
+        results = inference.run_inference_batch(client, features[:8])
+        single = inference.run_inference(client, list(features[0]))
+    finally:
+        inference.set_local_model(None)
+
+    np.testing.assert_allclose([r["llmad"] for r in results], llmad[:8], rtol=1e-5)
+    assert single["llmad"] == results[0]["llmad"]
+
+
+def test_record_exports_on_chain_decisions_from_the_ledger(tmp_path):
+    features, llmad = _recorded()
+    ledger = InferenceLedger(str(tmp_path / "ledger"))
+    for i, (row, value) in enumerate(zip(features[:60], llmad[:60])):
+        source = "local-estimate" if i % 3 == 1 else "on-chain"
+        result = {"success": True, "llmad": float(value), "source": source, "cached": i % 5 == 0}
+        ledger.record("ETH/USDT", 2500.0, row, result, 0.003, now=i)
+    recordings = str(tmp_path / "rec.npz")
+
+    assert main(["record", str(tmp_path / "ledger"), "--out", recordings]) == 0
+    recorded, outputs = load_recordings(recordings)
+    kept = [i for i in range(60) if i % 3 != 1 and i % 5 != 0]
+    np.testing.assert_array_equal(recorded, features[kept])
+    np.testing.assert_array_equal(outputs, llmad[kept])
+    # ...and the parity gate runs on them
+    assert main(["fit", recordings, "--out", str(tmp_path / f"{MODEL_CID}.json")]) == 0
+    assert main(["parity", recordings, "--model-dir", str(tmp_path)]) == 0
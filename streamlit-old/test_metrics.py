@@ -0,0 +1,81 @@
+"""Tests for the in-process metrics registry."""
+
+import urllib.request
+
+import numpy as np
+import pytest
+
+import metrics
+from inference import InferenceCache, run_inference_batch
+from metrics import (CACHE_LOOKUPS, INFERENCES, STAGE_SECONDS, TX_CONFIRMATION_SECONDS,
+                     Histogram, Registry)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fresh = Registry()
+    monkeypatch.setattr(metrics, "METRICS", fresh)
+    return fresh
+
+
+def test_histogram_quantiles_track_exact_percentiles():
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(mean=-4.0, sigma=1.0, size=20_000)
+    hist = Histogram("latency_seconds")
+    for value in samples:
+        hist.observe(float(value), stage="fetch")
+
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(samples, q)
+        assert hist.quantile(q, stage="fetch") == pytest.approx(exact, rel=0.2)
+    assert hist.count(stage="fetch") == len(samples)
+    assert hist.quantile(0.5, stage="other") is None
+
+
+def test_render_prometheus_text(registry):
+    registry.counter("requests_total", "Requests").inc(kind="a")
+    registry.counter("requests_total").inc(2, kind="a")
+    hist = registry.histogram("stage_seconds", "Stages", buckets=(0.1, 1.0))
+    hist.observe(0.05, stage='we"ird')
+    hist.observe(5.0, stage='we"ird')
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{kind="a"} 3.0' in text
+    assert 'stage_seconds_bucket{stage="we\\"ird",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="we\\"ird",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="we\\"ird"} 2' in text
+    with pytest.raises(TypeError):
+        registry.histogram("requests_total")
+
+
+def test_pipeline_is_instrumented(registry, og_client):
+    rows = np.random.default_rng(1).normal(size=(4, 15)).astype(np.float32)
+    cache = InferenceCache()
+    cache.get(rows[0])
+    cache.put(rows[0], {"success": True, "llmad": 0.001})
+    cache.get(rows[0])
+    run_inference_batch(og_client, rows, max_batch_size=2)
+    with metrics.timer("features"):
+        pass
+
+    assert registry.counter(CACHE_LOOKUPS).value(result="hit") == 1
+    assert registry.counter(CACHE_LOOKUPS).value(result="miss") == 1
+    assert registry.counter(INFERENCES).value(source="on-chain") == 4
+    assert registry.histogram(TX_CONFIRMATION_SECONDS).count() == 2
+    assert registry.histogram(STAGE_SECONDS).count(stage="features") == 1
+    assert [r["stage"] for r in metrics.stage_table()] == ["features", "tx confirmation"]
+
+
+def test_text_endpoint(registry):
+    registry.counter("up_total").inc()
+    server = metrics.serve(0, registry=registry)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode()
+            content_type = resp.headers["Content-Type"]
+    finally:
+        server.shutdown()
+    assert "up_total 1.0" in body
+    assert content_type.startswith("text/plain")
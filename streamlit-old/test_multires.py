@@ -0,0 +1,67 @@
+"""Tests for multi-resolution feature windows."""
+
+import numpy as np
+import pytest
+
+from candles import CandleBuffer
+from chart import resample
+from features import N_FEATURES, engineer_features
+from multires import MultiResolutionFeatures, feature_names
+
+
+def _ten_second_bars(make_buffer, n):
+    minute = make_buffer(n)
+    times = 1_700_000_000 + 10 * np.arange(n, dtype=np.int64)
+    return CandleBuffer.from_arrays(times, minute.open, minute.high, minute.low, minute.close,
+                                    minute.volume)
+
+
+def _grouped(candles, k):
+    """Bars of k base bars ending at the newest one."""
+    tail = candles[len(candles) % k:]
+    groups = np.arange(len(tail), dtype=np.int64) // k
+    return resample(CandleBuffer.from_arrays(groups, tail.open, tail.high, tail.low, tail.close,
+                                             tail.volume), 1)
+
+
+def test_base_resolution_matches_engineer_features(make_buffer):
+    candles = make_buffer(300)
+    builder = MultiResolutionFeatures(resolutions=(60,), base=60)
+    np.testing.assert_array_equal(builder.latest(candles),
+                                  np.asarray(engineer_features(candles), dtype=np.float32))
+
+
+def test_every_resolution_matches_resampled_bars(make_buffer):
+    builder = MultiResolutionFeatures()
+    candles = _ten_second_bars(make_buffer, builder.min_bars + 7)
+    row = builder.latest(candles)
+
+    assert row.shape == (4 * N_FEATURES,) and row.dtype == np.float32
+    for block, k in enumerate(builder.factors):
+        expected = np.asarray(engineer_features(_grouped(candles, k)), dtype=np.float32)
+        np.testing.assert_allclose(row[block * N_FEATURES:(block + 1) * N_FEATURES], expected,
+                                   rtol=1e-5, atol=1e-7)
+
+
+def test_rows_for_many_ends_match_prefixes(make_buffer):
+    builder = MultiResolutionFeatures(resolutions=(60, 120, 300), base=60)
+    candles = make_buffer(500)
+    ends = np.arange(builder.min_bars - 1, len(candles), 37)
+    rows = builder.compute(candles, ends)
+    for row, end in zip(rows, ends):
+        np.testing.assert_array_equal(row, builder.latest(candles[:end + 1]))
+
+
+def test_matrix_and_history_checks(make_buffer):
+    builder = MultiResolutionFeatures(resolutions=(60, 300), base=60)
+    histories = [make_buffer(400, seed=k) for k in range(3)]
+    matrix = builder.matrix(histories)
+    assert matrix.shape == (3, 2 * N_FEATURES) and matrix.dtype == np.float32
+    assert builder.names == feature_names((60, 300))
+    assert builder.names[N_FEATURES] == "HL Range 1m @5m"
+
+    assert builder.latest(make_buffer(builder.min_bars - 1)) is None
+    with pytest.raises(ValueError):
+        builder.compute(make_buffer(400), ends=[10])
+    with pytest.raises(ValueError):
+        MultiResolutionFeatures(resolutions=(15, 60), base=10)
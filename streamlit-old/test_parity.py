@@ -0,0 +1,64 @@
+"""Tests for the feature-parity harness and its golden fixture."""
+
+import numpy as np
+import pytest
+
+from features import MIN_CANDLES, N_FEATURES
+from parity import (
+    ENGINES, SPEC, compare, generate, golden_candles, load_golden, read_arrays, reference,
+    run_engine, write_arrays,
+)
+
+
+@pytest.fixture(scope="module")
+def golden():
+    return load_golden()
+
+
+def test_golden_fixture_matches_the_reference(golden):
+    meta, arrays = golden
+    assert meta["spec"] == SPEC
+    candles = golden_candles(arrays)
+    for row in range(0, len(arrays["stop"]), 37):
+        features, llmad, fee = reference(candles[arrays["start"][row]:arrays["stop"][row]])
+        np.testing.assert_array_equal(arrays["features"][row], features)
+        assert arrays["llmad"][row] == llmad and arrays["fee"][row] == fee
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_python_engines_match_the_golden_fixture(golden, engine):
+    report = compare(golden[1], run_engine(engine, golden[1]))
+    assert report["ok"], report["first"]
+
+
+def test_compare_reports_drift(golden, tmp_path):
+    arrays = golden[1]
+    results = {key: arrays[key].copy() for key in ("features", "llmad", "fee")}
+    results["features"][10, 12] *= 1.01
+    results["fee"][[10, 500]] = np.nan
+    path = str(tmp_path / "results.bin")
+    write_arrays(path, results, {"kind": "results"})
+    meta, loaded = read_arrays(path)
+    assert meta == {"kind": "results"}
+
+    report = compare(arrays, loaded)
+    assert not report["ok"]
+    counts = {c["name"]: c["mismatches"] for c in report["columns"]}
+    assert counts["Range Ratio"] == 1 and counts["fee"] == 2 and counts["llmad"] == 0
+    assert report["first"][0]["row"] == 10 and report["first"][0]["column"] == "Range Ratio"
+    with pytest.raises(ValueError):
+        compare(arrays, {"features": results["features"][:, :-1]})
+
+
+def test_generate_covers_the_edge_cases(tmp_path):
+    path = str(tmp_path / "golden.bin")
+    arrays = generate(path, bars=150, seed=3)
+    _, loaded = load_golden(path)
+    for name, values in arrays.items():
+        np.testing.assert_array_equal(loaded[name], values)
+    lengths = loaded["stop"] - loaded["start"]
+    assert lengths.min() == MIN_CANDLES and lengths.max() > 100
+    assert loaded["features"].shape == (len(lengths), N_FEATURES)
+    # Flat, zero-volume windows hit the range-ratio and volume guards
+    assert ((loaded["features"][:, 12] == 1.0) & (loaded["features"][:, 14] == 0.0)).any()
+    assert loaded["fee"].max() == SPEC["fee"]["max_fee"]
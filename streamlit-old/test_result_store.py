@@ -0,0 +1,109 @@
+"""Tests for the single-flight (pair, bar) result store."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from result_store import MemoryBackend, ResultStore, SqliteBackend
+
+BAR = 1_700_000_040
+
+
+def _slow_compute(calls, delay=0.1, result=None):
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        return result or {"success": True, "llmad": 0.002, "tx_hash": "0xabc",
+                          "output": {"Y": np.array([[0.002]], dtype=np.float32)}}
+    return compute
+
+
+def test_concurrent_viewers_share_one_computation():
+    store = ResultStore()
+    calls = []
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls)),
+                                range(16)))
+
+    assert len(calls) == 1
+    assert {r["tx_hash"] for r in results} == {"0xabc"}
+    assert store.stats()["computed"] == 1
+    assert store.stats()["joined"] == 15
+    # Later viewers get the stored result without computing
+    assert store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls))["cached"]
+    assert len(calls) == 1
+
+
+def test_keys_are_per_pair_and_bar():
+    store = ResultStore()
+    calls = []
+    for pair, bar in [("ETH/USDT", BAR), ("ETH/USDT", BAR + 60), ("BTC/USDT", BAR)]:
+        store.get_or_compute(pair, bar, _slow_compute(calls, delay=0))
+    assert len(calls) == 3
+
+
+def test_failures_are_not_stored():
+    store = ResultStore()
+    calls = []
+    failed = store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls, 0, {"success": False}))
+    assert not failed["success"]
+    assert store.get("ETH/USDT", BAR) is None
+    assert store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls, 0))["success"]
+    assert len(calls) == 2
+
+
+def test_exceptions_reach_every_waiter():
+    store = ResultStore()
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("rpc down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(store.get_or_compute, "ETH/USDT", BAR, boom)
+        started.wait(1)
+        follower = pool.submit(store.get_or_compute, "ETH/USDT", BAR, boom)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_sqlite_single_flight_across_processes(tmp_path):
+    # Separate stores on one file stand in for separate app processes
+    path = str(tmp_path / "results.db")
+    stores = [ResultStore(SqliteBackend(path), poll_interval=0.01) for _ in range(4)]
+    calls = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(
+            lambda store: store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls, 0.2)), stores))
+
+    assert len(calls) == 1
+    assert all(r["llmad"] == 0.002 for r in results)
+    assert sum(s.stats()["awaited"] for s in stores) == 3
+    # Results survive a restart and keep their JSON-decoded output
+    reopened = ResultStore(SqliteBackend(path))
+    assert reopened.get("ETH/USDT", BAR)["output"] == {"Y": [[pytest.approx(0.002)]]}
+
+
+def test_stale_claim_is_taken_over(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "results.db"))
+    now = time.time()
+    assert backend.claim("ETH/USDT", BAR, "dead-process", now - 600, claim_timeout=120)
+
+    store = ResultStore(backend, claim_timeout=120, poll_interval=0.01)
+    calls = []
+    assert store.get_or_compute("ETH/USDT", BAR, _slow_compute(calls, 0))["success"]
+    assert len(calls) == 1
+
+
+def test_memory_backend_is_bounded():
+    store = ResultStore(MemoryBackend(maxsize=3))
+    for k in range(10):
+        store.get_or_compute("ETH/USDT", BAR + 60 * k, lambda: {"success": True, "llmad": 0.0})
+    assert store.get("ETH/USDT", BAR) is None
+    assert store.get("ETH/USDT", BAR + 60 * 9) is not None
@@ -0,0 +1,25 @@
+"""Tests for the benchmark runner's command line."""
+
+import os
+
+from pytest_benchmark.utils import get_machine_id
+
+import run_benchmarks
+
+
+def _save(storage, machine):
+    os.makedirs(storage / machine, exist_ok=True)
+    (storage / machine / "0001_run.json").write_text("{}")
+
+
+def test_compares_only_with_this_machines_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_benchmarks, "STORAGE", str(tmp_path))
+    assert "--benchmark-compare" not in run_benchmarks.pytest_args()
+
+    _save(tmp_path, "Other-machine-64bit")
+    assert "--benchmark-compare" not in run_benchmarks.pytest_args()
+
+    _save(tmp_path, get_machine_id())
+    args = run_benchmarks.pytest_args(threshold=10, save=False, extra=["-k", "features"])
+    assert "--benchmark-compare" in args and "--benchmark-compare-fail=median:10%" in args
+    assert "--benchmark-autosave" not in args and args[-2:] == ["-k", "features"]
@@ -0,0 +1,105 @@
+"""Tests for the bar-close aligned scheduler, driven by a fake clock."""
+
+import asyncio
+
+import pytest
+
+from scheduler import BarScheduler, bar_close
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def _run(scheduler, clock, rounds, work=0.0, stall=None):
+    """Run `rounds` callbacks; each takes `work` s, `stall[k]` adds extra time after round k."""
+    ticks = []
+    stop = asyncio.Event()
+
+    def callback(tick):
+        ticks.append(tick)
+        clock.now += work + (stall or {}).get(len(ticks), 0.0)
+        if len(ticks) >= rounds:
+            stop.set()
+
+    asyncio.run(scheduler.run(callback, stop=stop))
+    return ticks
+
+
+def test_bar_close():
+    assert bar_close(1_700_000_059.9) == 1_699_999_980 + 60
+    assert bar_close(120) == 120
+
+
+def test_wakes_offset_after_each_close():
+    clock = FakeClock(1_000_030.0)
+    scheduler = BarScheduler(offset=2.0, clock=clock, sleep=clock.sleep)
+    ticks = _run(scheduler, clock, rounds=4, work=0.5)
+
+    # First round starts immediately for the newest closed bar, then one per bar
+    assert [t.bar_close for t in ticks] == [1_000_020, 1_000_080, 1_000_140, 1_000_200]
+    assert [t.delay for t in ticks[1:]] == [pytest.approx(2.0)] * 3
+    assert scheduler.stats()["missed"] == 0
+
+
+def test_jitter_stays_inside_window():
+    clock = FakeClock(1_000_000.0)
+    scheduler = BarScheduler(offset=1.0, jitter=3.0, clock=clock, sleep=clock.sleep)
+    ticks = _run(scheduler, clock, rounds=20)
+
+    assert all(1.0 <= t.delay <= 4.0 for t in ticks[1:])
+    assert len({round(t.delay, 6) for t in ticks[1:]}) > 1
+
+
+def test_coalesces_missed_ticks():
+    clock = FakeClock(1_000_000.0)
+    scheduler = BarScheduler(offset=2.0, clock=clock, sleep=clock.sleep)
+    ticks = _run(scheduler, clock, rounds=3, stall={2: 200.0})
+
+    # Round 2 overran by 200 s: bars closing at +60 and +120 were skipped
+    assert ticks[2].bar_close - ticks[1].bar_close == 180
+    assert ticks[2].missed == 2
+    assert scheduler.stats()["missed"] == 2
+
+
+def test_replays_each_missed_tick():
+    clock = FakeClock(1_000_000.0)
+    scheduler = BarScheduler(offset=2.0, catch_up="each", max_catch_up=10,
+                             clock=clock, sleep=clock.sleep)
+    ticks = _run(scheduler, clock, rounds=6, stall={2: 200.0})
+
+    closes = [t.bar_close for t in ticks]
+    assert [b - a for a, b in zip(closes, closes[1:])] == [60] * 5
+    assert [t.catch_up for t in ticks[2:6]] == [True, True, False, False]
+
+
+def test_failing_callback_does_not_stop_schedule():
+    clock = FakeClock(1_000_000.0)
+    scheduler = BarScheduler(clock=clock, sleep=clock.sleep)
+    stop = asyncio.Event()
+    seen = []
+
+    async def callback(tick):
+        seen.append(tick.bar_close)
+        if len(seen) == 3:
+            stop.set()
+        raise RuntimeError("boom")
+
+    asyncio.run(scheduler.run(callback, stop=stop))
+    assert len(seen) == 3
+    assert scheduler.failures == 3
+
+
+def test_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        BarScheduler(catch_up="later")
+    with pytest.raises(ValueError):
+        BarScheduler(offset=50, jitter=20)
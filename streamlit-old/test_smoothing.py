@@ -0,0 +1,91 @@
+"""Tests for the fee smoothing and hysteresis stage."""
+
+import numpy as np
+import pytest
+
+from backtest import run_backtest
+from metrics import FEE_DECISIONS, counter
+from smoothing import BPS, FeeSmoother
+
+BASE = 0.003
+
+
+def _smoother(**kwargs):
+    # Unsmoothed by default so each rule can be checked on its own
+    options = {"alpha_up": 1.0, "alpha_down": 1.0, "min_change_bps": 5.0, "hysteresis_bps": 5.0,
+               "min_interval": 300.0, "urgent_bps": 25.0}
+    return FeeSmoother(**{**options, **kwargs})
+
+
+def test_small_changes_are_suppressed():
+    smoother = _smoother()
+    before = counter(FEE_DECISIONS).value(outcome="min_change")
+    assert smoother.update("ETH/USDT", BASE, now=0)["publish"]
+    decision = smoother.update("ETH/USDT", BASE + 4 * BPS, now=1000)
+    assert not decision["publish"] and decision["outcome"] == "min_change"
+    assert decision["fee"] == BASE
+    assert smoother.update("ETH/USDT", BASE + 6 * BPS, now=2000)["publish"]
+    assert smoother.published("ETH/USDT") == pytest.approx(BASE + 6 * BPS)
+    assert counter(FEE_DECISIONS).value(outcome="min_change") == before + 1
+
+
+def test_reversals_need_the_hysteresis_margin():
+    smoother = _smoother()
+    smoother.update("p", BASE, now=0)
+    smoother.update("p", BASE + 10 * BPS, now=1000)  # published, direction up
+    assert smoother.update("p", BASE + 2 * BPS, now=2000)["outcome"] == "hysteresis"
+    assert smoother.update("p", BASE - 1 * BPS, now=3000)["publish"]
+    # Continuing in the same direction only needs the minimum change
+    assert smoother.update("p", BASE - 7 * BPS, now=4000)["publish"]
+
+
+def test_rate_limit_lets_urgent_increases_through():
+    smoother = _smoother()
+    smoother.update("p", BASE, now=0)
+    assert smoother.update("p", BASE - 10 * BPS, now=60)["outcome"] == "rate_limited"
+    assert smoother.update("p", BASE + 10 * BPS, now=120)["outcome"] == "rate_limited"
+    assert smoother.update("p", BASE + 30 * BPS, now=180)["publish"]
+    assert smoother.stats()["suppressed"] == 2
+
+
+def test_ewma_rises_faster_than_it_falls():
+    smoother = _smoother(alpha_up=0.5, alpha_down=0.1, min_change_bps=0.0, hysteresis_bps=0.0,
+                         min_interval=0.0)
+    smoother.update("p", BASE, now=0)
+    assert smoother.update("p", BASE + 20 * BPS, now=60)["fee"] == pytest.approx(BASE + 10 * BPS)
+    assert smoother.update("p", BASE, now=120)["fee"] == pytest.approx(BASE + 9 * BPS)
+
+
+def test_apply_matches_update():
+    rng = np.random.default_rng(0)
+    fees = BASE + rng.normal(0, 8 * BPS, 500)
+    times = 60.0 * np.arange(500)
+    effective, published = FeeSmoother().apply(fees, times)
+
+    smoother = FeeSmoother()
+    decisions = [smoother.update("p", fee, now) for fee, now in zip(fees, times)]
+    np.testing.assert_array_equal(effective, [d["fee"] for d in decisions])
+    np.testing.assert_array_equal(published, [d["publish"] for d in decisions])
+
+
+class _NoisyModel:
+    """LLMAD with calm/volatile regimes plus per-bar prediction noise."""
+
+    def predict(self, X):
+        rng = np.random.default_rng(1)
+        n = len(X)
+        regime = np.where((np.arange(n) // 2000) % 2, 0.006, 0.002)
+        return np.clip(regime + rng.normal(0, 0.0008, n), 0, None)
+
+
+def test_backtest_cuts_updates_by_an_order_of_magnitude(make_buffer):
+    candles = make_buffer(20_000)
+    raw = run_backtest(candles, model=_NoisyModel()).summary()
+    smoothed = run_backtest(candles, model=_NoisyModel(), smoother=FeeSmoother()).summary()
+
+    assert raw["fee_updates"] == raw["raw_fee_updates"] > 0.99 * raw["rows"]
+    assert smoothed["fee_updates"] * 10 <= raw["fee_updates"]
+    # LP protection holds: the charged fee barely trails the model's and
+    # arbitrage losses do not grow
+    assert smoothed["underpricing_bps"] < 3.0
+    assert smoothed["dynamic"]["arb_loss"] <= raw["dynamic"]["arb_loss"]
@@ -0,0 +1,51 @@
+"""Cold-start guards: heavy SDKs stay off the import path of the app and CLI."""
+
+import os
+
+import pytest
+
+from startup import (
+    APP_MODULES, THIRD_PARTY, heavy_loaded, import_profile, parse_importtime, top_level_imports,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_parse_importtime():
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |     _plotly_utils\n"
+        "import time:       250 |        350 |   plotly\n"
+        "import time:        50 |        400 | streamlit\n"
+        "import time:        10 |         10 | fees\n"
+    )
+    profile = parse_importtime(text)
+    assert profile[0] == ("_plotly_utils", 100, 100, 2)
+    assert profile[2] == ("streamlit", 50, 400, 0)
+    assert heavy_loaded(profile) == {"plotly": "streamlit"}
+
+
+def test_top_level_imports(tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text(
+        "import os\n"
+        "import streamlit as st\n"
+        "from fees import llmad_to_fee\n"
+        "import numpy.linalg, fees\n"
+        "from concurrent.futures import ThreadPoolExecutor\n"
+        "if st:\n"
+        "    import plotly\n"  # lazy: not on the load path
+        "def f():\n"
+        "    import opengradient\n"
+    )
+    assert top_level_imports(str(script)) == ("streamlit", "fees", "numpy")
+    assert "fees" in APP_MODULES and "streamlit" in THIRD_PARTY and "fees" not in THIRD_PARTY
+
+
+@pytest.mark.parametrize("modules", [
+    [m for m in APP_MODULES if m not in THIRD_PARTY],
+    ["feeopt", "backtest", "sweep"],
+])
+def test_heavy_modules_load_lazily(modules):
+    profile = import_profile(modules, cwd=HERE)
+    assert heavy_loaded(profile) == {}
@@ -0,0 +1,39 @@
+"""Parity checks for the streaming feature engine."""
+
+import numpy as np
+
+from features import MIN_CANDLES, engineer_features_batch
+from streaming import StreamingFeatureEngine
+
+
+def test_streaming_matches_batch(make_candles):
+    candles = make_candles(3000, seed=4)
+    batch = engineer_features_batch(candles)
+    engine = StreamingFeatureEngine()
+
+    for i, candle in enumerate(candles):
+        features = engine.push(candle)
+        if i < MIN_CANDLES - 1:
+            assert features is None
+        else:
+            np.testing.assert_allclose(np.float32(features), batch[i], rtol=1e-4, atol=1e-9)
+
+
+def test_streaming_flat_bars(make_candles):
+    candles = make_candles(100, seed=5)
+    for c in candles[60:]:
+        c["volume"] = 0.0
+        c["high"] = c["low"] = c["open"] = c["close"] = candles[59]["close"]
+    batch = engineer_features_batch(candles)
+    engine = StreamingFeatureEngine.from_history(candles)
+
+    np.testing.assert_allclose(np.float32(engine.features), batch[-1], atol=1e-9)
+
+
+def test_clean_path_matches_the_guarded_one(make_candles):
+    candles = make_candles(300, seed=6)
+    guarded = StreamingFeatureEngine()
+    clean = StreamingFeatureEngine(clean=True)
+
+    for candle in candles:
+        assert clean.push(candle) == guarded.push(candle)
@@ -0,0 +1,57 @@
+"""Tests for fee curves and the shared-memory parameter sweep."""
+
+import numpy as np
+import pytest
+
+from backtest import run_backtest
+from candles import CandleBuffer
+from fees import CURVE_SHAPES, MAX_FEE, MIN_FEE, fee_curve, llmad_to_fee_batch
+from local_model import HeuristicModel
+from sweep import build_series, evaluate, expand_grid, run_sweep
+
+
+@pytest.mark.parametrize("shape", CURVE_SHAPES)
+def test_curves_span_fee_range_monotonically(shape):
+    fees = fee_curve(np.linspace(0, 0.02, 201), shape=shape)
+
+    assert fees[0] == pytest.approx(MIN_FEE)
+    assert fees[-1] == pytest.approx(MAX_FEE)
+    assert np.all(np.diff(fees) >= -1e-15)
+
+
+def test_linear_curve_matches_llmad_to_fee():
+    llmad = np.linspace(0, 0.02, 50)
+    np.testing.assert_allclose(fee_curve(llmad), llmad_to_fee_batch(llmad))
+
+
+def test_expand_grid_drops_ignored_params():
+    configs = expand_grid({"shape": ["linear", "log"], "steepness": [5.0, 10.0], "midpoint": [0.3, 0.5]})
+    assert configs == [{"shape": "linear"}, {"shape": "log", "steepness": 5.0},
+                       {"shape": "log", "steepness": 10.0}]
+
+
+def test_parallel_sweep_matches_serial_and_is_ranked(make_buffer):
+    series = build_series(make_buffer(20_000), model=HeuristicModel())
+    grid = {"shape": ["linear", "sigmoid"], "min_fee": [0.0005, 0.001], "max_fee": [0.005, 0.008]}
+    results, stats = run_sweep(series, grid=grid, workers=2, chunk_size=3)
+
+    assert results[0]["shape"] == "static"
+    ranked = results[1:]
+    assert stats["configs"] == len(ranked) == 8
+    assert [r["net"] for r in ranked] == sorted((r["net"] for r in ranked), reverse=True)
+    for r in ranked:
+        params = {k: r[k] for k in ("shape", "min_fee", "max_fee", "steepness", "midpoint") if k in r}
+        assert r["net"] == pytest.approx(evaluate(params, series)["net"])
+
+
+def test_series_matches_the_backtest_on_dirty_bars(make_buffer):
+    records = make_buffer(3000).to_records()
+    records["close"][500] *= 1.3
+    records = np.delete(records, [1000, 1001])
+    candles = CandleBuffer.from_records(records)
+    model = HeuristicModel()
+
+    series = build_series(candles, model=model)
+    result = run_backtest(candles, model=model)
+    np.testing.assert_array_equal(series["llmad"], result.llmad)
+    assert len(build_series(candles, model=model, validate=False)["llmad"]) == len(series["llmad"]) - 2
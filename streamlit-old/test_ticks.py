@@ -0,0 +1,139 @@
+"""Tests for WebSocket trade ingestion and bar building."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("websockets")
+
+from candles import CandleBuffer
+from features import engineer_features
+from ticks import BarBuilder, TickConsumer, parse_trade, stream_name
+
+T0 = 1_700_000_040  # a bar open
+
+
+def _trade(symbol, t, price, quantity=1.0, kind="aggTrade"):
+    return {"stream": f"{symbol.lower()}@{kind}",
+            "data": {"e": kind, "s": symbol, "p": f"{price:.2f}", "q": f"{quantity}",
+                     "T": int(t * 1000)}}
+
+
+def _bars(start, end, price=2500.0):
+    times = np.arange(start, end, 60, dtype=np.int64)
+    close = price + np.sin(times / 600.0)
+    return CandleBuffer.from_arrays(times, close, close + 1, close - 1, close, np.full(len(times), 5.0))
+
+
+class _Backfill:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, pair, start, end):
+        self.calls.append((pair, start, end))
+        return _bars(start, end)
+
+
+async def _consume(consumer, trades, timeout=5):
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(consumer.run(stop))
+    deadline = asyncio.get_running_loop().time() + timeout
+    while consumer.trades < trades and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+    stop.set()
+    await task
+
+
+def test_parse_trade():
+    assert parse_trade(_trade("ETHUSDT", T0 + 1.5, 2500.25, 0.5)) == ("ETHUSDT", T0 + 1.5, 2500.25, 0.5)
+    assert parse_trade(_trade("ETHUSDT", T0, 2500.0, kind="trade")["data"])[0] == "ETHUSDT"
+    assert parse_trade({"result": None, "id": 1}) is None
+    assert parse_trade(_trade("ETHUSDT", T0, 0.0)) is None
+    assert stream_name(("ETH", "USDT")) == "ethusdt@aggTrade"
+
+
+def test_bar_builder_aggregates_and_fills_gaps():
+    builder = BarBuilder()
+    for t, price, quantity in [(T0 + 1, 10.0, 1.0), (T0 + 20, 12.0, 2.0), (T0 + 59, 11.0, 1.0)]:
+        assert not len(builder.add(t, price, quantity))
+    # A trade three bars later closes the first and fills the two empty ones flat
+    closed = builder.add(T0 + 185, 13.0, 1.0)
+    assert list(closed.time) == [T0, T0 + 60, T0 + 120]
+    assert [closed.open[0], closed.high[0], closed.low[0], closed.close[0], closed.volume[0]] == \
+        [10.0, 12.0, 10.0, 11.0, 4.0]
+    assert list(closed.close[1:]) == [11.0, 11.0] and list(closed.volume[1:]) == [0.0, 0.0]
+    # Trades for closed bars are dropped and counted
+    builder.add(T0 + 100, 99.0, 1.0)
+    assert builder.late == 1
+    assert list(builder.close_until(T0 + 300).time) == [T0 + 180, T0 + 240]
+    assert builder.current is None and builder.next_time == T0 + 300
+
+
+def test_multiplexed_pairs_build_bars_and_features(binance_stream):
+    pairs = [("ETH", "USDT"), ("BTC", "USDT")]
+    trades = []
+    for minute in range(5):
+        for second in (5, 30, 55):
+            t = T0 + 60 * minute + second
+            trades.append(_trade("ETHUSDT", t, 2500.0 + minute + second / 100))
+            trades.append(_trade("BTCUSDT", t, 40000.0 - minute))
+    server = binance_stream([[{"result": None, "id": 1}] + trades])
+    backfill = _Backfill()
+    emitted = []
+    consumer = TickConsumer(pairs, url=server.url, backfill=backfill, close_delay=None,
+                            on_bars=lambda pair, bars, features: emitted.append((pair, len(bars), features)))
+
+    asyncio.run(_consume(consumer, len(trades)))
+
+    assert server.paths[0] == "/stream?streams=ethusdt@aggTrade/btcusdt@aggTrade"
+    # Warm-up history came from the backfill, then four bars closed from trades
+    assert sorted(backfill.calls) == sorted((pair, T0 - 120 * 60, T0) for pair in pairs)
+    eth = consumer.bars(("ETH", "USDT"))
+    assert len(eth) == 124 and eth.last_time == T0 + 180
+    assert eth.open[-1] == pytest.approx(2503.05) and eth.close[-1] == pytest.approx(2503.55)
+    assert eth.volume[-1] == 3.0
+    assert consumer.bars(("BTC", "USDT")).close[-1] == 39997.0
+    # Streaming features match the batch engine on the same bars
+    np.testing.assert_allclose(consumer.features(("ETH", "USDT")), engineer_features(eth),
+                               rtol=1e-9, atol=1e-12)
+    assert all(features is not None for _, _, features in emitted)
+
+
+def test_reconnect_backfills_the_gap(binance_stream):
+    first = [_trade("ETHUSDT", T0 + 60 * m + s, 2500.0 + m) for m in range(3) for s in (10, 40)]
+    second = [_trade("ETHUSDT", T0 + 60 * m + s, 2600.0 + m) for m in (6, 7) for s in (10, 40)]
+    server = binance_stream([first, second])
+    backfill = _Backfill()
+    consumer = TickConsumer([("ETH", "USDT")], url=server.url, backfill=backfill, warmup=10,
+                            close_delay=None, reconnect_delay=0.01)
+
+    asyncio.run(_consume(consumer, len(first) + len(second)))
+
+    assert consumer.reconnects >= 1
+    pair = ("ETH", "USDT")
+    # Minute 2 was still forming when the stream dropped: it and the
+    # missed minutes 3-5 come from the backfill
+    assert backfill.calls == [(pair, T0 - 600, T0), (pair, T0 + 120, T0 + 360)]
+    bars = consumer.bars(pair)
+    assert list(np.diff(bars.time)) == [60] * (len(bars) - 1)
+    assert bars.last_time == T0 + 360
+    assert list(bars.close[-7:-5]) == [2500.0, 2501.0]
+    np.testing.assert_allclose(bars.close[-5:-1], _bars(T0 + 120, T0 + 360).close)
+    assert bars.close[-1] == 2606.0
+    assert consumer.stats()["backfilled"] == 10 + 4
+
+
+def test_flush_closes_bars_by_the_clock():
+    clock = [T0 + 30.0]
+    consumer = TickConsumer([("ETH", "USDT")], close_delay=1.0, clock=lambda: clock[0])
+    asyncio.run(consumer.handle(_trade("ETHUSDT", T0 + 5, 2500.0)))
+
+    asyncio.run(consumer.flush())
+    assert not len(consumer.bars(("ETH", "USDT")))
+    clock[0] = T0 + 60.5  # inside the close delay
+    asyncio.run(consumer.flush())
+    assert not len(consumer.bars(("ETH", "USDT")))
+    clock[0] = T0 + 121.5
+    asyncio.run(consumer.flush())
+    assert list(consumer.bars(("ETH", "USDT")).time) == [T0, T0 + 60]
@@ -0,0 +1,137 @@
+"""Tests for vectorized candle validation and repair."""
+
+import numpy as np
+import pytest
+
+from candles import CandleBuffer
+from features import engineer_features, engineer_features_batch
+from validation import (
+    BAD_PRICE, BAD_VOLUME, CLAMPED, DUPLICATE, FILLED, INCONSISTENT, UNORDERED, quality_report,
+    validate_candles,
+)
+
+T0 = 1_700_000_040
+
+
+def _dirty(make_buffer):
+    clean = make_buffer(200, start=T0)
+    records = clean.to_records()
+    records["close"][50] = 0.0                           # bad price
+    records["open"][60] = np.nan                         # bad price
+    records["close"][80] *= 1.2                          # one-bar spike
+    records["high"][90] = records["high"][90] * 1.5      # extreme wick
+    records["low"][100] = records["high"][100] * 1.0001  # low above high
+    records["volume"][110] = -3.0
+    records[[120, 121]] = records[[121, 120]]            # swapped bars
+    records = np.insert(records, 150, records[149])      # duplicate, resent with new volume
+    records["volume"][150] = 999.0
+    records = np.delete(records, [140, 141])             # two missing bars
+    return clean, CandleBuffer.from_records(records)
+
+
+def test_clean_input_passes_through(make_buffer):
+    candles = make_buffer(500)
+    repaired, flags = validate_candles(candles)
+    assert not flags.any()
+    for name in ("time", "open", "high", "low", "close", "volume"):
+        np.testing.assert_array_equal(repaired.column(name), candles.column(name))
+
+
+def test_dirty_input_is_repaired_and_flagged(make_buffer):
+    clean, dirty = _dirty(make_buffer)
+    repaired, flags = validate_candles(dirty)
+
+    assert len(repaired) == len(clean)
+    assert list(repaired.time) == list(clean.time)
+    assert flags[50] & BAD_PRICE and repaired.close[50] == clean.close[49]
+    assert flags[60] & BAD_PRICE and repaired.open[60] == clean.close[59]
+    assert flags[80] & CLAMPED and abs(np.log(repaired.close[80] / clean.close[79])) < 0.02
+    assert flags[90] & CLAMPED and repaired.high[90] < clean.high[90] * 1.1
+    assert flags[100] & INCONSISTENT and repaired.low[100] <= min(repaired.open[100], repaired.close[100])
+    assert flags[110] & BAD_VOLUME and repaired.volume[110] == 0.0
+    assert flags[120] & UNORDERED or flags[121] & UNORDERED
+    assert repaired.close[120] == clean.close[120]
+    assert list(flags[140:142] & FILLED) == [FILLED, FILLED]
+    assert repaired.close[140] == repaired.close[141] == clean.close[139]
+    assert repaired.volume[140] == 0.0
+    assert flags[149] & DUPLICATE and repaired.volume[149] == 999.0
+
+    # High/low always bracket open/close and every price is usable
+    assert (repaired.high >= np.maximum(repaired.open, repaired.close)).all()
+    assert (repaired.low <= np.minimum(repaired.open, repaired.close)).all()
+    assert (repaired.low > 0).all() and np.isfinite(repaired.close).all()
+
+    report = quality_report(flags)
+    assert report["rows"] == len(clean) and report["filled"] == 2 and report["duplicate"] == 1
+    assert report["clean"] == int((flags == 0).sum())
+
+
+def test_spike_reanchors_the_next_open(make_buffer):
+    clean = make_buffer(200, start=T0)
+    records = clean.to_records()
+    # A realistic spike: the next bar opens where the spiked one closed
+    records["close"][80] *= 1.2
+    records["high"][80] = records["close"][80]
+    records["open"][81] = records["close"][80]
+    records["high"][81] = records["open"][81] * 0.999 + records["high"][81] * 0.001
+    repaired, flags = validate_candles(CandleBuffer.from_records(records))
+
+    assert flags[80] & CLAMPED and flags[81] & CLAMPED
+    assert repaired.open[81] == repaired.close[80]
+    assert abs(np.log(repaired.open[81] / clean.open[81])) < 0.02
+    assert repaired.high[81] < clean.high[81] * 1.02
+    assert repaired.high[81] >= max(repaired.open[81], repaired.close[81])
+    assert repaired.low[81] <= min(repaired.open[81], repaired.close[81])
+    assert not flags[82:].any()
+
+
+def test_level_shifts_are_not_clamped(make_buffer):
+    records = make_buffer(200).to_records()
+    for name in ("open", "high", "low", "close"):
+        records[name][100:] *= 0.8  # a real 20% drop that stays
+    records["open"][100] = records["close"][99]
+    records["high"][100] = max(records["high"][100], records["open"][100])
+    repaired, flags = validate_candles(CandleBuffer.from_records(records))
+    assert not flags.any()
+
+
+def _ohlc(close, wick):
+    times = T0 + 60 * np.arange(len(close), dtype=np.int64)
+    open_ = np.concatenate([close[:1], close[:-1]])
+    return CandleBuffer.from_arrays(times, open_, np.maximum(open_, close) + wick,
+                                    np.minimum(open_, close) - wick, close, np.ones(len(close)))
+
+
+def test_tick_quantized_prices_are_not_clamped():
+    # A pair near 1.0 in 0.0001 ticks where every move is one tick, mostly up
+    rng = np.random.default_rng(5)
+    ticks = 10_000 + np.cumsum(np.where(rng.random(5000) < 0.6, 1, -1))
+    candles = _ohlc(ticks * 1e-4, rng.integers(0, 3, 5000) * 1e-4)
+    repaired, flags = validate_candles(candles)
+    assert quality_report(flags)["clamped"] == 0
+    np.testing.assert_array_equal(engineer_features_batch(repaired, clean=True),
+                                  engineer_features_batch(candles))
+
+
+def test_constant_drift_is_not_clamped():
+    close = 100.0 + 0.01 * np.arange(2000)
+    candles = _ohlc(close, close * 2e-4)
+    repaired, flags = validate_candles(candles)
+    assert quality_report(flags)["clamped"] == 0
+    np.testing.assert_array_equal(repaired.high, candles.high)
+
+
+def test_features_on_repaired_bars_are_finite(make_buffer):
+    _, dirty = _dirty(make_buffer)
+    repaired, _ = validate_candles(dirty)
+    rows = engineer_features_batch(repaired, clean=True)
+    assert np.isfinite(rows).all()
+    np.testing.assert_array_equal(rows, engineer_features_batch(repaired))
+    assert np.isfinite(engineer_features(repaired)).all()
+
+
+def test_no_usable_close_raises():
+    bad = CandleBuffer.from_arrays([T0, T0 + 60], [1.0, 1.0], [1.0, 1.0], [1.0, 1.0],
+                                   [0.0, np.nan], [1.0, 1.0])
+    with pytest.raises(ValueError):
+        validate_candles(bad)
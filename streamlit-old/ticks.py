@@ -0,0 +1,334 @@
+"""
+Live trade ingestion over WebSocket.
+
+`TickConsumer` subscribes to Binance's combined trade stream for many
+pairs on one connection, aggregates trades into minute bars as they
+arrive (`BarBuilder`) and pushes every closed bar through a per-pair
+`StreamingFeatureEngine`, so features are ready about a second after a
+bar closes instead of after the next CryptoCompare poll.
+
+A bar closes when the first trade of a later bar arrives, or at the bar
+boundary plus `close_delay` by the local clock; minutes without trades
+become flat zero-volume bars. After a (re)connect each pair is caught
+up through `backfill(pair, start, end)` before its next trade is
+applied, so a dropped connection leaves no hole: missed bars come from
+the REST API and the bar that was forming when the connection dropped
+is replaced by the REST version. The first connect backfills `warmup`
+bars the same way. Trades with unusable prices are dropped and backfills
+go through `validate_candles`, so the engines run their clean path.
+
+    consumer = TickConsumer([("ETH", "USDT")], on_bars=print,
+                            backfill=cryptocompare_backfill(fetcher))
+    await consumer.run(stop)
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import math
+import random
+import time
+
+import numpy as np
+
+from candles import CandleBuffer
+from streaming import StreamingFeatureEngine
+from validation import validate_candles
+
+log = logging.getLogger("ticks")
+
+BINANCE_WS = "wss://stream.binance.com:9443"
+STREAM_KINDS = ("aggTrade", "trade")
+MAX_BACKFILL = 2000  # bars per histominute request
+
+
+def stream_name(pair, kind="aggTrade"):
+    """("ETH", "USDT") -> "ethusdt@aggTrade"."""
+    return f"{pair[0]}{pair[1]}".lower() + f"@{kind}"
+
+
+def parse_trade(message):
+    """
+    (symbol, time in seconds, price, quantity) from a trade or aggTrade
+    event, raw or wrapped by the combined stream; None for anything else
+    (subscription acks, other event types, unusable prices).
+    """
+    data = message.get("data", message)
+    if data.get("e") not in STREAM_KINDS:
+        return None
+    price, quantity = float(data["p"]), float(data["q"])
+    if not math.isfinite(price) or price <= 0:
+        return None
+    return data["s"], data["T"] / 1000.0, price, quantity
+
+
+class BarBuilder:
+    """
+    OHLCV bars for one pair built from individual trades.
+
+    Closed bars live in `bars` (a CandleBuffer, newest `maxlen` kept);
+    the bar still forming is `current`, a [time, open, high, low, close,
+    volume] list. Every method that closes bars returns just the newly
+    closed ones.
+    """
+
+    def __init__(self, interval=60, maxlen=None):
+        self.interval = interval
+        self.bars = CandleBuffer(maxlen=maxlen)
+        self.current = None
+        self.late = 0
+
+    @property
+    def next_time(self):
+        """Open time of the first bar not closed yet (None before any data)."""
+        if self.current is not None:
+            return self.current[0]
+        return self.bars.last_time + self.interval if len(self.bars) else None
+
+    def _tail(self, count):
+        count = min(count, len(self.bars))
+        return self.bars[len(self.bars) - count:] if count else CandleBuffer()
+
+    def add(self, t, price, quantity):
+        """Apply one trade; returns the bars it closed."""
+        bucket = int(t) // self.interval * self.interval
+        current = self.current
+        if current is not None and bucket == current[0]:
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+            current[5] += quantity
+            return CandleBuffer()
+        start = self.next_time
+        if start is not None and bucket < start:
+            self.late += 1  # its bar is already closed
+            return CandleBuffer()
+        closed = self.close_until(bucket)
+        self.current = [bucket, price, price, price, price, quantity]
+        return closed
+
+    def close_until(self, end):
+        """Close every bar that opens before `end`, filling empty minutes flat."""
+        count = 0
+        if self.current is not None and self.current[0] < end:
+            self.bars.append(*self.current)
+            self.current = None
+            count += 1
+        if self.current is None and len(self.bars):
+            start = self.bars.last_time + self.interval
+            n = max(0, (end - start + self.interval - 1) // self.interval)
+            if n:
+                close = np.full(n, self.bars.close[-1])
+                self.bars.extend(CandleBuffer.from_arrays(
+                    start + self.interval * np.arange(n, dtype=np.int64),
+                    close, close, close, close, np.zeros(n), copy=False))
+                count += n
+        return self._tail(count)
+
+    def merge(self, candles, end):
+        """
+        Take closed bars from another source (a REST backfill) for
+        [next_time, end); a forming bar inside that range is dropped in
+        favour of the complete one. Returns the bars added.
+        """
+        start = self.next_time
+        times = candles.time
+        lo = 0 if start is None else int(times.searchsorted(start, side="left"))
+        fresh = candles[lo:int(times.searchsorted(end, side="left"))]
+        if self.current is not None and self.current[0] < end:
+            self.current = None
+        self.bars.extend(fresh)
+        return self._tail(len(fresh))
+
+
+def cryptocompare_backfill(fetcher, interval=60):
+    """A `backfill` for TickConsumer that reads `histominute` through an AsyncCandleFetcher."""
+
+    async def backfill(pair, start, end):
+        count = min((end - start) // interval, MAX_BACKFILL)
+        if count <= 0:
+            return CandleBuffer()
+        # histominute returns limit + 1 bars ending at toTs
+        candles = await fetcher.fetch(pair[0], pair[1], limit=count, to_ts=end - interval)
+        times = candles.time
+        return candles[int(times.searchsorted(start, side="left")):
+                       int(times.searchsorted(end, side="left"))]
+
+    return backfill
+
+
+class TickConsumer:
+    """
+    Multi-pair WebSocket trade consumer feeding streaming features.
+
+    `on_bars(pair, bars, features)` is called (and awaited, if it is a
+    coroutine function) whenever a pair closes bars: `bars` holds just
+    the new ones and `features` the 15 features as of the last of them,
+    or None while the engine is still warming up. See the module
+    docstring for reconnect and backfill behaviour.
+    """
+
+    def __init__(self, pairs, url=BINANCE_WS, kind="aggTrade", interval=60, backfill=None,
+                 on_bars=None, warmup=120, maxlen=1440, close_delay=1.0, reconnect_delay=0.5,
+                 max_reconnect_delay=30.0, clock=time.time, sleep=asyncio.sleep):
+        self.pairs = list(pairs)
+        self.url = url
+        self.kind = kind
+        self.interval = interval
+        self.backfill = backfill
+        self.on_bars = on_bars
+        self.warmup = warmup
+        self.close_delay = close_delay
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.builders = {pair: BarBuilder(interval, maxlen) for pair in self.pairs}
+        # Bars are clean by construction (bad trades dropped, backfills
+        # validated), so the engines skip their per-value guards
+        self.engines = {pair: StreamingFeatureEngine(clean=True) for pair in self.pairs}
+        self.connected = False
+        self.messages = 0
+        self.trades = 0
+        self.reconnects = 0
+        self.backfilled = 0
+        self.backfill_errors = 0
+        self._symbols = {f"{fsym}{tsym}".upper(): (fsym, tsym) for fsym, tsym in self.pairs}
+        self._stale = set(self.pairs)  # pairs to catch up before their next trade
+
+    @property
+    def stream_url(self):
+        names = "/".join(stream_name(pair, self.kind) for pair in self.pairs)
+        return f"{self.url.rstrip('/')}/stream?streams={names}"
+
+    def bars(self, pair):
+        return self.builders[pair].bars
+
+    def features(self, pair):
+        return self.engines[pair].features
+
+    async def run(self, stop=None):
+        """Consume until `stop` is set, reconnecting with jittered backoff."""
+        import websockets  # imported on first use so the Streamlit app starts without it
+
+        stop = stop or asyncio.Event()
+        flusher = (asyncio.ensure_future(self._flush_loop(stop))
+                   if self.close_delay is not None else None)
+        delay = self.reconnect_delay
+        try:
+            while not stop.is_set():
+                try:
+                    async with websockets.connect(self.stream_url, max_queue=None) as ws:
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        await self._consume(ws, stop)
+                except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                    log.warning("stream connection failed: %r", e)
+                finally:
+                    self.connected = False
+                if stop.is_set():
+                    break
+                self.reconnects += 1
+                self._stale.update(self.pairs)
+                if await self._wait(random.uniform(0, delay), stop):
+                    break
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+
+    async def _consume(self, ws, stop):
+        closer = asyncio.ensure_future(self._close_on(stop, ws))
+        try:
+            async for raw in ws:
+                await self.handle(json.loads(raw))
+        finally:
+            closer.cancel()
+
+    @staticmethod
+    async def _close_on(stop, ws):
+        await stop.wait()
+        await ws.close()
+
+    async def _wait(self, seconds, stop):
+        """Sleep `seconds` through `self.sleep`; True if `stop` was set meanwhile."""
+        sleeper = asyncio.ensure_future(self.sleep(seconds))
+        stopper = asyncio.ensure_future(stop.wait())
+        await asyncio.wait({sleeper, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (sleeper, stopper):
+            task.cancel()
+        return stop.is_set()
+
+    async def handle(self, message):
+        """Apply one decoded stream message."""
+        self.messages += 1
+        trade = parse_trade(message)
+        if trade is None:
+            return
+        symbol, t, price, quantity = trade
+        pair = self._symbols.get(symbol)
+        if pair is None:
+            return
+        self.trades += 1
+        if pair in self._stale:
+            await self.catch_up(pair, int(t) // self.interval * self.interval)
+        await self._emit(pair, self.builders[pair].add(t, price, quantity))
+
+    async def catch_up(self, pair, end):
+        """Backfill `pair` up to (not including) the bar opening at `end`."""
+        self._stale.discard(pair)
+        builder = self.builders[pair]
+        start = builder.next_time
+        if start is None:
+            start = end - self.warmup * self.interval
+        if self.backfill is None or start >= end:
+            return
+        try:
+            candles = await self.backfill(pair, start, end)
+            candles = validate_candles(candles, self.interval)[0]
+        except Exception as e:
+            # Carry on from the stream; the gap is filled flat instead
+            self.backfill_errors += 1
+            log.warning("backfill %s/%s failed: %r", pair[0], pair[1], e)
+            return
+        closed = builder.merge(candles, end)
+        self.backfilled += len(closed)
+        await self._emit(pair, closed)
+
+    async def flush(self, now=None):
+        """Close every bar whose interval (plus `close_delay`) has ended by `now`."""
+        now = self.clock() if now is None else now
+        end = int(now - (self.close_delay or 0.0)) // self.interval * self.interval
+        for pair in self.pairs:
+            if pair in self._stale:
+                await self.catch_up(pair, end)
+            await self._emit(pair, self.builders[pair].close_until(end))
+
+    async def _flush_loop(self, stop):
+        while True:
+            now = self.clock()
+            wake = (now - self.close_delay) // self.interval * self.interval \
+                + self.interval + self.close_delay
+            if await self._wait(wake - now, stop):
+                return
+            # While disconnected the next catch-up fills the gap instead
+            if self.connected:
+                await self.flush()
+
+    async def _emit(self, pair, bars):
+        if not len(bars):
+            return
+        engine = self.engines[pair]
+        for bar in bars:
+            engine.push(bar)
+        if self.on_bars is not None:
+            result = self.on_bars(pair, bars, engine.features)
+            if inspect.isawaitable(result):
+                await result
+
+    def stats(self):
+        return {"connected": self.connected, "messages": self.messages, "trades": self.trades,
+                "reconnects": self.reconnects, "backfilled": self.backfilled,
+                "backfill_errors": self.backfill_errors,
+                "late": sum(b.late for b in self.builders.values())}
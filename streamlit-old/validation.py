@@ -0,0 +1,195 @@
+"""
+Vectorized candle validation and repair.
+
+`engineer_features` trusts its input: a zero or NaN price turns into a
+0.0 log ratio or a NaN feature, a missing minute silently stretches
+every lookback, and duplicate or out-of-order bars skew the windows.
+`validate_candles` repairs a candle array with whole-array operations
+and returns one quality flag byte per output row:
+
+- timestamps are sorted (UNORDERED) and snapped onto the first bar's grid;
+- duplicate bars collapse to the last one received (DUPLICATE);
+- non-positive or non-finite prices are forward-filled (BAD_PRICE);
+- single-bar spikes (an outlier move immediately reversed) and extreme
+  wicks are clamped to `outlier_threshold` robust deviations, and the
+  bar after a spike is re-opened at the repaired close (CLAMPED);
+- high/low are widened to cover open and close (INCONSISTENT);
+- negative or non-finite volume becomes 0 (BAD_VOLUME);
+- missing bars are inserted flat at the previous close with zero
+  volume (FILLED).
+
+Clean output lets the feature paths skip their per-value guards
+(`engineer_features_batch(..., clean=True)`).
+
+    candles, flags = validate_candles(candles)
+    quality_report(flags)  # {"rows": 121, "clean": 119, "filled": 2, ...}
+"""
+
+import numpy as np
+
+from candles import CandleBuffer
+
+UNORDERED = 1
+DUPLICATE = 2
+BAD_PRICE = 4
+CLAMPED = 8
+INCONSISTENT = 16
+BAD_VOLUME = 32
+FILLED = 64
+FLAG_NAMES = {
+    UNORDERED: "unordered", DUPLICATE: "duplicate", BAD_PRICE: "bad_price", CLAMPED: "clamped",
+    INCONSISTENT: "inconsistent", BAD_VOLUME: "bad_volume", FILLED: "filled",
+}
+
+OUTLIER_THRESHOLD = 12.0  # robust deviations (scaled median |log return| of closes)
+MAD_SCALE = 1.4826        # median |x| -> standard deviation for normal returns
+MIN_OUTLIER_TICKS = 10    # the outlier limit is never under this many price ticks...
+MIN_OUTLIER_MOVE = 0.005  # ...or a 0.5% log move
+
+
+def _forward_fill(values, valid):
+    """values with every invalid entry replaced by the last valid one before it
+    (the first valid one for a leading run)."""
+    idx = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[idx]
+    first = int(np.argmax(valid))
+    filled[:first] = values[first]
+    return filled
+
+
+def validate_candles(candles, interval=60, outlier_threshold=OUTLIER_THRESHOLD, fill_gaps=True):
+    """
+    Repair `candles` (a CandleBuffer) as described in the module
+    docstring. Returns (CandleBuffer, uint8 flags per row). Raises
+    ValueError if no bar has a usable close.
+    """
+    n = len(candles)
+    if n == 0:
+        return CandleBuffer(), np.zeros(0, dtype=np.uint8)
+    time = candles.time.astype(np.int64)
+    o, h, l, c, v = (np.array(candles.column(name), dtype=np.float64)
+                     for name in ("open", "high", "low", "close", "volume"))
+    flags = np.zeros(n, dtype=np.uint8)
+
+    # Order: flag bars older than one already seen, then stable-sort
+    seen = np.maximum.accumulate(time)
+    unordered = np.concatenate([[False], time[1:] < seen[:-1]])
+    if unordered.any():
+        flags[unordered] |= UNORDERED
+        order = np.argsort(time, kind="stable")
+        time, o, h, l, c, v, flags = (x[order] for x in (time, o, h, l, c, v, flags))
+    # Snap onto the grid of the first bar, so odd timestamps count as their bar
+    time = time[0] + (time - time[0]) // interval * interval
+
+    # Duplicates: keep the last bar per timestamp, carrying the flags of the rest
+    same = time[1:] == time[:-1]
+    if same.any():
+        group = np.concatenate([[0], np.cumsum(~same)])
+        merged = np.zeros(group[-1] + 1, dtype=np.uint8)
+        np.bitwise_or.at(merged, group, flags)
+        keep = np.concatenate([~same, [True]])
+        dup = np.zeros(len(merged), dtype=bool)
+        dup[group[1:][same]] = True
+        time, o, h, l, c, v = (x[keep] for x in (time, o, h, l, c, v))
+        flags = merged | np.where(dup, DUPLICATE, 0).astype(np.uint8)
+
+    # Bad prices: forward-fill closes; open falls back to the previous close,
+    # high/low are rebuilt from open/close below
+    bad = [~np.isfinite(x) | (x <= 0) for x in (o, h, l, c)]
+    flags[bad[0] | bad[1] | bad[2] | bad[3]] |= BAD_PRICE
+    if bad[3].all():
+        raise ValueError("no bar has a usable close price")
+    if bad[3].any():
+        c = _forward_fill(c, ~bad[3])
+    if bad[0].any():
+        o = np.where(bad[0], np.concatenate([c[:1], c[:-1]]), o)
+    h[bad[1]] = np.nan
+    l[bad[2]] = np.nan
+
+    # Outliers, measured in robust deviations of close-to-close log returns.
+    # The scale comes from return magnitudes (zeros included), so it cannot
+    # collapse when most moves are one tick or one steady drift, and the
+    # limit never drops below a few ticks or `MIN_OUTLIER_MOVE`.
+    returns = np.diff(np.log(c))
+    if n > 2:
+        abs_returns = np.abs(returns)
+        scale = MAD_SCALE * float(np.median(abs_returns))
+        moves = np.abs(np.diff(c))
+        moves = moves[moves > 0]
+        tick = float(moves.min() / np.median(c)) if len(moves) else 0.0
+        limit = max(outlier_threshold * scale, MIN_OUTLIER_TICKS * tick, MIN_OUTLIER_MOVE)
+        out = abs_returns > limit
+        # A spike jumps away and straight back; a genuine level shift stays
+        spike = out[:-1] & out[1:] & (returns[:-1] * returns[1:] < 0)
+        rows = np.flatnonzero(spike) + 1
+        if len(rows):
+            spiked = c[rows]
+            c[rows] = c[rows - 1] * np.exp(np.clip(returns[rows - 1], -limit, limit))
+            flags[rows] |= CLAMPED
+            # A next bar that opened at the spiked close is re-anchored to the
+            # repaired one, carrying only its own wicks (beyond its old body)
+            # onto the new body
+            has_next = rows + 1 < len(c)
+            after = rows[has_next] + 1
+            with np.errstate(divide="ignore", invalid="ignore"):
+                anchored = (np.abs(np.log(o[after] / spiked[has_next]))
+                            < np.abs(np.log(o[after] / c[after - 1])))
+            after = after[anchored]
+            if len(after):
+                old_high, old_low = np.maximum(o[after], c[after]), np.minimum(o[after], c[after])
+                o[after] = c[after - 1]
+                with np.errstate(invalid="ignore"):
+                    up = np.fmax(h[after] / old_high, 1.0)
+                    down = np.fmin(l[after] / old_low, 1.0)
+                h[after] = np.maximum(o[after], c[after]) * up
+                l[after] = np.minimum(o[after], c[after]) * down
+                flags[after] |= CLAMPED
+        body_high, body_low = np.maximum(o, c), np.minimum(o, c)
+        wick = (h > body_high * np.exp(limit)) | (l < body_low * np.exp(-limit))
+        if wick.any():
+            h = np.where(h > body_high * np.exp(limit), body_high * np.exp(limit), h)
+            l = np.where(l < body_low * np.exp(-limit), body_low * np.exp(-limit), l)
+            flags[wick] |= CLAMPED
+
+    # Consistency: high/low must cover open and close (NaN-safe, so this
+    # also rebuilds the bad ones)
+    high = np.fmax(np.fmax(h, o), c)
+    low = np.fmin(np.fmin(l, o), c)
+    flags[(high != h) & ~np.isnan(h) | (low != l) & ~np.isnan(l)] |= INCONSISTENT
+    h, l = high, low
+
+    bad_volume = ~np.isfinite(v) | (v < 0)
+    if bad_volume.any():
+        v[bad_volume] = 0.0
+        flags[bad_volume] |= BAD_VOLUME
+
+    # Gaps: scatter onto the full grid and fill the holes flat at the previous close
+    slots = (time - time[0]) // interval
+    if fill_gaps and slots[-1] + 1 > len(time):
+        size = int(slots[-1]) + 1
+        present = np.zeros(size, dtype=bool)
+        present[slots] = True
+        grid = {}
+        for name, x in (("open", o), ("high", h), ("low", l), ("close", c), ("volume", v)):
+            grid[name] = np.zeros(size)
+            grid[name][slots] = x
+        close = _forward_fill(grid["close"], present)
+        for name in ("open", "high", "low", "close"):
+            grid[name] = np.where(present, grid[name], close)
+        full = np.full(size, FILLED, dtype=np.uint8)
+        full[slots] = flags
+        time = time[0] + interval * np.arange(size, dtype=np.int64)
+        o, h, l, c, v, flags = (grid["open"], grid["high"], grid["low"], grid["close"],
+                                grid["volume"], full)
+
+    return CandleBuffer.from_arrays(time, o, h, l, c, v, copy=False), flags
+
+
+def quality_report(flags):
+    """Row counts: total, clean, and per flag."""
+    flags = np.asarray(flags, dtype=np.uint8)
+    report = {"rows": len(flags), "clean": int(np.count_nonzero(flags == 0))}
+    for bit, name in FLAG_NAMES.items():
+        report[name] = int(np.count_nonzero(flags & bit))
+    return report